@@ -1,53 +1,334 @@
 import uvicorn
+import asyncio
 import io
-from PIL import Image
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, UploadFile, File
+import json
+import time
+from contextlib import asynccontextmanager, ExitStack
+from itertools import islice
+from typing import List, Optional
+from fastapi import FastAPI, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from cnn_classifier.pipeline.predicton import PredictionPipeline
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from cnn_classifier import logger
+from cnn_classifier.constants import CLASS_NAMES
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.components.inference_executor import InferenceExecutor, ExecutorSaturatedError
+from cnn_classifier.components.micro_batcher import MicroBatcher
+from cnn_classifier.components.serving_metrics import ServingMetrics
+from cnn_classifier.components.tta import TTA_VIEWS
 from cnn_classifier.utils.utilities import bytes_to_data_url
+from cnn_classifier.utils.archives import is_archive, iter_archive_images
+from cnn_classifier.utils.logging_setup import configure_logging, stop_logging
 
 templates = Jinja2Templates(directory='templates')
+metrics = ServingMetrics()
+
+IMAGE_READ_ERROR = "Could not read the uploaded image."
 
 class ClientApp:
     def __init__(self):
-        self.classifier = PredictionPipeline()
+        config = ConfigurationManager().get_prediction_config()
+        self.config = config
+        self.executor = InferenceExecutor(config)
+        self.batcher = MicroBatcher(
+            predict_batch_fn=self.executor.predict_batch_fn,
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_wait_ms,
+            executor=self.executor.pool,
+            on_timings=metrics.observe_timings
+        )
 
 clApp = None
+startup_error = None
+
+async def load_client_app():
+    """Load the model in a worker thread so the server answers liveness probes meanwhile."""
+    global clApp, startup_error
+    start = time.perf_counter()
+    try:
+        client = await asyncio.to_thread(ClientApp)
+        await client.batcher.start()
+    except Exception as e:
+        startup_error = e
+        logger.exception(e)
+        return
+    clApp = client
+    metrics.extra = [client.batcher.batch_size_hist, client.batcher.queue_wait_hist]
+    metrics.model_load_seconds.set(time.perf_counter() - start)
+    logger.info(f"Model ready in {time.perf_counter() - start:.2f}s")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global clApp
-    clApp = ClientApp()
+    configure_logging()
+    loader = asyncio.create_task(load_client_app())
     yield
-    # Cleanup code can go here if needed
+    await loader
+    if clApp is not None:
+        client, clApp = clApp, None
+        await client.batcher.stop()
+        client.executor.shutdown()
+    stop_logging()
 
 app = FastAPI(lifespan=lifespan)
 
+async def _observe_when_done(body, done):
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        done()
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Track in-flight requests, request counts and latency, streamed bodies included."""
+    start = time.perf_counter()
+    metrics.inflight.inc()
+    status = 500
+
+    def done():
+        metrics.inflight.dec()
+        route = request.scope.get("route")
+        metrics.observe_request(route.path if route else "unmatched", status, time.perf_counter() - start)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        done()
+        raise
+    status = response.status_code
+    response.body_iterator = _observe_when_done(response.body_iterator, done)
+    return response
+
+def parse_tta_views(value: Optional[str]) -> Optional[int]:
+    """The per-request `tta_views` form field; empty means the configured default."""
+    if value is None or not value.strip():
+        return None
+    if not value.strip().isdigit() or not 1 <= int(value) <= len(TTA_VIEWS):
+        raise ValueError(f"tta_views must be between 1 and {len(TTA_VIEWS)}.")
+    return int(value)
+
+def not_ready_message() -> str:
+    if startup_error is not None:
+        return "Model failed to load."
+    return "Model is still loading, please try again shortly."
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the model is loaded and predictions can be served."""
+    if clApp is not None:
+        return {"status": "ready"}
+    status = "failed" if startup_error is not None else "loading"
+    return JSONResponse({"status": status, "detail": not_ready_message()}, status_code=503)
+
 @app.get('/')
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.post("/predict", response_class=HTMLResponse)
-async def predict(request: Request, file: UploadFile = File(...)):
+async def predict(request: Request, file: UploadFile = File(...), tta_views: Optional[str] = Form(None)):
     # Basic validation
     if not file.content_type or not file.content_type.startswith("image/"):
         return templates.TemplateResponse(
             "index.html",
             {"request": request, "error": "Please upload an image file."}
         )
+    try:
+        tta_views = parse_tta_views(tta_views)
+    except ValueError as e:
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "error": str(e)},
+            status_code=400
+        )
 
-    contents = await file.read()
-    image_data_url = bytes_to_data_url(contents, file.content_type)
-    
-    image = Image.open(io.BytesIO(contents)).convert("RGB")
-    result = clApp.classifier.predict(image)
+    client = clApp
+    if client is None:
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "error": not_ready_message()},
+            status_code=503,
+            headers={"Retry-After": "5"}
+        )
+
+    try:
+        with client.executor.admit():
+            start = time.perf_counter()
+            contents = await file.read()
+            metrics.observe_stage("upload_read", time.perf_counter() - start)
+            # Decoding and inference both run in the inference executor
+            confidence = None
+            if tta_views is None:
+                result = await client.batcher.submit(contents)
+            else:
+                # The views of one image already form a batch, so skip the micro-batcher
+                (probabilities,), timings = await client.executor.run(
+                    client.executor.predict_proba_batch_fn, [contents], tta_views
+                )
+                metrics.observe_timings(timings)
+                if isinstance(probabilities, Exception):
+                    raise probabilities
+                result = CLASS_NAMES[int(probabilities.argmax())]
+                confidence = float(probabilities.max())
+    except ExecutorSaturatedError:
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "error": "Server is busy, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
+    except OSError:
+        return templates.TemplateResponse(
+            "index.html",
+            {"request": request, "error": IMAGE_READ_ERROR},
+            status_code=400
+        )
 
-    return templates.TemplateResponse(
+    start = time.perf_counter()
+    image_data_url = bytes_to_data_url(contents, file.content_type)
+    response = templates.TemplateResponse(
         "index.html",
-        {"request": request, "image_data_url": image_data_url, "result": result}
+        {"request": request, "image_data_url": image_data_url, "result": result, "confidence": confidence}
+    )
+    metrics.observe_stage("render", time.perf_counter() - start)
+    return response
+
+class NotAnImageError(ValueError):
+    def __init__(self):
+        super().__init__("Not an image or a zip/tar archive")
+
+def batch_error_line(name: str, error: Exception) -> dict:
+    """A fixed, client-safe error for one image of a batch; the details only go to the log."""
+    if isinstance(error, NotAnImageError):
+        message = str(error)
+    elif isinstance(error, OSError):
+        message = IMAGE_READ_ERROR
+    else:
+        message = "Prediction failed."
+    logger.warning(f"Batch prediction failed for {name}: {error!r}")
+    return {"name": name, "error": message, "error_type": type(error).__name__}
+
+def iter_uploaded_images(uploads: list):
+    """Yield (name, bytes) per uploaded image, expanding zip/tar archives member by member."""
+    for filename, content_type, fileobj in uploads:
+        if content_type and content_type.startswith("image/"):
+            yield filename, fileobj.read()
+        elif is_archive(fileobj):
+            for member_name, data in iter_archive_images(fileobj):
+                yield f"{filename}/{member_name}", data
+        else:
+            yield filename, NotAnImageError()
+
+async def stream_batch_predictions(client: ClientApp, uploads: list, slot: ExitStack, tta_views: Optional[int] = None):
+    """Score `uploads` through `client`, the app the request was admitted to (`clApp` is cleared at shutdown)."""
+    with slot:
+        images = iter_uploaded_images(uploads)
+        while True:
+            # Archive members are read lazily, one model-sized batch at a time
+            start = time.perf_counter()
+            chunk = await run_in_threadpool(lambda: list(islice(images, client.config.max_batch_size)))
+            if not chunk:
+                break
+            metrics.observe_stage("upload_read", time.perf_counter() - start)
+
+            valid = [idx for idx, (_, data) in enumerate(chunk) if not isinstance(data, Exception)]
+            results = {}
+            latency_ms = 0.0
+            if valid:
+                start = time.perf_counter()
+                probabilities, timings = await client.executor.run(
+                    client.executor.predict_proba_batch_fn,
+                    [chunk[idx][1] for idx in valid],
+                    tta_views
+                )
+                latency_ms = (time.perf_counter() - start) * 1000.0
+                metrics.observe_timings(timings)
+                results = dict(zip(valid, probabilities))
+
+            start = time.perf_counter()
+            lines = []
+            for idx, (name, data) in enumerate(chunk):
+                result = results.get(idx, data)
+                if isinstance(result, Exception):
+                    line = batch_error_line(name, result)
+                else:
+                    line = {
+                        "name": name,
+                        "class": CLASS_NAMES[int(result.argmax())],
+                        "probabilities": {cls: float(p) for cls, p in zip(CLASS_NAMES, result)},
+                        "latency_ms": round(latency_ms, 3)
+                    }
+                lines.append(json.dumps(line) + "\n")
+            metrics.observe_stage("render", time.perf_counter() - start)
+            yield "".join(lines)
+
+@app.post("/v1/predict/batch")
+async def predict_batch(files: List[UploadFile] = File(...), tta_views: Optional[str] = Form(None)):
+    """
+    Classify many images in one request.
+
+    Accepts any number of image files and/or zip/tar archives of images and
+    streams one JSON object per image as NDJSON. `latency_ms` is the wall time
+    of the decode + forward pass of the batch the image was scored in.
+    `tta_views` overrides `prediction.tta_views` for this request.
+    """
+    try:
+        tta_views = parse_tta_views(tta_views)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    client = clApp
+    if client is None:
+        return JSONResponse(
+            {"error": not_ready_message()},
+            status_code=503,
+            headers={"Retry-After": "5"}
+        )
+
+    slot = ExitStack()
+    try:
+        slot.enter_context(client.executor.admit())
+    except ExecutorSaturatedError:
+        return JSONResponse(
+            {"error": "Server is busy, please try again shortly."},
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
+
+    # FastAPI closes UploadFile objects as soon as the endpoint returns, before
+    # the stream is consumed, so take ownership of the spooled files here.
+    uploads = []
+    for file in files:
+        uploads.append((file.filename, file.content_type, file.file))
+        slot.callback(file.file.close)
+        file.file = io.BytesIO()
+
+    return StreamingResponse(
+        stream_batch_predictions(client, uploads, slot, tta_views),
+        media_type="application/x-ndjson"
     )
 
+@app.get("/stats/batching")
+async def batching_stats():
+    if clApp is None:
+        return JSONResponse({"error": not_ready_message()}, status_code=503)
+    return {**clApp.batcher.stats(), "pending": clApp.executor.pending}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request counts, stage latency histograms, in-flight requests and model load time, in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats/cache")
+async def cache_stats():
+    if clApp is None:
+        return JSONResponse({"error": not_ready_message()}, status_code=503)
+    return await run_in_threadpool(clApp.executor.cache_stats)
+
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8080)
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Compare the BACKBONE options: parameters, FLOPs, CPU serving latency and (optionally) accuracy.
+
+    python benchmarks/bench_backbones.py --output bench/backbones.json
+    python benchmarks/bench_backbones.py --backbones vgg16 mobilenet_v3_large --accuracy-epochs 5 --weights imagenet
+
+Each backbone is built exactly as stage 02 builds it (untrained, `weights=None`,
+unless `--weights imagenet`), and timed through `PredictionPipeline` on uint8
+batches, i.e. the serving path including the in-model preprocessing. FLOPs are
+counted per image on the frozen inference graph (one multiply-add = 2 FLOPs).
+With `--accuracy-epochs N` the head of each backbone is trained for N epochs
+on the dataset prepared by stage 01 and the best validation accuracy is
+reported; this needs `--weights imagenet` to mean anything.
+"""
+import argparse
+import json
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+import numpy as np
+import tensorflow as tf
+from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+from common import percentiles, write_results
+from cnn_classifier.components.backbones import BACKBONES, build_backbone, get_backbone
+from cnn_classifier.components.model_definition import BaseModel
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.pipeline.predicton import PredictionPipeline
+
+def build(backbone: str, image_shape: list, weights, classes: int) -> tf.keras.Model:
+    base = build_backbone(backbone, input_shape=image_shape, weights=weights)
+    return BaseModel.define_full_model(
+        model=base, classes=classes, freez_all=True, freeze_till=None, pooling=get_backbone(backbone).pooling
+    )
+
+def count_flops(model: tf.keras.Model) -> int:
+    forward = tf.function(lambda x: model(x, training=False))
+    graph = convert_variables_to_constants_v2(
+        forward.get_concrete_function(tf.TensorSpec([1, *model.input_shape[1:]], tf.float32))
+    ).graph
+    options = tf.compat.v1.profiler.ProfileOptionBuilder.float_operation()
+    options["output"] = "none"
+    return int(tf.compat.v1.profiler.profile(graph=graph, options=options).total_float_ops)
+
+def latency(model_path: Path, image_shape: list, batch_size: int, iterations: int, warmup: int) -> dict:
+    config = ConfigurationManager().get_prediction_config()
+    config = replace(
+        config, model_path=model_path, params_image_size=image_shape, backend="keras",
+        max_batch_size=max(batch_size, 1), warmup=False, cache_max_entries=0
+    )
+    backend = PredictionPipeline(config).backend
+    batch = np.random.randint(0, 256, size=(batch_size, *config.params_image_size), dtype=np.uint8)
+    for _ in range(warmup):
+        backend(batch)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend(batch)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return percentiles(samples)
+
+def accuracy(backbone: str, model_path: Path, epochs: int, workdir: Path) -> dict:
+    from cnn_classifier.components.training import Training
+
+    config = replace(
+        ConfigurationManager().get_training_config(),
+        updated_base_model_path=model_path,
+        params_backbone=backbone,
+        params_epochs=epochs,
+        params_fine_tune_stages=[],
+        params_feature_cache=False,
+        params_distribution_strategy="none",
+        model_checkpoint_filepath=workdir / "checkpoint.h5",
+        trained_model_path=workdir / "trained.h5",
+        step_time_report_path=workdir / "step_times.json",
+        fine_tuning_report_path=workdir / "fine_tuning_report.json"
+    )
+    training = Training(config)
+    training.get_base_model()
+    training.train_validation_generator()
+    checkpoint = tf.keras.callbacks.ModelCheckpoint(
+        config.model_checkpoint_filepath, monitor="val_accuracy", mode="max", save_best_only=True
+    )
+    start = time.perf_counter()
+    training.train(callback_list=[checkpoint])
+    with open(config.fine_tuning_report_path) as f:
+        report = json.load(f)
+    return {"epochs": epochs, "best_val_accuracy": report["best_val_accuracy"], "train_time_s": time.perf_counter() - start}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backbones", nargs="+", default=list(BACKBONES), choices=list(BACKBONES))
+    parser.add_argument("--weights", default=None, choices=[None, "imagenet"], help="default: untrained")
+    parser.add_argument("--image-size", type=int, default=None, help="default: IMAGE_SIZE from params.yaml")
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--accuracy-epochs", type=int, default=0, help="train each head this long (0: skip accuracy)")
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    configured_shape = list(ConfigurationManager().params.IMAGE_SIZE)
+    image_shape = [args.image_size, args.image_size, 3] if args.image_size else configured_shape
+    if args.accuracy_epochs and image_shape != configured_shape:
+        parser.error(f"--accuracy-epochs trains on the stage 01 data, which is prepared at IMAGE_SIZE {configured_shape}")
+    workdir = Path(tempfile.mkdtemp(prefix="cnn_clf_backbones_"))
+    results = {"weights": args.weights, "image_size": image_shape, "backbones": {}}
+    for backbone in args.backbones:
+        model = build(backbone, image_shape, args.weights, args.classes)
+        head = model.layers[-1]
+        model_path = workdir / f"{backbone}.h5"
+        model.save(model_path)
+
+        result = {
+            "pooling": get_backbone(backbone).pooling,
+            "params": model.count_params(),
+            "head_params": head.count_params(),
+            "gflops_per_image": count_flops(model) / 1e9,
+            "latency": {str(b): latency(model_path, image_shape, b, args.iterations, args.warmup) for b in args.batch_sizes}
+        }
+        if args.accuracy_epochs:
+            result["accuracy"] = accuracy(backbone, model_path, args.accuracy_epochs, workdir / backbone)
+        results["backbones"][backbone] = result
+        tf.keras.backend.clear_session()
+
+    latency_columns = " ".join(f"{'b' + str(b) + ' p50 ms':>12s}" for b in args.batch_sizes)
+    print(f"{'backbone':>20s} {'params':>12s} {'head':>10s} {'GFLOPs':>8s} {latency_columns} {'val acc':>8s}")
+    for backbone, r in results["backbones"].items():
+        latencies = " ".join(f"{r['latency'][str(b)]['p50_ms']:12.2f}" for b in args.batch_sizes)
+        acc = f"{r['accuracy']['best_val_accuracy']:8.4f}" if "accuracy" in r else f"{'-':>8s}"
+        print(f"{backbone:>20s} {r['params']:12,d} {r['head_params']:10,d} {r['gflops_per_image']:8.2f} {latencies} {acc}")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
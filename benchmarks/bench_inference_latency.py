@@ -0,0 +1,63 @@
+"""
+Single-request inference latency: `model.predict` vs the compiled inference function.
+
+    python benchmarks/bench_inference_latency.py --iterations 200
+    python benchmarks/bench_inference_latency.py --jit-compile --output bench/latency.json
+
+Uses the trained model from config/config.yaml when it exists, otherwise an
+untrained VGG16 with the same architecture.
+"""
+import argparse
+import time
+from dataclasses import replace
+import numpy as np
+from common import build_dummy_model, percentiles, write_results
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.pipeline.predicton import PredictionPipeline
+
+def time_calls(fn, batch: np.ndarray, iterations: int, warmup: int) -> list:
+    for _ in range(warmup):
+        fn(batch)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(batch)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--jit-compile", action="store_true", help="XLA-compile the inference function")
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    config = ConfigurationManager().get_prediction_config()
+    if not config.model_path.exists():
+        config = replace(config, model_path=build_dummy_model(config.params_image_size))
+    config = replace(config, backend="keras", jit_compile=args.jit_compile, max_batch_size=max(args.batch_size, 1))
+
+    pipeline = PredictionPipeline(config)
+    batch = np.random.randint(0, 256, size=(args.batch_size, *config.params_image_size), dtype=np.uint8)
+
+    results = {
+        "model_path": str(config.model_path),
+        "batch_size": args.batch_size,
+        "jit_compile": args.jit_compile,
+        "model.predict": percentiles(time_calls(
+            lambda x: pipeline.backend.model.predict(x / 255.0, verbose=0), batch, args.iterations, args.warmup)),
+        "compiled": percentiles(time_calls(
+            pipeline.backend, batch, args.iterations, args.warmup))
+    }
+
+    print(f"{'path':15s} {'p50 ms':>10s} {'p99 ms':>10s} {'mean ms':>10s}")
+    for name in ("model.predict", "compiled"):
+        r = results[name]
+        print(f"{name:15s} {r['p50_ms']:10.2f} {r['p99_ms']:10.2f} {r['mean_ms']:10.2f}")
+
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Training input throughput: image_dataset_from_directory vs preprocessed TFRecord shards.
+
+    python benchmarks/bench_input_pipeline.py --epochs 3
+    python benchmarks/bench_input_pipeline.py --synthetic 2000
+
+Iterates the training split of each reader (including the 1/255 rescale the
+training stage applies, without caching) for several epochs and reports
+images/sec per epoch. Uses artifacts/data_ingestion/data/images by default;
+`--synthetic N` generates N random JPEGs in a temporary directory instead.
+The manifest and shards are written to a temporary directory, and the time
+to write them is reported separately.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from common import write_results
+from cnn_classifier.components.tfrecord_dataset import write_tfrecord_shards, tfrecord_dataset
+from cnn_classifier.components.dataset_manifest import build_dataset_manifest
+
+def synthetic_images(root: Path, count: int, classes: int = 4, size=(640, 480)) -> Path:
+    rng = np.random.default_rng(42)
+    for i in range(count):
+        class_dir = root / f"class_{i % classes}"
+        class_dir.mkdir(parents=True, exist_ok=True)
+        pixels = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(class_dir / f"{i}.jpg", "JPEG", quality=90)
+    return root
+
+def directory_reader(images_dir: Path, image_size: list, batch_size: int) -> tf.data.Dataset:
+    return tf.keras.utils.image_dataset_from_directory(
+        directory=images_dir,
+        subset="training",
+        shuffle=True,
+        validation_split=0.20,
+        seed=42,
+        image_size=image_size,
+        batch_size=batch_size,
+        label_mode="categorical",
+        interpolation="bilinear",
+        verbose=False
+    )
+
+def epoch_throughput(dataset: tf.data.Dataset, epochs: int) -> list:
+    rescale = tf.keras.layers.Rescaling(1.0 / 255)
+    dataset = dataset.map(lambda x, y: (rescale(x), y), num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.prefetch(tf.data.AUTOTUNE)
+
+    rates = []
+    for _ in range(epochs):
+        images, start = 0, time.perf_counter()
+        for batch, _ in dataset:
+            images += int(batch.shape[0])
+        rates.append(images / (time.perf_counter() - start))
+    return rates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="artifacts/data_ingestion/data/images")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate this many JPEGs instead of using --data")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--image-size", type=int, nargs=2, default=[224, 224])
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="cnn_clf_input_bench_"))
+    images_dir = synthetic_images(workdir / "images", args.synthetic) if args.synthetic else Path(args.data)
+
+    start = time.perf_counter()
+    build_dataset_manifest(images_dir, workdir / "dataset_manifest.parquet")
+    manifest = write_tfrecord_shards(workdir / "dataset_manifest.parquet", workdir / "tfrecords", args.image_size, images_per_shard=500)
+    write_s = time.perf_counter() - start
+
+    tfrecord_ds, _, _ = tfrecord_dataset(workdir / "tfrecords", "training", args.batch_size, shuffle=True)
+    results = {
+        "images": manifest["splits"]["training"]["count"],
+        "shard_write_s": write_s,
+        "directory_images_per_s": epoch_throughput(directory_reader(images_dir, args.image_size, args.batch_size), args.epochs),
+        "tfrecord_images_per_s": epoch_throughput(tfrecord_ds, args.epochs)
+    }
+
+    print(f"{results['images']} training images, shards written in {write_s:.1f}s")
+    print(f"{'epoch':>5s} {'directory img/s':>16s} {'tfrecord img/s':>15s}")
+    for epoch, (old, new) in enumerate(zip(results["directory_images_per_s"], results["tfrecord_images_per_s"]), start=1):
+        print(f"{epoch:5d} {old:16.1f} {new:15.1f}")
+
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Serving load test: throughput, latency percentiles, error rate and server CPU/RSS.
+
+    python benchmarks/bench_load.py --concurrency 8 --duration 30
+    python benchmarks/bench_load.py --rate 20 --duration 60 --output bench/load.json
+    python benchmarks/bench_load.py --concurrency 4 --set prediction.executor=process --set prediction.max_workers=2
+    python benchmarks/bench_load.py --url http://staging:8080 --concurrency 16
+
+Unless `--url` is given, the app is started locally (`uvicorn app:app` as a
+subprocess, or in this process with `--in-process`) from a scratch directory
+holding a copy of config/config.yaml and params.yaml. Its model is an
+untrained (`weights=None`) `--backbone` unless `--model` points at one, and
+`--set section.key=value` overrides the copied config.
+
+Load is closed-loop with `--concurrency N` (N clients sending back to back)
+or open-loop with `--rate R` (Poisson arrivals at R requests/sec, latency
+measured from the scheduled arrival so a slow server cannot hide queueing).
+Every upload is a random JPEG from a pool of `--images`, made unique with a
+trailing byte sequence so the prediction cache never answers it. The first
+`--warmup` seconds are excluded. Server CPU and RSS (its worker processes
+included) are sampled from /proc every `--sample-interval` seconds, so they
+are only available on Linux; with `--in-process` they include the client.
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+import httpx
+import numpy as np
+import yaml
+from PIL import Image
+from common import build_dummy_model, free_port, percentiles, wait_for, write_results
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+def make_images(count: int, size: tuple, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        # Smooth noise compresses like a photo rather than like white noise
+        small = rng.integers(0, 256, size=(size[1] // 16, size[0] // 16, 3), dtype=np.uint8)
+        encoded = io.BytesIO()
+        Image.fromarray(small).resize(size, Image.BILINEAR).save(encoded, "JPEG", quality=90)
+        images.append(encoded.getvalue())
+    return images
+
+def override(config: dict, assignment: str):
+    key, _, value = assignment.partition("=")
+    *sections, name = key.split(".")
+    for section in sections:
+        config = config[section]
+    config[name] = yaml.safe_load(value)
+
+def prepare_workdir(args) -> Path:
+    """A scratch project directory: config pointing at the benchmark model, params, templates."""
+    workdir = Path(tempfile.mkdtemp(prefix="cnn_clf_load_"))
+    with open(REPO_ROOT / "config" / "config.yaml") as f:
+        config = yaml.safe_load(f)
+    with open(REPO_ROOT / "params.yaml") as f:
+        params = yaml.safe_load(f)
+
+    if args.model:
+        model_path = Path(args.model).resolve()
+    else:
+        model_path = build_dummy_model(params["IMAGE_SIZE"], path=workdir / "model.h5", backbone=args.backbone)
+    config["artifacts_root"] = str(workdir / "artifacts")
+    config["prediction"].update(backend="keras", model_path=str(model_path))
+    config["logging"].update(log_path=str(workdir / "logs" / "running_logs.log"), console=False)
+    for assignment in args.set:
+        override(config, assignment)
+
+    (workdir / "config").mkdir()
+    with open(workdir / "config" / "config.yaml", "w") as f:
+        yaml.safe_dump(config, f)
+    shutil.copy(REPO_ROOT / "params.yaml", workdir / "params.yaml")
+    (workdir / "templates").symlink_to(REPO_ROOT / "templates")
+    return workdir
+
+class LocalServer:
+    """`uvicorn app:app` from `workdir`, as a subprocess or on a thread of this process."""
+    def __init__(self, workdir: Path, in_process: bool):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.in_process = in_process
+        if in_process:
+            import uvicorn
+            os.chdir(workdir)
+            sys.path.insert(0, str(REPO_ROOT))
+            import app
+            self.server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=self.port, log_level="warning"))
+            self.thread = threading.Thread(target=self.server.run, daemon=True)
+            self.thread.start()
+            self.pid = os.getpid()
+        else:
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(self.port), "--log-level", "warning"],
+                cwd=workdir, env=env, stdout=subprocess.DEVNULL
+            )
+            self.pid = self.process.pid
+
+    def wait_ready(self, timeout: float) -> float:
+        return wait_for(f"{self.url}/readyz", time.perf_counter(), timeout, poll=0.2)
+
+    def stop(self):
+        if self.in_process:
+            self.server.should_exit = True
+            self.thread.join(timeout=30)
+        else:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+
+def _process_tree(pid: int) -> list:
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+def _cpu_seconds_and_rss(pid: int) -> tuple:
+    cpu, rss = 0.0, 0
+    for member in _process_tree(pid):
+        try:
+            with open(f"/proc/{member}/stat") as f:
+                # Fields after the parenthesised command name; utime and stime are 14 and 15
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{member}/statm") as f:
+                rss += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError):
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return cpu, rss
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU % (100 = one core) and RSS of a process tree on a background thread."""
+    def __init__(self, pid: int, interval: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        last_cpu, last_time = _cpu_seconds_and_rss(self.pid)[0], start
+        while not self._stop_event.wait(self.interval):
+            cpu, rss = _cpu_seconds_and_rss(self.pid)
+            now = time.perf_counter()
+            self.samples.append({
+                "t_s": round(now - start, 3),
+                "cpu_percent": 100.0 * (cpu - last_cpu) / (now - last_time),
+                "rss_mb": rss / 2 ** 20
+            })
+            last_cpu, last_time = cpu, now
+
+    def stop(self) -> list:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+class LoadGenerator:
+    def __init__(self, url: str, endpoint: str, images: list, batch_images: int, timeout: float):
+        self.url = url.rstrip("/") + ("/predict" if endpoint == "predict" else "/v1/predict/batch")
+        self.endpoint = endpoint
+        self.images = images
+        self.batch_images = batch_images
+        self.timeout = timeout
+        self.records = []  # (sent at, completed at, latency ms, status or exception name)
+        self._sequence = 0
+
+    def _upload(self) -> bytes:
+        self._sequence += 1
+        return random.choice(self.images) + self._sequence.to_bytes(8, "big")
+
+    async def request(self, client: httpx.AsyncClient, scheduled: float):
+        if self.endpoint == "predict":
+            files = {"file": ("image.jpg", self._upload(), "image/jpeg")}
+        else:
+            files = [("files", (f"image_{i}.jpg", self._upload(), "image/jpeg")) for i in range(self.batch_images)]
+        try:
+            response = await client.post(self.url, files=files)
+            outcome = response.status_code
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        now = time.perf_counter()
+        self.records.append((scheduled, now, (now - scheduled) * 1000.0, outcome))
+
+    async def closed_loop(self, concurrency: int, until: float):
+        async def client_loop(client):
+            while time.perf_counter() < until:
+                await self.request(client, time.perf_counter())
+
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+
+    async def open_loop(self, rate: float, until: float):
+        async with httpx.AsyncClient(timeout=self.timeout, limits=httpx.Limits(max_connections=None)) as client:
+            tasks = []
+            scheduled = time.perf_counter()
+            while scheduled < until:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                tasks.append(asyncio.create_task(self.request(client, scheduled)))
+                scheduled += random.expovariate(rate)
+            await asyncio.gather(*tasks)
+
+def summarize(records: list, start: float, end: float, images_per_request: int) -> dict:
+    """
+    Latency, errors and outcomes cover the requests sent in [start, end], however
+    late they completed; throughput and the timeline count completions in it.
+    """
+    sent = [(ms, outcome) for sent_at, _, ms, outcome in records if start <= sent_at <= end]
+    completed = [(done_at, outcome) for _, done_at, _, outcome in records if start <= done_at <= end]
+    ok = [ms for ms, outcome in sent if outcome == 200]
+    completed_ok = sum(outcome == 200 for _, outcome in completed)
+    elapsed = end - start
+    timeline = {}
+    for done_at, outcome in completed:
+        second = timeline.setdefault(int(done_at - start), {"requests": 0, "errors": 0})
+        second["requests"] += 1
+        second["errors"] += outcome != 200
+    return {
+        "requests": len(sent),
+        "throughput_rps": completed_ok / elapsed,
+        "images_per_sec": completed_ok * images_per_request / elapsed,
+        "error_rate": (len(sent) - len(ok)) / len(sent) if sent else 0.0,
+        "outcomes": {str(k): v for k, v in Counter(outcome for _, outcome in sent).items()},
+        "latency": percentiles(ok),
+        "timeline": [{"t_s": second, **counts} for second, counts in sorted(timeline.items())]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=None, help="closed loop: clients sending back to back (default: 4)")
+    load.add_argument("--rate", type=float, default=None, help="open loop: Poisson arrivals per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of load before measuring")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict",
+                        help="POST /predict, or /v1/predict/batch with --batch-images per request")
+    parser.add_argument("--batch-images", type=int, default=8)
+    parser.add_argument("--images", type=int, default=32, help="distinct synthetic images")
+    parser.add_argument("--source-size", type=int, nargs=2, default=[640, 480], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--url", default=None, help="load an already running server instead of starting one")
+    parser.add_argument("--in-process", action="store_true", help="run the server on a thread of this process")
+    parser.add_argument("--backbone", default="mobilenet_v3_small", help="untrained model served without --model")
+    parser.add_argument("--model", default=None, help="serve this .h5 model instead")
+    parser.add_argument("--set", action="append", default=[], metavar="SECTION.KEY=VALUE",
+                        help="override the served config/config.yaml, e.g. prediction.max_wait_ms=10")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+    if args.url and (args.in_process or args.model or args.set):
+        parser.error("--in-process, --model and --set only apply to a locally started server")
+    concurrency = args.concurrency or (4 if args.rate is None else None)
+
+    random.seed(args.seed)
+    images = make_images(args.images, tuple(args.source_size), args.seed)
+    server, sampler = None, None
+    if args.url is None:
+        server = LocalServer(prepare_workdir(args), args.in_process)
+        print(f"Server ready in {server.wait_ready(args.startup_timeout):.1f}s at {server.url}")
+    try:
+        generator = LoadGenerator(args.url or server.url, args.endpoint, images, args.batch_images, args.timeout)
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        measure_until = measure_from + args.duration
+        if server is not None and sys.platform.startswith("linux"):
+            sampler = ResourceSampler(server.pid, args.sample_interval)
+            sampler.start()
+        if concurrency:
+            asyncio.run(generator.closed_loop(concurrency, measure_until))
+        else:
+            asyncio.run(generator.open_loop(args.rate, measure_until))
+        resources = sampler.stop() if sampler else []
+    finally:
+        if server is not None:
+            server.stop()
+
+    images_per_request = args.batch_images if args.endpoint == "batch" else 1
+    results = {
+        "load": {"concurrency": concurrency} if concurrency else {"rate_rps": args.rate},
+        "endpoint": args.endpoint,
+        "images_per_request": images_per_request,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "server": args.url or ("in-process" if args.in_process else "subprocess"),
+        "model": args.model or f"{args.backbone} (weights=None)",
+        "overrides": args.set,
+        **summarize(generator.records, measure_from, measure_until, images_per_request)
+    }
+    measured = [s for s in resources if s["t_s"] >= args.warmup]
+    if measured:
+        cpu, rss = [s["cpu_percent"] for s in measured], [s["rss_mb"] for s in measured]
+        results["server_resources"] = {
+            "cpu_percent_mean": float(np.mean(cpu)),
+            "cpu_percent_max": float(np.max(cpu)),
+            "rss_mb_mean": float(np.mean(rss)),
+            "rss_mb_max": float(np.max(rss)),
+            "samples": resources
+        }
+
+    latency = results["latency"]
+    print(f"{'requests':>10s} {'req/s':>8s} {'img/s':>8s} {'errors':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    print(f"{results['requests']:10d} {results['throughput_rps']:8.2f} {results['images_per_sec']:8.2f} "
+          f"{results['error_rate']:8.2%} {latency.get('p50_ms', float('nan')):9.2f} "
+          f"{latency.get('p95_ms', float('nan')):9.2f} {latency.get('p99_ms', float('nan')):9.2f}")
+    if "server_resources" in results:
+        r = results["server_resources"]
+        print(f"server CPU {r['cpu_percent_mean']:.0f}% mean / {r['cpu_percent_max']:.0f}% max, "
+              f"RSS {r['rss_mb_mean']:.0f} MB mean / {r['rss_mb_max']:.0f} MB max")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Request latency with logging off, synchronous file logging and queued logging.
+
+    python benchmarks/bench_logging.py --requests 500
+    python benchmarks/bench_logging.py --log-lines 5 --output bench/logging.json
+
+Each request runs `PredictionPipeline.predict_batch` on one encoded JPEG
+(decode, preprocess, forward pass, cache disabled) with every prediction
+logged (`log_sample_rate: 1`), plus `--log-lines` further INFO lines. Modes:
+
+    off         no handlers and level WARNING, so INFO records are dropped
+    sync        a plain FileHandler on the root logger (the previous setup)
+    queue       `configure_logging`: QueueHandler + rotating file on a listener thread
+    queue_json  the same, writing JSON lines
+
+The cost of one `logger.info` call on the calling thread is reported
+separately. Logs go to a temporary directory; the console handler is off in
+every mode. Uses the trained model when it exists, otherwise an untrained
+`--backbone` of the same architecture.
+"""
+import argparse
+import io
+import logging
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+import numpy as np
+from PIL import Image
+from common import build_dummy_model, percentiles, write_results
+from cnn_classifier import logger
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.entity.pipeline_config import LoggingConfig
+from cnn_classifier.pipeline.predicton import PredictionPipeline
+from cnn_classifier.utils.logging_setup import LOG_FORMAT, configure_logging, stop_logging
+
+MODES = ["off", "sync", "queue", "queue_json"]
+
+def set_mode(mode: str, log_dir: Path):
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    if mode == "off":
+        root.setLevel(logging.WARNING)
+    elif mode == "sync":
+        handler = logging.FileHandler(log_dir / "sync.log")
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    else:
+        configure_logging(LoggingConfig(
+            log_path=log_dir / f"{mode}.log",
+            level="INFO",
+            json_lines=mode == "queue_json",
+            max_bytes=10 * 1024 * 1024,
+            backup_count=1,
+            console=False
+        ))
+
+def request_latency(pipeline: PredictionPipeline, image: bytes, requests: int, warmup: int, log_lines: int) -> dict:
+    def request(i: int):
+        pipeline.predict_batch([image])
+        for line in range(log_lines):
+            logger.info(f"request {i} step {line}", extra={"request_id": i})
+
+    for i in range(warmup):
+        request(i)
+    samples = []
+    for i in range(requests):
+        start = time.perf_counter()
+        request(i)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return percentiles(samples)
+
+def call_cost_us(calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info(f"call {i}", extra={"request_id": i})
+    return (time.perf_counter() - start) * 1e6 / calls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--log-lines", type=int, default=3, help="extra INFO lines per request")
+    parser.add_argument("--calls", type=int, default=20000, help="logger.info calls for the per-call cost")
+    parser.add_argument("--backbone", default="mobilenet_v3_small", help="untrained model used without a trained one")
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    config = ConfigurationManager().get_prediction_config()
+    if not config.model_path.exists():
+        config = replace(config, model_path=build_dummy_model(config.params_image_size, backbone=args.backbone))
+    config = replace(config, backend="keras", cache_max_entries=0, cache_sqlite_path=None, log_sample_rate=1.0)
+    pipeline = PredictionPipeline(config)
+
+    encoded = io.BytesIO()
+    Image.fromarray(np.random.randint(0, 256, size=(480, 640, 3), dtype=np.uint8)).save(encoded, "JPEG", quality=90)
+    image = encoded.getvalue()
+
+    log_dir = Path(tempfile.mkdtemp(prefix="cnn_clf_logging_"))
+    results = {"model_path": str(config.model_path), "log_lines": args.log_lines + 1, "modes": {}}
+    for mode in args.modes:
+        set_mode(mode, log_dir)
+        results["modes"][mode] = {
+            "request": request_latency(pipeline, image, args.requests, args.warmup, args.log_lines),
+            "logger_info_us": call_cost_us(args.calls)
+        }
+        stop_logging()
+    set_mode("off", log_dir)
+
+    print(f"{'mode':>12s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'info() us':>10s}")
+    for mode, r in results["modes"].items():
+        request = r["request"]
+        print(f"{mode:>12s} {request['p50_ms']:10.3f} {request['p95_ms']:10.3f} {request['p99_ms']:10.3f} {r['logger_info_us']:10.2f}")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
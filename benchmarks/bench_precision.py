@@ -0,0 +1,74 @@
+"""
+Training step time per epoch under each PRECISION policy.
+
+    python benchmarks/bench_precision.py --epochs 3 --steps 10
+    python benchmarks/bench_precision.py --precisions float32 mixed_bfloat16 mixed_float16
+
+Trains the stage 02 architecture (untrained VGG16 backbone, frozen, plus the
+softmax head) on random batches with the same compile settings as the
+training stage, once per policy, and reports ms/step and images/sec per
+epoch. Epoch 1 includes tracing and XLA compilation. bfloat16 pays off on
+CPUs with AVX512-BF16 or AMX (see `bf16_flags` in the output); elsewhere it is
+emulated and usually slower than float32.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+import tensorflow as tf
+from common import build_dummy_model, write_results
+from cnn_classifier.components.callbacks import StepTimeReport
+from cnn_classifier.components.training import compile_for_training
+from cnn_classifier.utils.tf_utilities import with_precision
+
+def cpu_bf16_flags() -> list:
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = next((line.split(":", 1)[1].split() for line in f if line.startswith("flags")), [])
+    except OSError:
+        return []
+    return sorted(flag for flag in flags if flag in ("avx512_bf16", "amx_bf16", "amx_tile"))
+
+def step_times(model_path: Path, precision: str, dataset: tf.data.Dataset, args) -> dict:
+    model = with_precision(tf.keras.models.load_model(model_path, compile=False), precision)
+    compile_for_training(model, learning_rate=0.01, precision=precision)
+
+    report = StepTimeReport(Path(tempfile.mkdtemp()) / "step_times.json", precision, args.batch_size)
+    model.fit(dataset, epochs=args.epochs, steps_per_epoch=args.steps, callbacks=[report], verbose=0)
+    return report.summary()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--precisions", nargs="+", default=["float32", "mixed_bfloat16"],
+                        choices=["float32", "mixed_bfloat16", "mixed_float16"])
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=10, help="steps per epoch")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    image_shape = (args.image_size, args.image_size, 3)
+    model_path = build_dummy_model(image_size=image_shape)
+    images = tf.random.uniform([args.batch_size, *image_shape])
+    labels = tf.one_hot(tf.random.uniform([args.batch_size], 0, 4, dtype=tf.int32), 4)
+    dataset = tf.data.Dataset.from_tensors((images, labels)).repeat()
+
+    results = {"bf16_flags": cpu_bf16_flags(), "batch_size": args.batch_size, "precisions": {}}
+    print(f"CPU bf16 flags: {', '.join(results['bf16_flags']) or 'none'}")
+    print(f"{'precision':>15s} " + " ".join(f"{'epoch ' + str(e + 1) + ' ms':>12s}" for e in range(args.epochs)) + f" {'img/s':>8s}")
+    for precision in args.precisions:
+        result = step_times(model_path, precision, dataset, args)
+        results["precisions"][precision] = result
+        epochs = " ".join(f"{e['step_time_ms']:12.1f}" for e in result["epochs"])
+        print(f"{precision:>15s} {epochs} {args.batch_size * 1000 / result['mean_step_time_ms']:8.1f}")
+
+    baseline = results["precisions"].get("float32")
+    if baseline:
+        for precision, result in results["precisions"].items():
+            if precision != "float32":
+                result["speedup_vs_float32"] = baseline["mean_step_time_ms"] / result["mean_step_time_ms"]
+                print(f"{precision} speedup vs float32: {result['speedup_vs_float32']:.2f}x")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
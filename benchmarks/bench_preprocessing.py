@@ -0,0 +1,89 @@
+"""
+Per-image preprocessing cost: the original float32 path vs ImagePreprocessor.
+
+    python benchmarks/bench_preprocessing.py --iterations 200
+
+For several source resolutions, encodes a synthetic JPEG and measures per-image
+wall time plus the number and size of Python/numpy allocations (tracemalloc).
+Allocations made inside PIL's C decoder are not visible to tracemalloc; the
+draft-mode decode reduces those too, which shows up in the timings.
+"""
+import argparse
+import io
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+from common import write_results
+from cnn_classifier.components.preprocessing import ImagePreprocessor
+
+TARGET_SIZE = (224, 224)
+
+def legacy_preprocess(data: bytes) -> np.ndarray:
+    # Former app.py + PredictionPipeline.predict path
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    if image.size != TARGET_SIZE:
+        image = image.resize(TARGET_SIZE)
+    array = np.asarray(image, dtype=np.float32)
+    array = array / 255.0
+    return np.expand_dims(array, axis=0)
+
+def synthetic_jpeg(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(42)
+    # Smooth gradients + noise compress like a photo rather than pure noise
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels += rng.normal(0, 12, pixels.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+def measure(fn, data: bytes, iterations: int) -> dict:
+    fn(data)  # warm caches outside the measurement
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(data)
+    per_image_ms = (time.perf_counter() - start) * 1000.0 / iterations
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn(data)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = [s for s in after.compare_to(before, "lineno") if s.count_diff > 0 or s.size_diff > 0]
+    return {
+        "per_image_ms": per_image_ms,
+        "peak_traced_bytes": peak,
+        "allocations": sum(s.count_diff for s in stats if s.count_diff > 0),
+        "allocated_bytes": sum(s.size_diff for s in stats if s.size_diff > 0)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sizes", nargs="+", default=["224x224", "640x480", "1920x1080", "4032x3024"])
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    preprocessor = ImagePreprocessor(TARGET_SIZE, capacity=1)
+    results = {}
+
+    print(f"{'source':>10s} {'path':>8s} {'ms/img':>8s} {'peak KB':>9s} {'allocs':>7s}")
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        data = synthetic_jpeg(width, height)
+        results[size] = {
+            "legacy": measure(legacy_preprocess, data, args.iterations),
+            "buffered": measure(lambda d: preprocessor.load_into(d, 0), data, args.iterations)
+        }
+        for path, r in results[size].items():
+            print(f"{size:>10s} {path:>8s} {r['per_image_ms']:8.2f} {r['peak_traced_bytes'] / 1024:9.1f} {r['allocations']:7d}")
+
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Serving cold start: time from process launch to first served byte and to readiness.
+
+    python benchmarks/bench_startup.py --trials 3
+
+Starts `uvicorn app:app` from the current directory (run it from the repository
+root) and polls `GET /` until it answers, then `GET /readyz` until the model is
+loaded. Before model loading moved into the background, both numbers were the
+same: the first byte was only served after TensorFlow and the model had loaded.
+"""
+import argparse
+import subprocess
+import sys
+import time
+import numpy as np
+from common import free_port, wait_for, write_results
+
+def run_trial(timeout: float) -> dict:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        first_byte = wait_for(f"http://127.0.0.1:{port}/", started, timeout)
+        ready = wait_for(f"http://127.0.0.1:{port}/readyz", started, timeout)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"first_byte_s": first_byte, "ready_s": ready}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    trials = []
+    for i in range(args.trials):
+        trial = run_trial(args.timeout)
+        trials.append(trial)
+        print(f"trial {i + 1}: first byte {trial['first_byte_s']:.2f}s, ready {trial['ready_s']:.2f}s")
+
+    results = {
+        "trials": trials,
+        "median_first_byte_s": float(np.median([t["first_byte_s"] for t in trials])),
+        "median_ready_s": float(np.median([t["ready_s"] for t in trials]))
+    }
+    print(f"median: first byte {results['median_first_byte_s']:.2f}s, ready {results['median_ready_s']:.2f}s")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
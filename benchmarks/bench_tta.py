@@ -0,0 +1,150 @@
+"""
+Test-time augmentation cost versus the number of views K, and its calibration.
+
+    python benchmarks/bench_tta.py --views 1 2 4 9
+    python benchmarks/bench_tta.py --calibrate --output bench/tta.json
+
+For each K, times `PredictionPipeline.predict_proba_batch` on one encoded
+JPEG with `tta_views=K` (one decode, K views, one forward pass) against K
+separate single-view calls, the cost of TTA without batching, and splits
+the batched time into decode, preprocess and inference.
+
+With `--calibrate`, every K is also run over the validation split of the
+dataset manifest written by stage 01, fitting the `prediction.tta_temperature`
+that minimises the negative log-likelihood, and accuracy, NLL and expected
+calibration error (ECE) are reported before and after scaling. This needs
+the trained model. Uses the trained model when it exists, otherwise an
+untrained `--backbone` of the same architecture.
+"""
+import argparse
+import io
+import time
+from dataclasses import replace
+import numpy as np
+from PIL import Image
+from common import build_dummy_model, percentiles, write_results
+from cnn_classifier.components.dataset_manifest import read_manifest_split
+from cnn_classifier.components.tta import TTA_VIEWS, fit_temperature, log_probabilities, softmax
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.pipeline.predicton import PredictionPipeline
+
+def time_views(pipeline: PredictionPipeline, image: bytes, views: int, iterations: int, warmup: int) -> dict:
+    def batched():
+        timings = {}
+        pipeline.predict_proba_batch([image], timings=timings, tta_views=views)
+        return timings
+
+    def separate():
+        for _ in range(views):
+            pipeline.predict_proba_batch([image], tta_views=1)
+
+    for _ in range(warmup):
+        batched()
+        separate()
+    batched_ms, separate_ms, stages = [], [], {"decode": [], "preprocess": [], "inference": []}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        timings = batched()
+        batched_ms.append((time.perf_counter() - start) * 1000.0)
+        for stage in ("decode", "preprocess"):
+            stages[stage].append(sum(timings[stage]) * 1000.0)
+        stages["inference"].append(timings["inference"] * 1000.0)
+
+        start = time.perf_counter()
+        separate()
+        separate_ms.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "batched": percentiles(batched_ms),
+        "separate_calls": percentiles(separate_ms),
+        "stages_mean_ms": {stage: float(np.mean(samples)) for stage, samples in stages.items()}
+    }
+
+def expected_calibration_error(probabilities: np.ndarray, labels: np.ndarray, bins: int = 15) -> float:
+    confidence, predicted = probabilities.max(axis=1), probabilities.argmax(axis=1)
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            error += in_bin.mean() * abs((predicted[in_bin] == labels[in_bin]).mean() - confidence[in_bin].mean())
+    return float(error)
+
+def negative_log_likelihood(probabilities: np.ndarray, labels: np.ndarray) -> float:
+    return float(-np.mean(log_probabilities(probabilities[np.arange(len(labels)), labels])))
+
+def calibrate(pipeline: PredictionPipeline, paths: list, labels: np.ndarray, views: int, batch_size: int) -> dict:
+    probabilities = []
+    for start in range(0, len(paths), batch_size):
+        probabilities.extend(pipeline.predict_proba_batch(paths[start:start + batch_size], tta_views=views))
+    logits = log_probabilities(np.stack(probabilities))
+    temperature = fit_temperature(logits, labels)
+    raw, scaled = softmax(logits), softmax(logits / temperature)
+    return {
+        "accuracy": float((raw.argmax(axis=1) == labels).mean()),
+        "temperature": temperature,
+        "nll": negative_log_likelihood(raw, labels),
+        "nll_calibrated": negative_log_likelihood(scaled, labels),
+        "ece": expected_calibration_error(raw, labels),
+        "ece_calibrated": expected_calibration_error(scaled, labels)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", type=int, nargs="+", default=[1, 2, 4, 9], choices=range(1, len(TTA_VIEWS) + 1))
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--source-size", type=int, nargs=2, default=[640, 480], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--backbone", default="vgg16", help="untrained model used without a trained one")
+    parser.add_argument("--calibrate", action="store_true", help="fit the temperature on the validation split")
+    parser.add_argument("--calibration-batch", type=int, default=16, help="images per forward pass when calibrating")
+    parser.add_argument("--output", default=None, help="optional JSON results path")
+    args = parser.parse_args()
+
+    manager = ConfigurationManager()
+    config = manager.get_prediction_config()
+    if not config.model_path.exists():
+        if args.calibrate:
+            parser.error(f"--calibrate needs the trained model at {config.model_path}")
+        config = replace(config, model_path=build_dummy_model(config.params_image_size, backbone=args.backbone))
+    config = replace(
+        config, backend="keras", cache_max_entries=0, cache_sqlite_path=None,
+        tta_temperature=1.0, log_sample_rate=0.0, max_batch_size=max(args.views)
+    )
+    pipeline = PredictionPipeline(config)
+
+    encoded = io.BytesIO()
+    Image.fromarray(
+        np.random.randint(0, 256, size=(args.source_size[1], args.source_size[0], 3), dtype=np.uint8)
+    ).save(encoded, "JPEG", quality=90)
+    image = encoded.getvalue()
+
+    results = {"model_path": str(config.model_path), "source_size": args.source_size, "views": {}}
+    for views in args.views:
+        results["views"][str(views)] = {
+            "names": [view.name for view in TTA_VIEWS[:views]],
+            **time_views(pipeline, image, views, args.iterations, args.warmup)
+        }
+
+    baseline = results["views"].get("1", {}).get("batched", {}).get("p50_ms")
+    print(f"{'K':>3s} {'p50 ms':>9s} {'p95 ms':>9s} {'x K=1':>7s} {'K calls ms':>11s} {'decode':>8s} {'preproc':>8s} {'infer':>8s}")
+    for views, r in results["views"].items():
+        batched, stages = r["batched"], r["stages_mean_ms"]
+        relative = f"{batched['p50_ms'] / baseline:7.2f}" if baseline else f"{'-':>7s}"
+        print(f"{views:>3s} {batched['p50_ms']:9.2f} {batched['p95_ms']:9.2f} {relative} {r['separate_calls']['p50_ms']:11.2f} "
+              f"{stages['decode']:8.2f} {stages['preprocess']:8.2f} {stages['inference']:8.2f}")
+
+    if args.calibrate:
+        paths, labels = read_manifest_split(manager.get_evaluation_config().dataset_manifest, "validation")
+        labels = np.asarray(labels)
+        print(f"\nCalibrating on {len(paths)} validation images")
+        print(f"{'K':>3s} {'accuracy':>9s} {'T':>6s} {'NLL':>7s} {'NLL (T)':>8s} {'ECE':>7s} {'ECE (T)':>8s}")
+        for views in args.views:
+            r = calibrate(pipeline, paths, labels, views, args.calibration_batch)
+            results["views"][str(views)]["calibration"] = r
+            print(f"{views:>3d} {r['accuracy']:9.4f} {r['temperature']:6.2f} {r['nll']:7.4f} {r['nll_calibrated']:8.4f} "
+                  f"{r['ece']:7.4f} {r['ece_calibrated']:8.4f}")
+        print("Set prediction.tta_temperature to the T of the tta_views you serve with.")
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
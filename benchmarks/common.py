@@ -0,0 +1,79 @@
+"""Shared helpers for the scripts in benchmarks/."""
+import json
+import os
+import platform
+import socket
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+import numpy as np
+
+def percentiles(samples_ms: list) -> dict:
+    """Summarise latency samples (milliseconds) as mean / p50 / p95 / p99 / max."""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    if samples.size == 0:
+        return {"n": 0}
+    return {
+        "n": int(samples.size),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "max_ms": float(samples.max())
+    }
+
+def build_dummy_model(image_size=(224, 224, 3), classes: int = 4, path: Path = None, backbone: str = "vgg16") -> Path:
+    """
+    Build and save an untrained (`weights=None`) classifier with the same
+    architecture as stage 02 for `backbone`, so benchmarks run without the
+    trained artifact.
+    """
+    from cnn_classifier.components.backbones import build_backbone, get_backbone
+    from cnn_classifier.components.model_definition import BaseModel
+
+    base = build_backbone(backbone, input_shape=list(image_size), weights=None)
+    model = BaseModel.define_full_model(
+        model=base, classes=classes, freez_all=True, freeze_till=None, pooling=get_backbone(backbone).pooling
+    )
+
+    if path is None:
+        path = Path(tempfile.mkdtemp(prefix="cnn_clf_bench_")) / "model.h5"
+    model.save(path)
+    return Path(path)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(url: str, started: float, timeout: float, poll: float = 0.01) -> float:
+    """Return seconds since `started` at which `url` first answered 200."""
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    response.read(1)
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(poll)
+    raise TimeoutError(f"{url} did not answer within {timeout}s")
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+def write_results(path, results: dict):
+    if path is None:
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), **results}, f, indent=4)
+    print(f"Results written to {path}")
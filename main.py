@@ -1,4 +1,4 @@
-from cnn_classifier.utils.utilities import configure_tf_gpu_memory_growth
+from cnn_classifier.utils.tf_utilities import configure_tf_gpu_memory_growth
 import os
 import random
 import numpy as np
@@ -16,7 +16,11 @@ from cnn_classifier.pipeline.stage01_data_ingestion import DataIngestionPipeline
 from cnn_classifier.pipeline.stage02_model_definition import ModelDefinitionPipeline
 from cnn_classifier.pipeline.stage03_training import ModelTrainingPipeline
 from cnn_classifier.pipeline.stage04_evaluation import ModelEvaluationPipeline
+from cnn_classifier.pipeline.stage05_model_export import ModelExportPipeline
 from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
+
+configure_logging()
 
 # Stage 01 - Data Ingestion Pipeline
 STAGE_NAME = "Stage 01 - Data Ingestion"
@@ -59,6 +63,17 @@ try:
     model_evaluation_obj = ModelEvaluationPipeline()
     model_evaluation_obj.execute_model_evaluation()
     logger.info(f">>> {STAGE_NAME}: completed\n")
+except Exception as e:
+    logger.exception(e)
+    raise e
+
+# Stage 05 - Model Export
+STAGE_NAME = "Stage 05 - Model Export"
+try:
+    logger.info(f">>> {STAGE_NAME}: started")
+    model_export_obj = ModelExportPipeline()
+    model_export_obj.execute_model_export()
+    logger.info(f">>> {STAGE_NAME}: completed\n")
 except Exception as e:
     logger.exception(e)
     raise e
\ No newline at end of file
@@ -1,20 +1,5 @@
-import os
-import sys
 import logging
 
-loggin_str = f"[%(asctime)s]: %(name)s - %(levelname)s - %(module)s - %(message)s"
-
-log_dir = "logs"
-log_filepath = os.path.join(log_dir, "running_logs.log")
-os.makedirs(log_dir, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format=loggin_str,
-    handlers=[
-        logging.FileHandler(log_filepath),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-logger = logging.getLogger("cnnClassiferLogger")
\ No newline at end of file
+# Handlers are attached by `cnn_classifier.utils.logging_setup.configure_logging`,
+# which each entry point calls; importing the package does no I/O.
+logger = logging.getLogger("cnnClassiferLogger")
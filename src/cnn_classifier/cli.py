@@ -0,0 +1,136 @@
+"""
+Command line entry point, installed as `cnn-classifier`.
+
+    cnn-classifier predict-bulk artifacts/incoming/ results.csv
+    cnn-classifier predict-bulk "farm_cameras/**/*.jpg" results.parquet --batch-size 256
+    cnn-classifier predict-bulk farm_camera_0412.zip results.jsonl
+    cnn-classifier train --workers 4
+
+Run from the project root so `config/config.yaml` and `params.yaml` are found.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
+
+def predict_bulk(args: argparse.Namespace):
+    # Deferred so `cnn-classifier --help` does not import TensorFlow
+    from cnn_classifier.config.configuration import ConfigurationManager
+    from cnn_classifier.components.bulk_prediction import BulkPrediction
+
+    config = ConfigurationManager()
+    bulk_prediction_config = config.get_bulk_prediction_config(
+        source=args.source,
+        output_path=args.output,
+        output_format=args.format,
+        batch_size=args.batch_size,
+        overwrite=args.overwrite
+    )
+    prediction_config = config.get_prediction_config()
+    if args.backend:
+        from dataclasses import replace
+        prediction_config = replace(prediction_config, backend=args.backend)
+
+    bulk_prediction = BulkPrediction.from_prediction_config(bulk_prediction_config, prediction_config)
+    bulk_prediction.run()
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+def train(args: argparse.Namespace):
+    """
+    Run the training stage as `--workers` local processes forming one
+    MultiWorkerMirroredStrategy cluster (DISTRIBUTION_STRATEGY: multi_worker).
+    Each process gets its own TF_CONFIG and an equal share of the CPU cores.
+    """
+    from cnn_classifier.config.configuration import ConfigurationManager
+
+    strategy = ConfigurationManager().params.DISTRIBUTION_STRATEGY
+    if strategy != "multi_worker":
+        raise ValueError(f"`train` launches multi-worker training; set DISTRIBUTION_STRATEGY: multi_worker (is {strategy})")
+
+    cluster = {"worker": [f"localhost:{_free_port()}" for _ in range(args.workers)]}
+    threads = str(max(1, (os.cpu_count() or 1) // args.workers))
+    logger.info(f"Launching {args.workers} training workers: {', '.join(cluster['worker'])}")
+
+    workers = []
+    for index in range(args.workers):
+        env = dict(os.environ, TF_CONFIG=json.dumps({"cluster": cluster, "task": {"type": "worker", "index": index}}))
+        env.setdefault("TF_NUM_INTRAOP_THREADS", threads)
+        workers.append(subprocess.Popen([sys.executable, "-m", "cnn_classifier.pipeline.stage03_training"], env=env))
+
+    try:
+        # A worker that dies leaves the others blocked in collectives, so stop them all
+        while any(worker.poll() is None for worker in workers):
+            failed = [index for index, worker in enumerate(workers) if worker.returncode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"Training worker(s) {failed} failed")
+            time.sleep(1)
+        failed = [index for index, worker in enumerate(workers) if worker.returncode != 0]
+        if failed:
+            raise RuntimeError(f"Training worker(s) {failed} failed")
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+        for worker in workers:
+            worker.wait()
+    logger.info("Multi-worker training completed")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cnn-classifier",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bulk = subparsers.add_parser(
+        "predict-bulk",
+        help="score a directory, glob pattern or zip/tar archive of images",
+        description="Score images offline and stream results to CSV, JSONL or Parquet. "
+                    "Rerunning with the same output resumes after the last written result."
+    )
+    bulk.add_argument("source", help="directory, glob pattern (quote it) or zip/tar archive")
+    bulk.add_argument("output", help="results file (.csv, .jsonl) or Parquet directory (.parquet)")
+    bulk.add_argument("--format", choices=["csv", "jsonl", "parquet"], default=None,
+                      help="output format; inferred from the output suffix by default")
+    bulk.add_argument("--batch-size", type=int, default=None,
+                      help="images per forward pass (default: bulk_prediction.batch_size)")
+    bulk.add_argument("--backend", choices=["keras", "tflite"], default=None,
+                      help="inference backend (default: prediction.backend)")
+    bulk.add_argument("--overwrite", action="store_true",
+                      help="discard existing results instead of resuming")
+    bulk.set_defaults(handler=predict_bulk)
+
+    train_parser = subparsers.add_parser(
+        "train",
+        help="run the training stage as several local worker processes",
+        description="Launch the training stage as a multi-worker cluster on this machine "
+                    "(requires DISTRIBUTION_STRATEGY: multi_worker in params.yaml). "
+                    "Worker 0 writes the trained model."
+    )
+    train_parser.add_argument("--workers", type=int, default=2, help="number of worker processes (default: 2)")
+    train_parser.set_defaults(handler=train)
+
+    return parser
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging()
+    try:
+        args.handler(args)
+    except Exception as e:
+        logger.exception(e)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import math
+import tensorflow as tf
+
+class FusedAffineAugmentation:
+    """
+    Random rotation, horizontal flip, translation, zoom and shear as one warp.
+
+    The five transforms are composed into a single 3x3 affine matrix per
+    image and applied with one `ImageProjectiveTransformV3` call per batch, so
+    each image is resampled once instead of once per Keras layer. Ranges and
+    fill mode match the former Keras layer stack.
+
+    With `seed` set, every batch draws its parameters from stateless RNG ops
+    seeded from a deterministic per-batch stream, so runs are reproducible
+    (new transforms each epoch, the same ones on every run).
+
+    Args:
+        rotation (float): maximum rotation in degrees.
+        translation (float): maximum shift as a fraction of height/width.
+        zoom (float): maximum zoom in or out as a fraction.
+        shear (float): maximum shear along each axis.
+        horizontal_flip (bool): flip half of the images left-right.
+        fill_mode (str): how to fill pixels sampled from outside the image.
+        seed (int, optional): enables the deterministic mode.
+    """
+    def __init__(
+            self,
+            rotation: float = 40.0,
+            translation: float = 0.2,
+            zoom: float = 0.2,
+            shear: float = 0.2,
+            horizontal_flip: bool = True,
+            fill_mode: str = "reflect",
+            seed: int = None):
+        self.rotation = math.radians(rotation)
+        self.translation = translation
+        self.zoom = zoom
+        self.shear = shear
+        self.horizontal_flip = horizontal_flip
+        self.fill_mode = fill_mode.upper()
+        self.seed = seed
+
+    def _uniform(self, shape, minval, maxval, seed, offset: int):
+        if seed is None:
+            return tf.random.uniform(shape, minval, maxval)
+        # Each parameter gets its own stream derived from the batch seed
+        return tf.random.stateless_uniform(shape, seed + tf.constant([0, offset], tf.int64), minval, maxval)
+
+    def transforms(self, batch_size, height, width, seed=None) -> tf.Tensor:
+        """
+        Sample [batch_size, 8] output-to-input transforms for ImageProjectiveTransformV3.
+        """
+        height = tf.cast(height, tf.float32)
+        width = tf.cast(width, tf.float32)
+        shape = [batch_size]
+
+        angle = self._uniform(shape, -self.rotation, self.rotation, seed, 1)
+        tx = self._uniform(shape, -self.translation, self.translation, seed, 2) * width
+        ty = self._uniform(shape, -self.translation, self.translation, seed, 3) * height
+        zx = 1.0 + self._uniform(shape, -self.zoom, self.zoom, seed, 4)
+        zy = 1.0 + self._uniform(shape, -self.zoom, self.zoom, seed, 5)
+        sx = self._uniform(shape, -self.shear, self.shear, seed, 6)
+        sy = self._uniform(shape, -self.shear, self.shear, seed, 7)
+        flip = tf.ones(shape)
+        if self.horizontal_flip:
+            flip = tf.where(self._uniform(shape, 0.0, 1.0, seed, 8) < 0.5, -1.0, 1.0)
+
+        # Inverse (output -> input) map about the image centre:
+        # p_in = A @ (p_out - c - t) + c, with A = (R . Sh . Z . F)^-1 = F^-1 Z^-1 Sh^-1 R^-1
+        cos, sin = tf.cos(angle), tf.sin(angle)
+        r_inv = [[cos, sin], [-sin, cos]]
+        det = 1.0 - sx * sy
+        sh_inv = [[1.0 / det, -sx / det], [-sy / det, 1.0 / det]]
+
+        def matmul(a, b):
+            return [[a[i][0] * b[0][j] + a[i][1] * b[1][j] for j in range(2)] for i in range(2)]
+
+        a = matmul(sh_inv, r_inv)
+        a = [[a[0][0] * flip / zx, a[0][1] * flip / zx], [a[1][0] / zy, a[1][1] / zy]]
+
+        cx, cy = (width - 1.0) / 2.0, (height - 1.0) / 2.0
+        ox, oy = -cx - tx, -cy - ty
+        zeros = tf.zeros(shape)
+        return tf.stack([
+            a[0][0], a[0][1], a[0][0] * ox + a[0][1] * oy + cx,
+            a[1][0], a[1][1], a[1][0] * ox + a[1][1] * oy + cy,
+            zeros, zeros
+        ], axis=1)
+
+    def __call__(self, images: tf.Tensor, seed=None) -> tf.Tensor:
+        """Augment a float batch [N, H, W, C] with one projective warp."""
+        shape = tf.shape(images)
+        return tf.raw_ops.ImageProjectiveTransformV3(
+            images=images,
+            transforms=self.transforms(shape[0], shape[1], shape[2], seed),
+            output_shape=shape[1:3],
+            fill_value=0.0,
+            interpolation="BILINEAR",
+            fill_mode=self.fill_mode
+        )
+
+    def apply(self, dataset: tf.data.Dataset, preprocess=None) -> tf.data.Dataset:
+        """
+        Map over a batched (images, labels) dataset, optionally running
+        `preprocess` (e.g. rescaling) on the images first.
+        """
+        preprocess = preprocess or (lambda x: tf.cast(x, tf.float32))
+        if self.seed is None:
+            return dataset.map(
+                lambda x, y: (self(preprocess(x)), y),
+                num_parallel_calls=tf.data.AUTOTUNE
+            )
+
+        # A seeded stream that differs per epoch but is identical across runs
+        seeds = tf.data.Dataset.random(seed=self.seed, rerandomize_each_iteration=True).batch(2)
+        return tf.data.Dataset.zip((dataset, seeds)).map(
+            lambda batch, seed: (self(preprocess(batch[0]), seed), batch[1]),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
@@ -0,0 +1,121 @@
+import re
+import numpy as np
+import tensorflow as tf
+from dataclasses import dataclass
+from typing import Callable
+
+# ImageNet channel means of the "caffe" preprocessing (ResNet50), RGB order, 0-255 scale
+CAFFE_MEAN_RGB = [123.68, 116.779, 103.939]
+
+@dataclass(frozen=True)
+class Backbone:
+    """
+    A `tf.keras.applications` feature extractor plus what the rest of the
+    pipeline needs to know about it.
+
+    Attributes:
+        application: builds the network from `input_tensor`, `weights` and `include_top`.
+        preprocessing: layers mapping the pipeline's [0, 1] RGB input to what
+            the pretrained weights expect. They are part of the saved model,
+            so evaluation, export and serving need no backbone-specific code.
+        pooling: head pooling, "flatten" or "avg" (GlobalAveragePooling2D).
+        block_pattern: regex whose match on a layer name identifies its block
+            for FINE_TUNE_STAGES; layers that do not match join the block below.
+    """
+    application: Callable
+    preprocessing: Callable = lambda: []
+    pooling: str = "avg"
+    block_pattern: str = r"[^_]+"
+
+BACKBONES = {
+    # Kept on 1/255 inputs and a Flatten head, as trained by earlier versions
+    "vgg16": Backbone(
+        application=tf.keras.applications.VGG16,
+        pooling="flatten"
+    ),
+    "mobilenet_v3_large": Backbone(
+        application=lambda **kwargs: tf.keras.applications.MobileNetV3Large(include_preprocessing=False, **kwargs),
+        preprocessing=lambda: [tf.keras.layers.Rescaling(2.0, offset=-1.0, name="preprocessing")],  # [-1, 1]
+        block_pattern=r"expanded_conv(?:_\d+)?|conv(?:_\d+)?"
+    ),
+    "mobilenet_v3_small": Backbone(
+        application=lambda **kwargs: tf.keras.applications.MobileNetV3Small(include_preprocessing=False, **kwargs),
+        preprocessing=lambda: [tf.keras.layers.Rescaling(2.0, offset=-1.0, name="preprocessing")],
+        block_pattern=r"expanded_conv(?:_\d+)?|conv(?:_\d+)?"
+    ),
+    # EfficientNet rescales and normalizes 0-255 inputs itself
+    "efficientnet_b0": Backbone(
+        application=tf.keras.applications.EfficientNetB0,
+        preprocessing=lambda: [tf.keras.layers.Rescaling(255.0, name="preprocessing")]
+    ),
+    # Caffe style: 0-255 minus the channel means; the BGR order is folded into conv1 (see `build_backbone`)
+    "resnet50": Backbone(
+        application=tf.keras.applications.ResNet50,
+        preprocessing=lambda: [tf.keras.layers.Normalization(
+            mean=[m / 255 for m in CAFFE_MEAN_RGB], variance=[(1 / 255) ** 2] * 3, name="preprocessing"
+        )]
+    ),
+}
+
+def get_backbone(name: str) -> Backbone:
+    if name not in BACKBONES:
+        raise ValueError(f"Unknown BACKBONE '{name}', expected one of {', '.join(BACKBONES)}")
+    return BACKBONES[name]
+
+def _constant_ops_as_layers(model: tf.keras.Model) -> tf.keras.Model:
+    """
+    Rewrite `x + c` and `x * c` op nodes (MobileNetV3's hard sigmoid) as
+    equivalent Rescaling layers. The .h5 format drops the op's module, so on
+    loading they would resolve to the Add/Multiply merge layers and fail.
+    """
+    config = model.get_config()
+    rewritten = 0
+    for layer in config["layers"]:
+        if layer.get("module") != "keras.src.ops.numpy" or layer["class_name"] not in ("Add", "Multiply"):
+            continue
+        (node,) = layer["inbound_nodes"]
+        tensors = [arg for arg in node["args"] if isinstance(arg, dict)]
+        constants = [arg for arg in node["args"] if isinstance(arg, (int, float))]
+        if len(tensors) != 1 or len(constants) != 1 or node["kwargs"]:
+            continue
+        scale, offset = (1.0, constants[0]) if layer["class_name"] == "Add" else (constants[0], 0.0)
+        layer.update(
+            module="keras.layers",
+            class_name="Rescaling",
+            registered_name=None,
+            config={"name": layer["name"], "scale": scale, "offset": offset}
+        )
+        node["args"] = tensors
+        rewritten += 1
+    if not rewritten:
+        return model
+
+    rebuilt = tf.keras.Model.from_config(config)
+    rebuilt.set_weights(model.get_weights())
+    return rebuilt
+
+def build_backbone(name: str, input_shape: list, weights, include_top: bool = False) -> tf.keras.Model:
+    """
+    Build backbone `name` as one functional model on [0, 1] RGB images, its
+    preprocessing layers included. Layers are not nested in a sub-model, so
+    they can be frozen and unfrozen individually.
+    """
+    backbone = get_backbone(name)
+    inputs = tf.keras.Input(shape=input_shape)
+    x = inputs
+    for layer in backbone.preprocessing():
+        x = layer(x)
+    model = backbone.application(input_tensor=x, weights=weights, include_top=include_top)
+
+    if name == "resnet50" and weights is not None:
+        # The ImageNet weights expect BGR; reversing conv1's input channels is
+        # the same as converting every image
+        conv1 = model.get_layer("conv1_conv")
+        kernel, bias = conv1.get_weights()
+        conv1.set_weights([np.ascontiguousarray(kernel[:, :, ::-1, :]), bias])
+    return _constant_ops_as_layers(model)
+
+def block_key(backbone: str, layer_name: str):
+    """The FINE_TUNE_STAGES block `layer_name` starts or belongs to (None: the block below)."""
+    match = re.match(get_backbone(backbone).block_pattern, layer_name)
+    return match.group(0) if match else None
@@ -0,0 +1,258 @@
+import csv
+import glob
+import json
+import os
+import shutil
+import time
+from dataclasses import replace
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.constants import CLASS_NAMES
+from cnn_classifier.entity.pipeline_config import BulkPredictionConfig, PredictionConfig
+from cnn_classifier.components.inference_backend import load_backend
+from cnn_classifier.utils.archives import IMAGE_EXTENSIONS, is_archive, iter_archive_images
+
+RESULT_COLUMNS = ["path", "class", "confidence", *CLASS_NAMES]
+
+def _truncate_partial_line(path: Path):
+    """Drop a trailing half-written line left behind by a crash."""
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+class CsvResultWriter:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def done(self) -> set:
+        if not self.path.exists():
+            return set()
+        _truncate_partial_line(self.path)
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return {row["path"] for row in csv.DictReader(f)}
+
+    def open(self):
+        new_file = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+        if new_file:
+            self._writer.writeheader()
+
+    def write(self, rows: list):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class JsonlResultWriter:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def done(self) -> set:
+        if not self.path.exists():
+            return set()
+        _truncate_partial_line(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            return {json.loads(line)["path"] for line in f if line.strip()}
+
+    def open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, rows: list):
+        for row in rows:
+            record = {
+                "path": row["path"],
+                "class": row["class"],
+                "confidence": row["confidence"],
+                "probabilities": {name: row[name] for name in CLASS_NAMES}
+            }
+            self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class ParquetResultWriter:
+    """
+    Writes a directory of Parquet part files.
+
+    A Parquet file is only readable once its footer is written, so rows are
+    buffered and committed as a new part every `rows_per_file` rows (written
+    to a temporary name, then renamed). A crash loses at most one part.
+    """
+    def __init__(self, path: Path, rows_per_file: int):
+        self.path = path
+        self.rows_per_file = rows_per_file
+
+    def _parts(self) -> list:
+        return sorted(self.path.glob("part-*.parquet"))
+
+    def done(self) -> set:
+        import pyarrow.parquet as pq
+
+        if not self.path.exists():
+            return set()
+        for tmp in self.path.glob("*.tmp"):
+            tmp.unlink()
+        done = set()
+        for part in self._parts():
+            done.update(pq.read_table(part, columns=["path"]).column("path").to_pylist())
+        return done
+
+    def open(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._next_part = len(self._parts())
+        self._buffer = []
+
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._buffer:
+            return
+        part = self.path / f"part-{self._next_part:05d}.parquet"
+        tmp = part.with_suffix(".tmp")
+        pq.write_table(pa.Table.from_pylist(self._buffer), tmp)
+        os.replace(tmp, part)
+        self._next_part += 1
+        self._buffer = []
+
+    def write(self, rows: list):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.rows_per_file:
+            self._flush()
+
+    def close(self):
+        self._flush()
+
+class BulkPrediction:
+    """
+    Offline scoring of a directory, glob pattern, or zip/tar archive of images.
+
+    Files are read and decoded in parallel by a tf.data pipeline and scored in
+    batches of `batch_size`; results are appended to the output as each batch
+    finishes. Paths already present in the output are skipped, so an
+    interrupted job picks up where it stopped when rerun with the same output.
+    Images that cannot be decoded are logged and skipped.
+    """
+    def __init__(self, config: BulkPredictionConfig, backend):
+        self.config = config
+        self.backend = backend
+        self.target_size = tuple(config.params_image_size[:-1])  # e.g., (224, 224)
+
+    @classmethod
+    def from_prediction_config(cls, config: BulkPredictionConfig, prediction_config: PredictionConfig):
+        """Load the serving backend (Keras or TFLite) sized for bulk batches."""
+        prediction_config = replace(prediction_config, max_batch_size=config.batch_size)
+        return cls(config, load_backend(prediction_config))
+
+    def _writer(self):
+        if self.config.output_format == "csv":
+            return CsvResultWriter(self.config.output_path)
+        if self.config.output_format == "jsonl":
+            return JsonlResultWriter(self.config.output_path)
+        if self.config.output_format == "parquet":
+            return ParquetResultWriter(self.config.output_path, self.config.parquet_rows_per_file)
+        raise ValueError(f"Unknown output format '{self.config.output_format}', expected csv, jsonl or parquet")
+
+    def _list_files(self) -> list:
+        source = Path(self.config.source)
+        if source.is_dir():
+            files = (p for p in source.rglob("*") if p.is_file())
+        elif source.is_file():
+            files = [source]
+        else:
+            files = (Path(p) for p in glob.glob(self.config.source, recursive=True))
+        return sorted(str(p) for p in files if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+    def _source_is_archive(self) -> bool:
+        source = Path(self.config.source)
+        if not source.is_file():
+            return False
+        with open(source, "rb") as f:
+            return is_archive(f)
+
+    def _encoded_images(self, done: set) -> tf.data.Dataset:
+        """(path, encoded bytes) pairs still to be scored."""
+        if self._source_is_archive():
+            source = self.config.source
+
+            def members():
+                with open(source, "rb") as f:
+                    for name, data in iter_archive_images(f):
+                        path = f"{source}/{name}"
+                        if path not in done:
+                            yield path, data
+
+            return tf.data.Dataset.from_generator(
+                members,
+                output_signature=(tf.TensorSpec([], tf.string), tf.TensorSpec([], tf.string))
+            )
+
+        files = self._list_files()
+        if not files:
+            raise FileNotFoundError(f"No images found at '{self.config.source}'")
+        remaining = [path for path in files if path not in done]
+        logger.info(f"{len(files)} images found, {len(files) - len(remaining)} already scored")
+        return tf.data.Dataset.from_tensor_slices(tf.constant(remaining, dtype=tf.string)).map(
+            lambda path: (path, tf.io.read_file(path)),
+            num_parallel_calls=tf.data.AUTOTUNE
+        )
+
+    def _decode(self, path, data):
+        image = tf.io.decode_image(data, channels=3, expand_animations=False)
+        # Same interpolation as the training/evaluation input pipelines
+        image = tf.image.resize(image, self.target_size, method="bilinear")
+        return path, tf.cast(tf.round(image), tf.uint8)
+
+    def dataset(self, done: set = frozenset()) -> tf.data.Dataset:
+        return (
+            self._encoded_images(done)
+            .map(self._decode, num_parallel_calls=tf.data.AUTOTUNE)
+            .ignore_errors(log_warning=True)
+            .batch(self.config.batch_size)
+            .prefetch(tf.data.AUTOTUNE)
+        )
+
+    @staticmethod
+    def _rows(paths: np.ndarray, probabilities: np.ndarray) -> list:
+        rows = []
+        for path, probs in zip(paths, probabilities):
+            best = int(np.argmax(probs))
+            row = {"path": path.decode("utf-8"), "class": CLASS_NAMES[best], "confidence": float(probs[best])}
+            row.update({name: float(p) for name, p in zip(CLASS_NAMES, probs)})
+            rows.append(row)
+        return rows
+
+    def run(self) -> int:
+        """Score every image not yet in the output; returns the number of new results."""
+        output_path = self.config.output_path
+        if self.config.overwrite and output_path.is_dir():
+            shutil.rmtree(output_path)
+        elif self.config.overwrite and output_path.exists():
+            output_path.unlink()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        writer = self._writer()
+        done = writer.done()
+        if done:
+            logger.info(f"Resuming: {len(done)} results already in {output_path}")
+
+        writer.open()
+        scored, start = 0, time.perf_counter()
+        try:
+            for step, (paths, images) in enumerate(self.dataset(done), start=1):
+                writer.write(self._rows(paths.numpy(), self.backend(images.numpy())))
+                scored += len(paths)
+                if step % 50 == 0:
+                    logger.info(f"{scored} images scored ({scored / (time.perf_counter() - start):.1f} images/s)")
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Scored {scored} images in {elapsed:.1f}s; results in {output_path}")
+        return scored
@@ -1,11 +1,270 @@
 import time
 import os
+import sys
+import numpy as np
 import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.utils.utilities import save_json
 from cnn_classifier.config.configuration import CallbacksConfig
 
+class StepTimeReport(tf.keras.callbacks.Callback):
+    """
+    Time the training steps of each epoch (validation excluded) and write
+    mean step time and images/sec per epoch to a JSON report, so runs with
+    different PRECISION settings can be compared. The first epoch includes
+    tracing and XLA compilation and is left out of the steady-state mean.
+
+    The steps each epoch actually ran are logged next to the planned
+    `steps_per_epoch`, with a warning when they differ: with a repeated
+    training stream, an epoch that overruns shifts every later epoch off
+    the data boundary.
+    """
+    def __init__(self, path: Path, precision: str, batch_size: int):
+        super().__init__()
+        self.path = Path(path)
+        self.precision = precision
+        self.batch_size = batch_size
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = self._end = time.perf_counter()
+        self._steps = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._end = time.perf_counter()
+        # `batch` is the index of the last step the call ran
+        self._steps = batch + 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        planned = self.params.get("steps")
+        step_time = (self._end - self._start) / max(self._steps, 1)
+        self.epochs.append({
+            "epoch": epoch + 1,
+            "steps": self._steps,
+            "step_time_ms": step_time * 1000,
+            "images_per_s": self.batch_size / step_time
+        })
+        logger.info(
+            f"Epoch {epoch + 1}: {self._steps}/{planned} steps, {step_time * 1000:.1f} ms/step ({self.precision})"
+        )
+        if planned and self._steps != planned:
+            logger.warning(f"Epoch {epoch + 1} ran {self._steps} steps, steps_per_epoch is {planned}")
+
+    def summary(self) -> dict:
+        steady = self.epochs[1:] or self.epochs
+        return {
+            "precision": self.precision,
+            "batch_size": self.batch_size,
+            "mean_step_time_ms": sum(e["step_time_ms"] for e in steady) / len(steady) if steady else None,
+            "epochs": self.epochs
+        }
+
+    def on_train_end(self, logs=None):
+        save_json(path=self.path, data=self.summary())
+
+# Share of the step time spent waiting for input above which an epoch counts as input-bound
+INPUT_BOUND_FRACTION = 0.1
+
+def host_memory_mb() -> dict:
+    """Current resident memory (Linux only, else None) and peak resident memory of this process."""
+    current = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    except ImportError:
+        pass
+    return {"rss_mb": current, "peak_rss_mb": peak}
+
+class TrainingProfiler(tf.keras.callbacks.Callback):
+    """
+    Per-epoch training throughput report: step time split into input wait
+    and compute, images/sec, host memory, and the latency each tf.data stage
+    adds. Optionally captures a TensorFlow profiler trace for a window of
+    global steps (TensorBoard's Profile tab).
+
+    Input wait comes from the `InputProbe` stamps around the final prefetch.
+    A step whose batch was already in the buffer spent its whole interval
+    computing; the median of those intervals is the compute estimate, and
+    any longer interval is counted as waiting for input.
+
+    The report is rewritten at the end of every `fit` call, so it stays
+    cumulative across fine-tuning stages.
+    """
+    def __init__(
+            self,
+            path: Path,
+            batch_size: int,
+            probe=None,
+            input_stages: dict = None,
+            stage_batches: int = 10,
+            trace_steps: list = None,
+            trace_dir: Path = None):
+        """
+        Args:
+            path (Path): JSON report.
+            batch_size (int): global batch size.
+            probe (InputProbe, optional): stamps of the training input pipeline.
+            input_stages (dict, optional): stage name -> batched dataset ending
+                at that stage, in pipeline order; timed once after training.
+            stage_batches (int): batches timed per input stage (0 skips them).
+            trace_steps (list, optional): [first, last] global steps to trace.
+            trace_dir (Path, optional): where the trace is written.
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.probe = probe
+        self.input_stages = input_stages or {}
+        self.stage_batches = stage_batches
+        self.trace_steps = list(trace_steps) if trace_steps else None
+        self.trace_dir = Path(trace_dir) if trace_dir else None
+        self.epochs = []
+        self.stage_latency = None
+        self.trace = None
+        self._global_step = 0
+        self._tracing = False
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = self._end = time.perf_counter()
+        self._first_batch = len(self.probe.consumed) if self.probe else 0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        # With steps_per_execution > 1 a call covers several steps, so the
+        # window is widened to whole calls
+        step = self._global_step + batch
+        last_step = step + (getattr(self.model, "steps_per_execution", None) or 1) - 1
+        if self.trace_steps and self.trace is None and not self._tracing and last_step >= self.trace_steps[0]:
+            tf.profiler.experimental.start(str(self.trace_dir))
+            self._tracing, self._trace_first = True, step
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._end = time.perf_counter()
+        if self._tracing and self._global_step + batch >= self.trace_steps[1]:
+            self._stop_trace(self._global_step + batch)
+
+    def _stop_trace(self, last_step: int):
+        tf.profiler.experimental.stop()
+        self._tracing = False
+        self.trace = {"first_step": self._trace_first, "last_step": last_step, "dir": str(self.trace_dir)}
+        logger.info(f"Profiler trace of steps {self._trace_first}-{last_step} written to {self.trace_dir}")
+
+    def _input_split(self) -> dict:
+        """Input wait vs compute of this epoch's steps, from the probe stamps."""
+        consumed = self.probe.consumed[self._first_batch:]
+        produced = self.probe.produced[self._first_batch:self._first_batch + len(consumed)]
+        # Interval k runs from taking batch k to taking batch k + 1; the last
+        # one would include validation, so it is left out
+        intervals = np.diff(consumed)
+        if intervals.size == 0:
+            return {}
+        # A batch produced well before it was taken was waiting in the buffer
+        ready = (np.asarray(consumed[1:]) - np.asarray(produced[1:])) > 1e-3
+        compute = float(np.median(intervals[ready])) if ready.any() else float(intervals.min())
+        waits = np.where(ready, 0.0, np.maximum(intervals - compute, 0.0))
+        return {
+            "step_time_p50_ms": float(np.percentile(intervals, 50)) * 1000,
+            "step_time_p95_ms": float(np.percentile(intervals, 95)) * 1000,
+            "compute_ms": compute * 1000,
+            "input_wait_ms": float(waits.mean()) * 1000,
+            "input_wait_fraction": float(waits.sum() / intervals.sum()),
+            "steps_waiting_for_input": float((waits > 0).mean())
+        }
+
+    def on_epoch_end(self, epoch, logs=None):
+        steps = self.params.get("steps") or 1
+        train_time = self._end - self._start
+        record = {
+            "epoch": epoch + 1,
+            "steps": steps,
+            "train_time_s": train_time,
+            "step_time_ms": train_time / steps * 1000,
+            "images_per_s": steps * self.batch_size / train_time,
+            **(self._input_split() if self.probe else {}),
+            **host_memory_mb()
+        }
+        self.epochs.append(record)
+        self._global_step += steps
+        logger.info(
+            f"Epoch {epoch + 1}: {record['images_per_s']:.1f} images/s"
+            + (f", {record['input_wait_fraction']:.0%} of step time waiting for input" if "input_wait_fraction" in record else "")
+        )
+
+    def _time_input_stages(self) -> list:
+        results, previous = [], 0.0
+        for name, dataset in self.input_stages.items():
+            iterator = iter(dataset)
+            try:
+                next(iterator)  # starts the pipeline's threads and fills its buffers
+            except StopIteration:
+                continue
+            batches, start = 0, time.perf_counter()
+            for _ in range(self.stage_batches):
+                try:
+                    next(iterator)
+                except StopIteration:
+                    break
+                batches += 1
+            ms = (time.perf_counter() - start) * 1000 / max(batches, 1)
+            results.append({"stage": name, "ms_per_batch": ms, "added_ms": ms - previous, "batches": batches})
+            previous = ms
+        return results
+
+    def summary(self) -> dict:
+        steady = self.epochs[1:] or self.epochs  # the first epoch includes tracing and compilation
+
+        def mean(name):
+            values = [e[name] for e in steady if e.get(name) is not None]
+            return sum(values) / len(values) if values else None
+
+        wait_fraction = mean("input_wait_fraction")
+        return {
+            "batch_size": self.batch_size,
+            "images_per_s": mean("images_per_s"),
+            "step_time_ms": mean("step_time_ms"),
+            "step_time_p95_ms": mean("step_time_p95_ms"),
+            "compute_ms": mean("compute_ms"),
+            "input_wait_ms": mean("input_wait_ms"),
+            "input_wait_fraction": wait_fraction,
+            "bound": None if wait_fraction is None else ("input" if wait_fraction > INPUT_BOUND_FRACTION else "compute"),
+            "peak_rss_mb": max((e["peak_rss_mb"] for e in self.epochs if e["peak_rss_mb"] is not None), default=None),
+            "input_stages": self.stage_latency,
+            "trace": self.trace,
+            "epochs": self.epochs
+        }
+
+    def on_train_end(self, logs=None):
+        if self._tracing:
+            self._stop_trace(self._global_step - 1)
+        if self.stage_latency is None and self.stage_batches and self.input_stages:
+            # After the first pass, so file caches are complete and not written concurrently
+            self.stage_latency = self._time_input_stages()
+            table = "\n".join(f"{s['stage']:>15s} {s['ms_per_batch']:10.1f} {s['added_ms']:+10.1f}" for s in self.stage_latency)
+            logger.info(f"Input pipeline latency per batch\n{'stage':>15s} {'ms':>10s} {'added ms':>10s}\n{table}")
+        summary = self.summary()
+        save_json(path=self.path, data=summary)
+        if summary["bound"]:
+            logger.info(
+                f"Training is {summary['bound']}-bound: {summary['images_per_s']:.1f} images/s, "
+                f"{summary['input_wait_fraction']:.0%} of step time waiting for input"
+            )
+
 class Callbacks:
-    def __init__(self, config: CallbacksConfig):
+    def __init__(self, config: CallbacksConfig, worker: str = None):
+        """
+        Args:
+            config (CallbacksConfig): callback paths.
+            worker (str, optional): name of a non-chief worker; its TensorBoard
+                logs and checkpoints go to a subdirectory of their own.
+        """
         self.config = config
+        self.worker = worker
     
     @property
     def _create_tb_callbacks(self):
@@ -14,12 +273,18 @@ class Callbacks:
             self.config.tensorboard_log_dir,
             f"tb_logs_at_{timestamp}",
         )
+        if self.worker:
+            tb_running_log_dir = os.path.join(tb_running_log_dir, self.worker)
         return tf.keras.callbacks.TensorBoard(log_dir=tb_running_log_dir)
     
     @property
     def _create_ckpt_callbacks(self):
+        filepath = self.config.model_checkpoint_filepath
+        if self.worker:
+            filepath = os.path.join(os.path.dirname(filepath), self.worker, os.path.basename(filepath))
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
         return tf.keras.callbacks.ModelCheckpoint(
-            filepath=self.config.model_checkpoint_filepath,
+            filepath=filepath,
             save_best_only=True
         )
 
@@ -27,6 +292,7 @@ class Callbacks:
     def _create_early_stopping(self):
         return tf.keras.callbacks.EarlyStopping(
             monitor='val_accuracy',
+            mode='max',
             patience=5,
             restore_best_weights=True
         )
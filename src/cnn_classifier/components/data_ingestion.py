@@ -1,105 +1,262 @@
 import os
 import re
+import json
 import shutil
-from urllib import request
+import hashlib
+import threading
+from urllib import request, error, parse
 import zipfile
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
 from cnn_classifier import logger
 from cnn_classifier.utils.utilities import get_size
+from cnn_classifier.utils.archives import IMAGE_EXTENSIONS
+from cnn_classifier.components.tfrecord_dataset import write_tfrecord_shards
+from cnn_classifier.components.dataset_manifest import build_dataset_manifest, read_manifest_summary
 from cnn_classifier.entity.pipeline_config import DataIngestionConfig
 
+# Filename prefix (normalised) -> class folder
+CLASS_FOLDERS = {
+    "healthy": "Healthy",
+    "salmo": "Salmonella",
+    "cocci": "Coccidiosis",
+    "ncd": "New Castle Disease",
+}
+
+def normalize_key(stem: str) -> str:
+    s = stem.lower().strip()
+    s = re.sub(r"[^a-z]", "", s)
+    if s.startswith("pcr"):
+        s = s[3:]
+    return s
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 class DataIngestion:
     def __init__(self, config: DataIngestionConfig):
         """Initialize DataIngestion with the given configuration."""
         self.config = config
-    
+        self.images_dir = self.config.unzip_dir / "images"
+
+    def _local_source(self):
+        """The source as a local path if `source_URL` is a file path or file:// URL, else None."""
+        url = parse.urlparse(self.config.source_URL)
+        if url.scheme == "file":
+            return Path(request.url2pathname(url.path))
+        if url.scheme in ("http", "https", "ftp"):
+            return None
+        return Path(self.config.source_URL)
+
+    @property
+    def archive_path(self) -> Path:
+        return self._local_source() or Path(self.config.local_data_file)
+
+    def _verify(self, path: Path) -> bool:
+        """Check `path` against the configured sha256 (always passes when none is configured)."""
+        digest = file_sha256(path)
+        if self.config.source_sha256 is None:
+            logger.info(f"sha256 of {path}: {digest} (set data_ingestion.source_sha256 to enforce it)")
+            return True
+        if digest != self.config.source_sha256.lower():
+            logger.warning(f"Checksum mismatch for {path}: expected {self.config.source_sha256}, got {digest}")
+            return False
+        logger.info(f"Checksum verified for {path}")
+        return True
+
+    def _fetch(self, url: str, dest: Path):
+        """Download `url` to `dest`, resuming a previous partial download if one exists."""
+        part = Path(f"{dest}.part")
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with request.urlopen(request.Request(url, headers=headers), timeout=60) as response:
+                if offset and response.status != 206:
+                    logger.info("Server does not support resuming, restarting download")
+                    offset = 0
+                elif offset:
+                    logger.info(f"Resuming download at {offset} bytes")
+                with open(part, "ab" if offset else "wb") as f:
+                    shutil.copyfileobj(response, f, 1 << 20)
+        except error.HTTPError as e:
+            # 416: the partial file already holds the whole resource
+            if e.code != 416 or not offset:
+                raise
+        os.replace(part, dest)
+        logger.info(f"Downloaded {url} to {dest} ({get_size(dest)})")
+
     def download_data(self):
         """
-        Download the data file from the source URL if it does not already exist locally.
+        Download the data file from the source URL unless a verified copy already exists.
+
+        Interrupted downloads resume from the `.part` file. When
+        `source_sha256` is configured, the archive is verified and a corrupt
+        copy is downloaded again once. A local path or file:// URL is used in
+        place, without copying.
 
         Returns:
-            str: Path to the downloaded (or existing) local data file.
+            Path: Path to the verified local archive.
 
         Raises:
-            Exception: If an error occurs during download.
+            ValueError: If the archive does not match the configured checksum.
         """
         try:
-            if not os.path.exists(self.config.local_data_file):
-                filename, headers = request.urlretrieve(
-                    url=self.config.source_URL,
-                    filename=self.config.local_data_file
-                )
-                logger.info(f"Downloaded {filename} with following info:\n{headers}")
-            else:
-                logger.info(f"Data already exists at {self.config.local_data_file} ({get_size(Path(self.config.local_data_file))}), skipping download")
-            
-            return self.config.local_data_file
+            local_source = self._local_source()
+            if local_source is not None:
+                if not local_source.exists():
+                    raise FileNotFoundError(f"Source archive not found: {local_source}")
+                if not self._verify(local_source):
+                    raise ValueError(f"{local_source} does not match data_ingestion.source_sha256")
+                return local_source
+
+            local_data_file = Path(self.config.local_data_file)
+            if local_data_file.exists():
+                if self._verify(local_data_file):
+                    logger.info(f"Data already exists at {local_data_file} ({get_size(local_data_file)}), skipping download")
+                    return local_data_file
+                local_data_file.unlink()
+
+            self._fetch(self.config.source_URL, local_data_file)
+            if not self._verify(local_data_file):
+                local_data_file.unlink()
+                raise ValueError("Downloaded archive does not match data_ingestion.source_sha256")
+            return local_data_file
         except Exception as e:
             logger.error(f"Error downloading data: {e}")
             raise
-    
+
+    def _destination(self, member: str):
+        """
+        Where an archive member lands: images go straight to their class folder
+        (by filename prefix, or by parent folder if that already is a class);
+        everything else keeps its archive path under `unzip_dir`. Returns None
+        for members that would escape it (absolute paths or "..").
+        """
+        parts = PurePosixPath(member)
+        if parts.is_absolute() or ".." in parts.parts:
+            return None
+        if parts.suffix.lower() not in IMAGE_EXTENSIONS:
+            return self.config.unzip_dir / parts
+
+        class_folder = CLASS_FOLDERS.get(normalize_key(parts.name.split(".")[0]))
+        if class_folder is None and parts.parent.name in CLASS_FOLDERS.values():
+            class_folder = parts.parent.name
+        if class_folder is None:
+            # Unknown prefix: left at the top of images/, as before
+            return self.images_dir / parts.name
+        return self.images_dir / class_folder / parts.name
+
+    def _load_extraction_manifest(self) -> dict:
+        path = Path(self.config.extraction_manifest)
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
     def extract_zip_file(self):
-        """Extract the contents of the downloaded zip file into the configured directory."""
-        unzip_path = self.config.unzip_dir
-        os.makedirs(unzip_path, exist_ok=True)
-        with zipfile.ZipFile(self.config.local_data_file, 'r') as zip_file_ref:
-            zip_file_ref.extractall(unzip_path)
-        
-        # Rename top-level folder: train/ or Train/ -> images/
-        src = None
-        for candidate in [unzip_path / "train", unzip_path / "Train"]:
-            if candidate.exists() and candidate.is_dir():
-                src = candidate
-                break
-        if src is None:
-            return
-        
-        dst = unzip_path / "images"
-        
-        # If already renamed in a previous run, do nothing
-        if dst.exists() and dst.is_dir():
-            return
-        
-        # Avoid accidental overwrite
-        if dst.exists():
-            raise FileExistsError(f"Cannot rename to '{dst}': path exists.")
-        
-        src.rename(dst)
-    
+        """
+        Extract the archive members in parallel, writing images directly into their class folders.
+
+        A manifest of extracted members (CRC, size, destination) is kept so
+        that re-runs only extract new or changed members and remove files
+        whose members were dropped from the archive.
+        """
+        archive_path = self.archive_path
+        previous = self._load_extraction_manifest().get("members", {})
+        local, handles = threading.local(), []
+
+        def extract(info: zipfile.ZipInfo, dest: Path):
+            # ZipFile handles are not safe to share between threads
+            if not hasattr(local, "zip_file_ref"):
+                local.zip_file_ref = zipfile.ZipFile(archive_path, "r")
+                handles.append(local.zip_file_ref)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.tmp")
+            with local.zip_file_ref.open(info) as src, open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp, dest)
+
+        # Destination -> the member written there; of several members mapping to
+        # one destination only the last in archive order is extracted, so no two
+        # threads ever write the same file
+        owners = {}
+        with zipfile.ZipFile(archive_path, "r") as zip_file_ref:
+            for info in zip_file_ref.infolist():
+                if info.is_dir():
+                    continue
+                dest = self._destination(info.filename)
+                if dest is None:
+                    logger.warning(f"Skipping unsafe archive member path: {info.filename}")
+                    continue
+                if dest in owners:
+                    logger.warning(
+                        f"Archive members {owners[dest][0].filename} and {info.filename} both map to {dest}; "
+                        "the last one in the archive wins"
+                    )
+                owners[dest] = (info, dest)
+
+        members, pending = {}, []
+        for info, dest in owners.values():
+            record = {"crc": info.CRC, "size": info.file_size, "path": str(dest)}
+            members[info.filename] = record
+            if previous.get(info.filename) == record and dest.exists() and dest.stat().st_size == info.file_size:
+                continue
+            pending.append((info, dest))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.extract_workers) as pool:
+                list(pool.map(lambda job: extract(*job), pending))
+        finally:
+            for handle in handles:
+                handle.close()
+
+        # A dropped member's file may now belong to a current member (e.g. the
+        # same image moved to another folder of the archive); keep those
+        current = {Path(record["path"]) for record in members.values()}
+        removed = 0
+        for name, record in previous.items():
+            path = Path(record["path"])
+            if name not in members and path not in current and path.exists():
+                path.unlink()
+                removed += 1
+
+        Path(self.config.extraction_manifest).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config.extraction_manifest, "w") as f:
+            json.dump({"archive": str(archive_path), "members": members}, f, indent=4)
+
+        logger.info(
+            f"Extract {archive_path}: extracted={len(pending)}, "
+            f"unchanged={len(members) - len(pending)}, removed={removed}"
+        )
+
     def organize_images_into_class_folders(self) -> None:
         """
         Moves images from artifacts/.../data/images/*.jpg into class label folders.
         Label is inferred from filename prefix (before first dot).
+
+        Extraction already writes images into their class folders; this only
+        tidies trees extracted by earlier versions of the stage.
         """
-        self.images_dir = self.config.unzip_dir / "images"
         if not self.images_dir.exists():
             raise FileNotFoundError(f"images folder not found at: {self.images_dir}")
-        
-        class_dirs = {
-            "healthy": self.images_dir / "Healthy",
-            "salmo": self.images_dir / "Salmonella",
-            "cocci": self.images_dir / "Coccidiosis",
-            "ncd": self.images_dir / "New Castle Disease",
-        }
-        
+
+        class_dirs = {key: self.images_dir / folder for key, folder in CLASS_FOLDERS.items()}
+
         # Ensure folders exist
         for cls in class_dirs.values():
             cls.mkdir(parents=True, exist_ok=True)
-        
-        def normalize_key(stem: str) -> str:
-            s = stem.lower().strip()
-            s = re.sub(r"[^a-z]", "", s)
-            if s.startswith("pcr"):
-                s = s[3:]
-            return s
-        
+
         moved, skipped, unknown = 0, 0, 0
-        
+
         # Move images directly under images/
         for f in self.images_dir.iterdir():
             if not f.is_file():
                 continue
-            if f.suffix.lower() not in {".jpg", ".jpeg", ".png"}:
+            if f.suffix.lower() not in IMAGE_EXTENSIONS:
                 continue
 
             # filename like: pcrhealthy.123.jpg -> image filename prefix is "pcrhealthy"
@@ -110,7 +267,7 @@ class DataIngestion:
             if target_dir is None:
                 unknown += 1
                 continue
-            
+
             dest = target_dir / f.name
             if dest.exists():
                 skipped += 1
@@ -118,22 +275,46 @@ class DataIngestion:
 
             shutil.move(str(f), str(dest))
             moved += 1
-        
+
         logger.info(f"Organize images: moved={moved}, skipped={skipped}, unknown={unknown}")
-    
-    def print_data_summary(self):
-        img_exts = {".jpg", ".jpeg", ".png"}
 
+    def build_manifest(self) -> dict:
+        """
+        Index the class folders into the Parquet dataset manifest (hash,
+        dimensions, split and duplicate flag per image). Splits are assigned
+        by content hash, so they stay stable as images are added.
+        """
+        return build_dataset_manifest(
+            images_dir=self.images_dir,
+            manifest_path=self.config.dataset_manifest,
+            validation_split=0.20,
+            workers=self.config.extract_workers
+        )
+
+    def print_data_summary(self):
+        summary = read_manifest_summary(self.config.dataset_manifest)
         logger.info(f"Data Summary @ {self.images_dir}")
-        logger.info("Classes: " + ", ".join(sorted([f.name for f in self.images_dir.iterdir() if f.is_dir()])))
+        logger.info("Classes: " + ", ".join(summary["class_names"]))
 
-        class_counts = {}
-        total = 0
+        class_counts = {
+            name: sum(summary["class_counts"][split][name] for split in summary["class_counts"])
+            for name in summary["class_names"]
+        }
+        total = sum(class_counts.values())
 
-        for class_dir in sorted([f for f in self.images_dir.iterdir() if f.is_dir()]):
-            n = sum(1 for f in class_dir.rglob("*") if f.suffix.lower() in img_exts)
-            class_counts[class_dir.name] = n
-            total += n
-        
         class_summary = "\n".join([f"{k:20s} {v}" for k, v in class_counts.items()])
-        logger.info(f"Data Summary\n{class_summary}\nTOTAL: {total}")
\ No newline at end of file
+        logger.info(f"Data Summary\n{class_summary}\nTOTAL: {total} (+{summary['duplicates']} duplicates skipped)")
+
+    def write_tfrecords(self):
+        """
+        Write the manifest's images as resized uint8 pixels into sharded
+        TFRecords (plus a manifest of per-split, per-class counts) so training
+        and evaluation do not re-decode JPEGs on every run.
+        """
+        write_tfrecord_shards(
+            dataset_manifest=self.config.dataset_manifest,
+            output_dir=self.config.tfrecord_dir,
+            image_size=self.config.params_image_size[:-1],  # e.g., [224, 224]
+            images_per_shard=self.config.images_per_shard,
+            seed=42
+        )
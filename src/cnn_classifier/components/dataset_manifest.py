@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PIL import Image
+from cnn_classifier import logger
+from cnn_classifier.utils.archives import IMAGE_EXTENSIONS
+
+MANIFEST_COLUMNS = [
+    "path", "class", "label", "size_bytes", "mtime_ns",
+    "width", "height", "sha256", "split", "is_duplicate"
+]
+
+def assign_split(sha256: str, validation_split: float) -> str:
+    """
+    Split by content hash: an image keeps its split as the dataset grows, and
+    identical images always land in the same split.
+    """
+    return "validation" if int(sha256[:8], 16) / 0x100000000 < validation_split else "training"
+
+def _describe(path: str) -> dict:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    try:
+        with Image.open(path) as img:  # reads the header only
+            width, height = img.size
+    except OSError:
+        width, height = -1, -1  # undecodable; kept so the hash still deduplicates it
+    return {"sha256": digest.hexdigest(), "width": width, "height": height}
+
+def build_dataset_manifest(
+        images_dir: Path,
+        manifest_path: Path,
+        validation_split: float = 0.20,
+        workers: int = 8) -> dict:
+    """
+    Index `images_dir/<class>/**/<image>` into a Parquet manifest.
+
+    One row per file: path, class, label, size, mtime, dimensions, sha256,
+    split and a duplicate flag (every copy of an image after the first, by
+    path order). Files whose size and mtime match the previous manifest are
+    not re-hashed. Per-class counts, class names and a fingerprint are stored
+    in the file's metadata, so `read_manifest_summary` never scans rows.
+
+    Returns:
+        dict: the manifest summary.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    images_dir, manifest_path = Path(images_dir), Path(manifest_path)
+    class_names = sorted(d.name for d in images_dir.iterdir() if d.is_dir())
+
+    rows = []
+    for label, class_name in enumerate(class_names):
+        for root, _, files in sorted(os.walk(images_dir / class_name), key=lambda x: x[0]):
+            for fname in sorted(files):
+                if Path(fname).suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                path = os.path.join(root, fname)
+                stat = os.stat(path)
+                rows.append({
+                    "path": path, "class": class_name, "label": label,
+                    "size_bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns
+                })
+
+    previous = {}
+    if manifest_path.exists():
+        columns = ["path", "size_bytes", "mtime_ns", "width", "height", "sha256"]
+        for row in pq.read_table(manifest_path, columns=columns).to_pylist():
+            previous[row["path"]] = row
+
+    stale = []
+    for row in rows:
+        known = previous.get(row["path"])
+        if known and known["size_bytes"] == row["size_bytes"] and known["mtime_ns"] == row["mtime_ns"]:
+            row.update(sha256=known["sha256"], width=known["width"], height=known["height"])
+        else:
+            stale.append(row)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for row, described in zip(stale, pool.map(lambda r: _describe(r["path"]), stale)):
+            row.update(described)
+
+    # Deduplicate by content; a hash seen under two classes is a labelling conflict
+    first_seen, conflicts = {}, 0
+    for row in sorted(rows, key=lambda r: r["path"]):
+        original = first_seen.setdefault(row["sha256"], row)
+        row["is_duplicate"] = original is not row
+        conflicts += row["is_duplicate"] and original["class"] != row["class"]
+        row["split"] = assign_split(row["sha256"], validation_split)
+
+    unique = [row for row in rows if not row["is_duplicate"]]
+    digest = hashlib.sha256()
+    for row in unique:
+        digest.update(f"{row['path']}\t{row['sha256']}\t{row['split']}\n".encode())
+
+    summary = {
+        "class_names": class_names,
+        "fingerprint": digest.hexdigest(),
+        "validation_split": validation_split,
+        "total": len(rows),
+        "duplicates": len(rows) - len(unique),
+        "class_counts": {
+            split: {name: sum(1 for r in unique if r["split"] == split and r["class"] == name) for name in class_names}
+            for split in ("training", "validation")
+        }
+    }
+
+    table = pa.Table.from_pylist(rows, schema=pa.schema([
+        ("path", pa.string()), ("class", pa.string()), ("label", pa.int32()),
+        ("size_bytes", pa.int64()), ("mtime_ns", pa.int64()),
+        ("width", pa.int32()), ("height", pa.int32()), ("sha256", pa.string()),
+        ("split", pa.string()), ("is_duplicate", pa.bool_())
+    ]))
+    table = table.replace_schema_metadata({"summary": json.dumps(summary)})
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, manifest_path)
+
+    logger.info(
+        f"Dataset manifest saved at {manifest_path}: {len(rows)} images, "
+        f"{len(stale)} (re)hashed, {summary['duplicates']} duplicates"
+    )
+    if conflicts:
+        logger.warning(f"{conflicts} duplicate images are labelled with a different class than their first copy")
+    return summary
+
+def read_manifest_summary(manifest_path: Path) -> dict:
+    """Class names, per-split class counts and fingerprint, from the file metadata alone."""
+    import pyarrow.parquet as pq
+
+    return json.loads(pq.read_schema(manifest_path).metadata[b"summary"])
+
+def read_manifest_split(manifest_path: Path, split: str) -> tuple:
+    """
+    Paths and labels of one split, excluding duplicates, in path order.
+
+    Returns:
+        tuple: (paths, labels)
+    """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(
+        manifest_path,
+        columns=["path", "label"],
+        filters=[("split", "=", split), ("is_duplicate", "=", False)]
+    )
+    return table.column("path").to_pylist(), table.column("label").to_pylist()
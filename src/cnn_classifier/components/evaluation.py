@@ -2,6 +2,7 @@ import tensorflow as tf
 from pathlib import Path
 from cnn_classifier.utils.utilities import save_json
 from cnn_classifier.entity.pipeline_config import EvaluationConfig
+from cnn_classifier.components.input_pipeline import load_image_split, cache_dataset
 
 class Evaluation:
     def __init__(self, config: EvaluationConfig):
@@ -9,28 +10,30 @@ class Evaluation:
         self.valid_generator = None
     
     def _validation_generator(self):
-        validation_ds = tf.keras.utils.image_dataset_from_directory(
+        split = load_image_split(
+            dataset_format=self.config.params_dataset_format,
             subset="validation",
+            image_size=self.config.params_image_size,
+            dataset_manifest=self.config.dataset_manifest,
+            tfrecord_dir=self.config.tfrecord_dir,
             shuffle=False,
-            directory=self.config.training_data,
-            validation_split=0.20,
-            seed=42,
-            image_size=self.config.params_image_size[:-1],  # e.g., [224, 224]
-            batch_size=self.config.params_batch_size,
-            label_mode="categorical",
-            interpolation="bilinear"
+            seed=42
         )
+        self.class_names = split["class_names"]
 
-        self.class_names = validation_ds.class_names
+        # Same key as the training stage, so a file cache built there is reused
+        validation_ds = cache_dataset(
+            split["dataset"], self.config.dataset_cache_mode, self.config.dataset_cache_dir, "validation", split["key_fields"]
+        )
 
         AUTOTUNE = tf.data.AUTOTUNE
         rescale = tf.keras.layers.Rescaling(1.0 / 255)
 
-        validation_ds = validation_ds.map(
+        validation_ds = validation_ds.batch(self.config.params_batch_size).map(
             lambda x, y: (rescale(x), y),
             num_parallel_calls=AUTOTUNE
         )
-        validation_ds = validation_ds.cache().prefetch(AUTOTUNE)
+        validation_ds = validation_ds.prefetch(AUTOTUNE)
         self.valid_generator = validation_ds
     
     def evaluation(self):
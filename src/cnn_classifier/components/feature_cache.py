@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.components.augmentation import FusedAffineAugmentation
+
+def split_frozen_backbone(model: tf.keras.Model) -> tuple:
+    """
+    Split a functional model after its frozen prefix.
+
+    The backbone is every layer up to the first trainable one (input layers
+    aside); its output is what gets cached. The head is the rest of the
+    graph, built from the same layer objects, so training it trains the
+    full model.
+
+    Returns:
+        tuple: (backbone, head) models.
+
+    Raises:
+        ValueError: if the model has no frozen layers to cache.
+    """
+    layers = [layer for layer in model.layers if not isinstance(layer, tf.keras.layers.InputLayer)]
+    first_trainable = next((i for i, layer in enumerate(layers) if layer.trainable), len(layers))
+    if first_trainable == 0:
+        raise ValueError(f"Feature caching needs a frozen backbone, but '{layers[0].name}' is trainable")
+    if first_trainable == len(layers):
+        raise ValueError("Feature caching needs a trainable head, but every layer is frozen")
+
+    boundary = layers[first_trainable - 1]
+    backbone = tf.keras.Model(model.inputs, boundary.output, name="backbone")
+    head = tf.keras.Model(boundary.output, model.outputs, name="head")
+    logger.info(f"Caching features at '{boundary.name}' {tuple(boundary.output.shape[1:])}, training {len(head.layers) - 1} head layers")
+    return backbone, head
+
+def _weights_digest(model: tf.keras.Model) -> str:
+    digest = hashlib.sha256()
+    for weight in model.get_weights():
+        digest.update(np.ascontiguousarray(weight).tobytes())
+    return digest.hexdigest()
+
+def extract_features(
+        backbone: tf.keras.Model,
+        dataset: tf.data.Dataset,
+        count: int,
+        cache_dir: Path,
+        subset: str,
+        key_fields: dict,
+        batch_size: int,
+        augmentation: FusedAffineAugmentation = None,
+        copies: int = 0) -> dict:
+    """
+    Run `backbone` once over a split and store its outputs as .npy arrays.
+
+    Features are written to a memory-mapped `<subset>-<key>.features.npy` of
+    shape [(copies + 1) * count, ...], copy-major: rows [0, count) are the
+    unaugmented images, each further block one fixed augmented copy of every
+    image. Labels go to a matching `.labels.npy`. The key covers the split
+    contents (`key_fields`), the backbone weights and the augmentation, so a
+    rerun with the same inputs reuses the arrays instead of re-extracting.
+
+    Args:
+        backbone (tf.keras.Model): frozen part of the model.
+        dataset (tf.data.Dataset): unbatched, unshuffled (uint8 image, one-hot label) split.
+        count (int): number of elements in `dataset`.
+        cache_dir (Path): where the arrays are kept.
+        subset (str): split name, used in the file names.
+        key_fields (dict): identifies the split contents (see `load_image_split`).
+        batch_size (int): images per backbone call.
+        augmentation (FusedAffineAugmentation, optional): augmentation for the
+            copies; it must be seeded so the copies are reproducible.
+        copies (int): number of augmented copies of each image (0 without augmentation).
+
+    Returns:
+        dict: features and labels paths, count and copies.
+    """
+    copies = copies if augmentation is not None else 0
+    if copies and augmentation.seed is None:
+        raise ValueError("Augmented feature copies need a seeded augmentation")
+    key = json.dumps({
+        **key_fields,
+        "subset": subset,
+        "backbone": _weights_digest(backbone),
+        "copies": copies,
+        "augmentation_seed": augmentation.seed if augmentation is not None else None
+    }, sort_keys=True)
+    stem = Path(cache_dir) / f"{subset}-{hashlib.sha256(key.encode()).hexdigest()[:16]}"
+    features_path, labels_path = Path(f"{stem}.features.npy"), Path(f"{stem}.labels.npy")
+    cached = {"features": features_path, "labels": labels_path, "count": count, "copies": copies}
+    if features_path.exists() and labels_path.exists():
+        logger.info(f"Reusing {subset} features at {features_path}")
+        return cached
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    rows = count * (copies + 1)
+    shape = (rows, *backbone.output.shape[1:])
+    logger.info(f"Extracting {subset} features for {count} images x {copies + 1} cop(ies) into {features_path}")
+
+    tmp_features = Path(f"{stem}.features.tmp.npy")
+    features = np.lib.format.open_memmap(tmp_features, mode="w+", dtype=np.float32, shape=shape)
+    labels = np.zeros((count, *dataset.element_spec[1].shape), dtype=np.float32)
+
+    rescale = tf.keras.layers.Rescaling(1.0 / 255)
+    forward = tf.function(lambda images: tf.cast(backbone(images, training=False), tf.float32), reduce_retracing=True)
+    batched = dataset.batch(batch_size)
+    originals = batched.map(lambda x, y: (rescale(x), y), num_parallel_calls=tf.data.AUTOTUNE)
+    # A seeded augmentation draws new, reproducible transforms on every pass
+    augmented = augmentation.apply(batched, preprocess=rescale) if copies else None
+
+    for copy in range(copies + 1):
+        offset = copy * count
+        for images, batch_labels in (augmented if copy else originals).prefetch(tf.data.AUTOTUNE):
+            n = int(images.shape[0])
+            features[offset:offset + n] = forward(images).numpy()
+            if copy == 0:
+                labels[offset:offset + n] = batch_labels.numpy()
+            offset += n
+        if offset != (copy + 1) * count:
+            raise ValueError(f"Expected {count} {subset} images, read {offset - copy * count}")
+
+    features.flush()
+    del features
+    np.save(labels_path, labels)
+    os.replace(tmp_features, features_path)
+    return cached
+
+def feature_dataset(cached: dict, batch_size: int, shuffle: bool, seed: int = 42) -> tf.data.Dataset:
+    """
+    Batched (features, labels) from arrays written by `extract_features`.
+
+    Rows are gathered from the memory-mapped features per batch, so the
+    array never has to fit in memory. With augmented copies, each epoch
+    draws one random copy (or the original) of every image, so an epoch is
+    still one pass over the images.
+    """
+    features = np.load(cached["features"], mmap_mode="r")
+    labels = np.load(cached["labels"])
+    count, copies = cached["count"], cached["copies"]
+
+    def gather(rows):
+        rows = np.sort(rows)  # sequential reads from the memmap
+        return features[rows], labels[rows % count]
+
+    dataset = tf.data.Dataset.range(count)
+    if shuffle:
+        dataset = dataset.shuffle(count, seed=seed, reshuffle_each_iteration=True)
+    if copies:
+        dataset = dataset.map(lambda i: i + count * tf.random.uniform([], 0, copies + 1, dtype=tf.int64))
+    dataset = dataset.batch(batch_size).map(
+        lambda rows: tf.numpy_function(gather, [rows], (tf.float32, tf.float32)),
+        num_parallel_calls=tf.data.AUTOTUNE
+    )
+    feature_shape, label_shape = features.shape[1:], labels.shape[1:]
+    return dataset.map(lambda x, y: (tf.ensure_shape(x, [None, *feature_shape]), tf.ensure_shape(y, [None, *label_shape])))
@@ -0,0 +1,139 @@
+import threading
+import time
+import numpy as np
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.entity.pipeline_config import PredictionConfig
+
+class KerasBackend:
+    """
+    Runs the trained Keras model through a tf.function with a fixed input signature.
+
+    Calling the traced function directly skips the data adapter, callback and
+    progress bar setup that `model.predict` repeats on every call. Takes raw
+    uint8 pixels; the cast and 1/255 scaling run inside the graph.
+    """
+    def __init__(self, config: PredictionConfig):
+        import tensorflow as tf
+
+        self.config = config
+        self.target_size = tuple(config.params_image_size[:-1])
+        self.model = tf.keras.models.load_model(config.model_path, compile=False)
+        self._infer = self._build_inference_fn()
+
+    def _build_inference_fn(self):
+        import tensorflow as tf
+
+        height, width = self.target_size
+        model = self.model
+
+        @tf.function(
+            input_signature=[tf.TensorSpec(shape=[None, height, width, 3], dtype=tf.uint8)],
+            jit_compile=bool(self.config.jit_compile)
+        )
+        def infer(images):
+            images = tf.cast(images, tf.float32) * (1.0 / 255)
+            return model(images, training=False)
+
+        return infer
+
+    def _batch_buckets(self) -> list:
+        # XLA compiles once per distinct input shape, so batches are padded up
+        # to a power of two to bound the number of compilations.
+        buckets, size = [], 1
+        while size < self.config.max_batch_size:
+            buckets.append(size)
+            size *= 2
+        return buckets + [size]
+
+    def warmup(self) -> list:
+        """Trace (and, with XLA, compile) the inference function; returns the warmed batch sizes."""
+        height, width = self.target_size
+        sizes = self._batch_buckets() if self.config.jit_compile else [1]
+        for size in sizes:
+            self(np.zeros([size, height, width, 3], dtype=np.uint8))
+        return sizes
+
+    def __call__(self, test_images: np.ndarray) -> np.ndarray:
+        n = len(test_images)
+        if self.config.jit_compile:
+            padded = next(size for size in self._batch_buckets() + [n] if size >= n)
+            if padded > n:
+                pad = np.zeros((padded - n, *test_images.shape[1:]), dtype=test_images.dtype)
+                test_images = np.concatenate([test_images, pad])
+        return self._infer(test_images).numpy()[:n]
+
+def load_tflite_interpreter(model_path: Path, num_threads: int = None):
+    """
+    Create a TFLite interpreter, preferring the standalone `tflite_runtime`
+    package so serving replicas do not need the full TensorFlow install.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=str(model_path), num_threads=num_threads)
+
+class TFLiteBackend:
+    """
+    Runs a model exported by stage 05 (float16 or INT8 quantized .tflite).
+
+    The interpreter is not thread-safe, so calls are serialised with a lock;
+    scale out with `executor: process` instead of threads. Takes raw uint8
+    pixels and scales them into a reusable float32 input buffer.
+    """
+    def __init__(self, config: PredictionConfig):
+        self.config = config
+        self.target_size = tuple(config.params_image_size[:-1])
+        self.interpreter = load_tflite_interpreter(config.tflite_model_path)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._float_buffer = np.empty((0, *self.target_size, 3), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size: int):
+        if batch_size == self._batch_size:
+            return
+        height, width = self.target_size
+        self.interpreter.resize_tensor_input(self._input["index"], [batch_size, height, width, 3])
+        self.interpreter.allocate_tensors()
+        self._batch_size = batch_size
+
+    def warmup(self) -> list:
+        height, width = self.target_size
+        self(np.zeros([1, height, width, 3], dtype=np.uint8))
+        return [1]
+
+    def __call__(self, test_images: np.ndarray) -> np.ndarray:
+        n = len(test_images)
+        with self._lock:
+            self._resize(n)
+            if n > len(self._float_buffer):
+                self._float_buffer = np.empty((n, *self._float_buffer.shape[1:]), dtype=np.float32)
+            scaled = self._float_buffer[:n]
+            np.multiply(test_images, np.float32(1.0 / 255), out=scaled)
+            self.interpreter.set_tensor(self._input["index"], scaled)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend
+}
+
+def load_backend(config: PredictionConfig):
+    """Instantiate (and optionally warm up) the inference backend named by `config.backend`."""
+    if config.backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{config.backend}', expected one of {sorted(BACKENDS)}")
+
+    start = time.perf_counter()
+    backend = BACKENDS[config.backend](config)
+    logger.info(f"Loaded '{config.backend}' inference backend in {time.perf_counter() - start:.2f}s")
+
+    if config.warmup:
+        start = time.perf_counter()
+        sizes = backend.warmup()
+        logger.info(f"Inference backend warmed up for batch sizes {sizes} in {time.perf_counter() - start:.2f}s")
+    return backend
@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from cnn_classifier import logger
+from cnn_classifier.entity.pipeline_config import PredictionConfig
+from cnn_classifier.utils.logging_setup import ProcessLogForwarder, forward_logging
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the inference executor already holds `max_pending` requests."""
+
+# Per-process pipeline, created once by the pool initializer in each worker
+_worker_pipeline = None
+
+def _init_worker(config: PredictionConfig, log_queue, log_level: int):
+    global _worker_pipeline
+    forward_logging(log_queue, log_level)
+    from cnn_classifier.pipeline.predicton import PredictionPipeline
+    _worker_pipeline = PredictionPipeline(config)
+    logger.info(f"Inference worker {os.getpid()} loaded model from {config.model_path}")
+
+def _timed(predict_fn, image_inputs: list, tta_views: int = None) -> tuple:
+    """Run a pipeline batch method, returning (results, stage timings) so they survive the trip back from a worker process."""
+    timings = {}
+    results = predict_fn(image_inputs, return_errors=True, timings=timings, tta_views=tta_views)
+    return results, timings
+
+def _worker_predict_batch(image_inputs: list, tta_views: int = None) -> tuple:
+    return _timed(_worker_pipeline.predict_batch, image_inputs, tta_views)
+
+def _worker_predict_proba_batch(image_inputs: list, tta_views: int = None) -> tuple:
+    return _timed(_worker_pipeline.predict_proba_batch, image_inputs, tta_views)
+
+def _worker_cache_stats() -> tuple:
+    cache = _worker_pipeline.cache
+    return os.getpid(), cache.stats() if cache is not None else None
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+class InferenceExecutor:
+    """
+    Bounded pool that runs image decoding and model inference off the event loop.
+
+    `executor: thread` shares one PredictionPipeline between the threads of this
+    process. `executor: process` starts `max_workers` spawned processes, each of
+    which loads its own copy of the model once in the pool initializer.
+
+    At most `max_pending` requests are admitted at a time; `admit()` raises
+    ExecutorSaturatedError beyond that so callers can shed load with a 503
+    instead of queueing without bound.
+
+    `predict_batch_fn` and `predict_proba_batch_fn` take the image inputs and
+    an optional `tta_views`, and return (results, timings), the timings as
+    filled in by `PredictionPipeline.predict_proba_batch`.
+    """
+    def __init__(self, config: PredictionConfig):
+        self.config = config
+        self.mode = config.executor
+        self.max_pending = max(1, int(config.max_pending))
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if self.mode == "thread":
+            from cnn_classifier.pipeline.predicton import PredictionPipeline
+            self.pipeline = PredictionPipeline(config)
+            self.pool = ThreadPoolExecutor(
+                max_workers=config.max_workers,
+                thread_name_prefix="inference"
+            )
+            self.predict_batch_fn = partial(_timed, self.pipeline.predict_batch)
+            self.predict_proba_batch_fn = partial(_timed, self.pipeline.predict_proba_batch)
+        elif self.mode == "process":
+            self.pipeline = None
+            context = multiprocessing.get_context("spawn")
+            # Workers log through this process, which owns the log file
+            self.log_forwarder = ProcessLogForwarder(context)
+            self.pool = ProcessPoolExecutor(
+                max_workers=config.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(config, self.log_forwarder.queue, self.log_forwarder.level)
+            )
+            self.predict_batch_fn = _worker_predict_batch
+            self.predict_proba_batch_fn = _worker_predict_proba_batch
+            self._start_workers(config.max_workers)
+        else:
+            raise ValueError(f"Unknown inference executor '{self.mode}', expected 'thread' or 'process'")
+
+        logger.info(f"InferenceExecutor ready: mode={self.mode}, max_workers={config.max_workers}, max_pending={self.max_pending}")
+
+    def _start_workers(self, n: int):
+        # Workers are spawned lazily; submit one task each so every worker
+        # runs the initializer (and loads the model) before the first request.
+        futures = [self.pool.submit(_worker_ready) for _ in range(n)]
+        pids = {future.result() for future in futures}
+        logger.info(f"Started {len(pids)} inference worker process(es): {sorted(pids)}")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @contextmanager
+    def admit(self):
+        """
+        Reserve a pending slot for one request for the duration of the block.
+
+        Raises:
+            ExecutorSaturatedError: If `max_pending` requests are already admitted.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorSaturatedError(f"{self._pending} requests pending (max_pending={self.max_pending})")
+            self._pending += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def cache_stats(self) -> dict:
+        """
+        Prediction cache counters, keyed by process id.
+
+        In process mode each worker keeps its own in-memory cache; workers are
+        probed with `max_workers` tasks, so an idle worker may occasionally be
+        missing from the result.
+        """
+        if self.pipeline is not None:
+            cache = self.pipeline.cache
+            return {os.getpid(): cache.stats() if cache is not None else None}
+        futures = [self.pool.submit(_worker_cache_stats) for _ in range(self.config.max_workers)]
+        return dict(future.result() for future in futures)
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` in the pool and await its result."""
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        if self.mode == "process":
+            self.log_forwarder.stop()
+        logger.info("InferenceExecutor shut down")
@@ -0,0 +1,196 @@
+import os
+import time
+import socket
+import hashlib
+import json
+import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.components.tfrecord_dataset import decode_and_resize, tfrecord_dataset
+from cnn_classifier.components.dataset_manifest import read_manifest_summary, read_manifest_split
+
+CACHE_MODES = ("none", "memory", "file")
+
+# Age after which a cache lockfile whose writer cannot be checked counts as abandoned
+STALE_CACHE_LOCK_SECONDS = 6 * 60 * 60
+
+def load_image_split(
+        dataset_format: str,
+        subset: str,
+        image_size: list,
+        dataset_manifest: Path,
+        tfrecord_dir: Path,
+        shuffle: bool,
+        seed: int = 42) -> dict:
+    """
+    Load one split as unbatched (uint8 image, one-hot label) elements.
+
+    Elements are decoded and resized but not augmented, rescaled, shuffled or
+    batched, so the result can be cached and reused across epochs and runs.
+    Both formats take their images and splits from the dataset manifest.
+
+    Args:
+        dataset_format (str): "tfrecord" (shards from stage 01) or "directory"
+            (decode the image files listed in the manifest).
+        subset (str): "training" or "validation".
+        image_size (list): IMAGE_SIZE param, e.g. [224, 224, 3].
+        dataset_manifest (Path): Parquet manifest written by stage 01.
+        tfrecord_dir (Path): shard directory (tfrecord format).
+        shuffle (bool): shuffle the file order.
+
+    Returns:
+        dict: dataset, count, class_names, and key_fields identifying the
+            contents for `cache_dataset`.
+    """
+    key_fields = {
+        "format": dataset_format,
+        "image_size": [int(v) for v in image_size],
+        "seed": seed
+    }
+    if dataset_format == "tfrecord":
+        dataset, count, manifest = tfrecord_dataset(
+            tfrecord_dir, subset=subset, batch_size=None, shuffle=shuffle, seed=seed, image_size=image_size
+        )
+        return {
+            "dataset": dataset,
+            "count": count,
+            "class_names": manifest["class_names"],
+            "key_fields": {**key_fields, "fingerprint": manifest["fingerprint"]}
+        }
+
+    if dataset_format != "directory":
+        raise ValueError(f"Unknown DATASET_FORMAT '{dataset_format}', expected tfrecord or directory")
+
+    summary = read_manifest_summary(dataset_manifest)
+    paths, labels = read_manifest_split(dataset_manifest, subset)
+    num_classes = len(summary["class_names"])
+    height, width = image_size[:-1]  # e.g., [224, 224]
+
+    dataset = tf.data.Dataset.from_tensor_slices((
+        tf.constant(paths, dtype=tf.string),
+        tf.constant(labels, dtype=tf.int64)
+    ))
+    if shuffle:
+        dataset = dataset.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(
+        lambda path, label: decode_and_resize(path, tf.one_hot(label, num_classes), [height, width]),
+        num_parallel_calls=tf.data.AUTOTUNE
+    )
+    return {
+        "dataset": dataset,
+        "count": len(paths),
+        "class_names": summary["class_names"],
+        "key_fields": {**key_fields, "fingerprint": summary["fingerprint"]}
+    }
+
+def cache_dataset(
+        dataset: tf.data.Dataset,
+        mode: str,
+        cache_dir: Path,
+        subset: str,
+        key_fields: dict) -> tf.data.Dataset:
+    """
+    Cache decoded uint8 elements in memory or in files under `cache_dir`.
+
+    File caches are named by a hash of `key_fields` (source fingerprint, image
+    size, split settings), so any change to the images or preprocessing
+    starts a new cache while unchanged inputs reuse the one from a previous
+    run. TensorFlow only finalises a file cache once a full pass completes;
+    an interrupted first pass is discarded and rebuilt next time. A cache
+    another process is still building is not touched: this dataset is then
+    cached in memory.
+
+    Args:
+        dataset (tf.data.Dataset): unbatched, not yet augmented elements.
+        mode (str): "none", "memory" or "file".
+        cache_dir (Path): root directory for file caches.
+        subset (str): split name, used in the cache file name.
+        key_fields (dict): JSON-serialisable values identifying the contents.
+    """
+    if mode == "none":
+        return dataset
+    if mode == "memory":
+        return dataset.cache()
+    if mode != "file":
+        raise ValueError(f"Unknown dataset cache mode '{mode}', expected one of {CACHE_MODES}")
+
+    key = hashlib.sha256(json.dumps({"subset": subset, **key_fields}, sort_keys=True).encode()).hexdigest()[:16]
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    filename = cache_dir / f"{subset}-{key}"
+
+    if Path(f"{filename}.index").exists():
+        logger.info(f"Reusing {subset} dataset cache at {filename}")
+        return dataset.cache(str(filename))
+
+    # TensorFlow's lockfile keeps a second writer off a cache being built.
+    # Only a stale one, left behind by a killed run, is removed; while
+    # another process is still writing, this one caches in memory instead.
+    for lockfile in Path(cache_dir).glob(f"{filename.name}_*.lockfile"):
+        if not _stale_cache_lock(lockfile, Path(f"{filename}.owner")):
+            logger.warning(f"{subset} dataset cache at {filename} is still being built by a running writer, caching in memory")
+            return dataset.cache()
+        logger.info(f"Removing stale dataset cache lockfile {lockfile}")
+        lockfile.unlink(missing_ok=True)
+
+    with open(f"{filename}.owner", "w") as f:
+        json.dump({"host": socket.gethostname(), "pid": os.getpid()}, f)
+    logger.info(f"Building {subset} dataset cache at {filename}")
+    return dataset.cache(str(filename))
+
+def _stale_cache_lock(lockfile: Path, owner_file: Path) -> bool:
+    """
+    Whether a cache lockfile outlived its writer: the process recorded in
+    `owner_file` is gone or, when that cannot be checked (no owner record,
+    another host), the lock is older than STALE_CACHE_LOCK_SECONDS.
+    """
+    try:
+        with open(owner_file) as f:
+            owner = json.load(f)
+    except (OSError, ValueError):
+        owner = {}
+    if owner.get("host") == socket.gethostname() and os.name == "posix":
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+    try:
+        return time.time() - lockfile.stat().st_mtime > STALE_CACHE_LOCK_SECONDS
+    except FileNotFoundError:
+        # Released while we looked
+        return True
+
+class InputProbe:
+    """
+    Timestamps of training batches on either side of the final prefetch.
+
+    `produced` records when a batch leaves the pipeline into the prefetch
+    buffer and `consumed` when the training step takes it, so
+    `TrainingProfiler` can tell steps that found a batch waiting from steps
+    that waited for one. Each stamp is one `tf.py_function` call per batch.
+    """
+    def __init__(self):
+        self.produced = []
+        self.consumed = []
+
+    @staticmethod
+    def _stamp(times: list):
+        def record():
+            now = time.perf_counter()
+            times.append(now)
+            return now
+
+        def stamp(*element):
+            stamped = tf.py_function(record, [], Tout=tf.float64)
+            with tf.control_dependencies([stamped]):
+                return tf.nest.map_structure(tf.identity, element)
+        return stamp
+
+    def prefetch(self, dataset: tf.data.Dataset) -> tf.data.Dataset:
+        """`dataset.prefetch(AUTOTUNE)` with a stamp before and after the buffer."""
+        # Sequential maps: the second runs in the consumer's GetNext call
+        dataset = dataset.map(self._stamp(self.produced))
+        return dataset.prefetch(tf.data.AUTOTUNE).map(self._stamp(self.consumed))
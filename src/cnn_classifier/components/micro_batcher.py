@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Any, Callable
+from cnn_classifier import logger
+from cnn_classifier.utils.metrics import Histogram
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into batches for one forward pass.
+
+    A batch is closed as soon as it holds `max_batch_size` items or the oldest
+    item has waited `max_wait_ms`, whichever comes first. The batch function is
+    run in `executor` (the loop's default executor when None) so the event loop
+    keeps serving other connections while the model runs.
+
+    With `on_timings`, `predict_batch_fn` returns (results, timings) instead
+    of results, and `on_timings(timings)` is called once per batch.
+    """
+    def __init__(
+            self,
+            predict_batch_fn: Callable[[list], list],
+            max_batch_size: int = 16,
+            max_wait_ms: float = 5,
+            executor=None,
+            on_timings: Callable[[dict], Any] = None):
+        self.predict_batch_fn = predict_batch_fn
+        self.on_timings = on_timings
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.executor = executor
+
+        self.batch_size_hist = Histogram(
+            name="batch_size",
+            buckets=[1, 2, 4, 8, 16, 32, 64, 128],
+            description="Number of requests coalesced into one forward pass"
+        )
+        self.queue_wait_hist = Histogram(
+            name="queue_wait_ms",
+            buckets=[0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000],
+            description="Time a request waited in the queue before its batch was dispatched"
+        )
+
+        self._queue = None
+        self._worker = None
+        self._inflight = []
+
+    async def start(self):
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"MicroBatcher started: max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:g}")
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Fail whatever is still pending instead of leaving callers hanging
+        pending = list(self._inflight)
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher stopped"))
+        logger.info(f"MicroBatcher stopped: {self.stats()}")
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its result from the batched forward pass.
+        """
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher is not running; call start() first")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+
+            dispatched_at = time.perf_counter()
+            self.batch_size_hist.observe(len(batch))
+            for _, _, enqueued_at in batch:
+                self.queue_wait_hist.observe((dispatched_at - enqueued_at) * 1000.0)
+
+            items = [item for item, _, _ in batch]
+            self._inflight = batch
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_batch_fn, items)
+                if self.on_timings is not None:
+                    results, timings = results
+                    self.on_timings(timings)
+            except Exception as e:
+                self._inflight = []
+                logger.exception(e)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._inflight = []
+
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                # Per-item failures come back as exception instances
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_ms": self.queue_wait_hist.snapshot()
+        }
@@ -1,13 +1,33 @@
 import tensorflow as tf
 from cnn_classifier.entity.pipeline_config import BaseModelConfig
+from cnn_classifier.components.backbones import build_backbone, get_backbone, block_key
 from pathlib import Path
 
+def backbone_blocks(model: tf.keras.Model, backbone: str = "vgg16") -> list:
+    """
+    The layers frozen in `model` (input layers aside), grouped into blocks of
+    consecutive layers, e.g. VGG16's `block5_conv1` .. `block5_pool` (see
+    `Backbone.block_pattern`). Ordered bottom to top, so `blocks[-n:]` are the top n.
+    """
+    blocks, current = [], None
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.layers.InputLayer) or layer.trainable:
+            continue
+        key = block_key(backbone, layer.name)
+        if blocks and (key is None or key == current):
+            blocks[-1].append(layer)
+        else:
+            blocks.append([layer])
+            current = key
+    return blocks
+
 class BaseModel:
     def __init__(self, config: BaseModelConfig):
         self.config=config
     
     def get_base_model(self):
-        self.model = tf.keras.applications.vgg16.VGG16(
+        self.model = build_backbone(
+            name=self.config.params_backbone,
             input_shape=self.config.params_image_size,
             weights=self.config.params_weights,
             include_top=self.config.params_include_top
@@ -19,19 +39,26 @@ class BaseModel:
         )
     
     @staticmethod
-    def define_full_model(model, classes, freez_all, freeze_till):
+    def define_full_model(model, classes, freez_all, freeze_till, pooling="flatten"):
+        # Freeze layer by layer: setting `model.trainable` would freeze (or
+        # unfreeze) the whole backbone regardless of `freeze_till`
         if freez_all:
             for layer in model.layers:
-                model.trainable = False
+                layer.trainable = False
         if (freeze_till is not None) and (freeze_till > 0):
             for layer in model.layers[:-freeze_till]:
-                model.trainable = False
+                layer.trainable = False
             
-        flatten_layer = tf.keras.layers.Flatten()(model.output)
+        # "avg" keeps the head small: channels x classes weights instead of H x W x channels x classes
+        if pooling == "avg":
+            pooled = tf.keras.layers.GlobalAveragePooling2D()(model.output)
+        else:
+            pooled = tf.keras.layers.Flatten()(model.output)
         output_layer = tf.keras.layers.Dense(
             units=classes,
-            activation='softmax'
-        )(flatten_layer)
+            activation='softmax',
+            dtype='float32'  # stays float32 under mixed-precision training
+        )(pooled)
 
         full_model = tf.keras.Model(
             inputs=model.input,
@@ -52,7 +79,8 @@ class BaseModel:
             model=self.model,
             classes=self.config.params_classes,
             freez_all=True,
-            freeze_till=None
+            freeze_till=None,
+            pooling=get_backbone(self.config.params_backbone).pooling
             # learning_rate=self.config.params_learning_rate
         )
 
@@ -0,0 +1,110 @@
+import os
+import json
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.utils.utilities import save_json, get_size
+from cnn_classifier.components.inference_backend import load_tflite_interpreter
+from cnn_classifier.components.input_pipeline import load_image_split, cache_dataset
+from cnn_classifier.entity.pipeline_config import ModelExportConfig
+
+class ModelExport:
+    def __init__(self, config: ModelExportConfig):
+        self.config = config
+        self.scores = {}
+
+    def _dataset(self, subset: str, batch_size: int, shuffle: bool) -> tf.data.Dataset:
+        # Same split, reader and cache as the training and evaluation stages
+        split = load_image_split(
+            dataset_format=self.config.params_dataset_format,
+            subset=subset,
+            image_size=self.config.params_image_size,
+            dataset_manifest=self.config.dataset_manifest,
+            tfrecord_dir=self.config.tfrecord_dir,
+            shuffle=shuffle,
+            seed=42
+        )
+        dataset = split["dataset"]
+        if not shuffle:
+            dataset = cache_dataset(
+                dataset, self.config.dataset_cache_mode, self.config.dataset_cache_dir, subset, split["key_fields"]
+            )
+        rescale = tf.keras.layers.Rescaling(1.0 / 255)
+        return dataset.batch(batch_size).map(lambda x, y: (rescale(x), y), num_parallel_calls=tf.data.AUTOTUNE)
+
+    def _representative_dataset(self):
+        """Yield single images from the training split to calibrate INT8 activation ranges."""
+        calibration_ds = self._dataset(subset="training", batch_size=1, shuffle=True)
+        for images, _ in calibration_ds.take(self.config.params_calibration_samples):
+            yield [images]
+
+    def load_model(self):
+        self.model = tf.keras.models.load_model(self.config.trained_model_path, compile=False)
+
+    def _convert(self, path: Path, quantization: str):
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        elif quantization == "int8":
+            # Full-integer kernels; float32 input/output so callers feed the same
+            # normalised images as the Keras model.
+            converter.representative_dataset = self._representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        else:
+            raise ValueError(f"Unknown quantization '{quantization}'")
+
+        tflite_model = converter.convert()
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+        logger.info(f"Exported {quantization} TFLite model to {path} ({get_size(path)})")
+
+    def export(self):
+        self.load_model()
+        self._convert(self.config.float16_model_path, "float16")
+        self._convert(self.config.int8_model_path, "int8")
+
+    def _evaluate_tflite(self, path: Path) -> float:
+        interpreter = load_tflite_interpreter(path)
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+
+        correct, total, allocated = 0, 0, None
+        for images, labels in self._dataset(subset="validation", batch_size=self.config.params_batch_size, shuffle=False):
+            images = images.numpy()
+            if allocated != len(images):
+                interpreter.resize_tensor_input(input_details["index"], list(images.shape))
+                interpreter.allocate_tensors()
+                allocated = len(images)
+            interpreter.set_tensor(input_details["index"], images.astype(input_details["dtype"]))
+            interpreter.invoke()
+            predictions = interpreter.get_tensor(output_details["index"])
+            correct += int(np.sum(np.argmax(predictions, axis=1) == np.argmax(labels.numpy(), axis=1)))
+            total += len(images)
+
+        return correct / total if total else 0.0
+
+    def evaluation(self):
+        """
+        Score every exported model on the validation split and compare against
+        the Keras accuracy recorded by stage 04 in evaluation_scores.json.
+        """
+        reference_accuracy = None
+        if os.path.exists(self.config.evaluation_scores_path):
+            with open(self.config.evaluation_scores_path) as f:
+                reference_accuracy = json.load(f).get("accuracy")
+
+        self.scores = {"reference_accuracy": reference_accuracy}
+        for name, path in (("float16", self.config.float16_model_path), ("int8", self.config.int8_model_path)):
+            accuracy = self._evaluate_tflite(path)
+            self.scores[name] = {
+                "accuracy": accuracy,
+                "accuracy_delta": None if reference_accuracy is None else accuracy - reference_accuracy,
+                "size_bytes": os.path.getsize(path)
+            }
+            logger.info(f"{name} TFLite accuracy={accuracy:.4f} (reference={reference_accuracy})")
+
+    def save_score(self):
+        save_json(path=self.config.scores_path, data=self.scores)
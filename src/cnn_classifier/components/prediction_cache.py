@@ -0,0 +1,117 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from cnn_classifier import logger
+
+def file_fingerprint(path: Path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of a model artifact, so cached predictions never outlive the model that made them."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of class probabilities keyed by content hash.
+
+    Memory is bounded by `max_entries` (least recently used entries are
+    evicted first); entries older than `ttl_seconds` are treated as misses.
+    With `sqlite_path` set, entries are written through to a sqlite file and
+    survive restarts; it can be shared by several worker processes.
+
+    Args:
+        fingerprint (str): model artifact fingerprint mixed into every key.
+        max_entries (int): in-memory capacity.
+        ttl_seconds (float, optional): entry lifetime; None keeps entries until evicted.
+        sqlite_path (Path, optional): on-disk store for persistence.
+    """
+    def __init__(self, fingerprint: str, max_entries: int, ttl_seconds: float = None, sqlite_path: Path = None):
+        self.fingerprint = fingerprint
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+        self._db = None
+        if sqlite_path is not None:
+            Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path), check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, probabilities BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            if ttl_seconds is not None:
+                self._db.execute("DELETE FROM predictions WHERE created < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+            logger.info(f"Prediction cache persisted at {sqlite_path}")
+
+    def key(self, data: bytes) -> str:
+        return f"{hashlib.sha256(data).hexdigest()}:{self.fingerprint}"
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _load_from_disk(self, key: str):
+        row = self._db.execute(
+            "SELECT probabilities, created FROM predictions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).copy(), row[1]
+
+    def get(self, key: str):
+        """Return cached probabilities for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None and self._db is not None:
+                entry = self._load_from_disk(key)
+                if entry is not None:
+                    self._insert(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _insert(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, key: str, probabilities: np.ndarray):
+        probabilities = np.array(probabilities, dtype=np.float32)
+        created = time.time()
+        with self._lock:
+            self._insert(key, (probabilities, created))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, probabilities, created) VALUES (?, ?, ?)",
+                    (key, probabilities.tobytes(), created)
+                )
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "persistent": self._db is not None
+            }
@@ -0,0 +1,112 @@
+import io
+import time
+import numpy as np
+from PIL import Image
+
+class ImagePreprocessor:
+    """
+    Decodes images straight into a reusable uint8 batch buffer.
+
+    The buffer holds raw 0-255 RGB pixels at the model input size; scaling to
+    [0, 1] happens inside the inference backend (in the graph for Keras, in
+    place for TFLite), so no float32 copies are made here. JPEGs much larger
+    than the target are decoded at a reduced scale (PIL draft mode) so the
+    full-resolution image is never materialised.
+
+    Not thread-safe: use one instance per thread.
+
+    Args:
+        target_size (tuple): model input (height, width), e.g. (224, 224).
+        capacity (int, optional): initial number of batch slots. Default is 1.
+    """
+    def __init__(self, target_size: tuple, capacity: int = 1):
+        self.target_size = tuple(target_size)
+        height, width = self.target_size
+        self.buffer = np.empty((max(1, capacity), height, width, 3), dtype=np.uint8)
+
+    def reserve(self, n: int):
+        """Grow the buffer (once) if a batch of `n` images does not fit."""
+        if n > len(self.buffer):
+            self.buffer = np.empty((n, *self.buffer.shape[1:]), dtype=np.uint8)
+
+    def decode(self, image_input) -> Image.Image:
+        """
+        Open a file path, encoded bytes or PIL image and decode its pixels
+        (large JPEGs at a reduced scale), without converting or resizing.
+        """
+        height, width = self.target_size
+        if isinstance(image_input, Image.Image):
+            return image_input
+        source = io.BytesIO(image_input) if isinstance(image_input, (bytes, bytearray)) else image_input
+        img = Image.open(source)
+        if img.format == "JPEG" and (img.width >= 2 * width or img.height >= 2 * height):
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding
+            img.draft("RGB", (width, height))
+        img.load()
+        return img
+
+    def resize(self, img: Image.Image) -> Image.Image:
+        """Convert a decoded image to RGB at the target size."""
+        height, width = self.target_size
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        # Same interpolation as the training/evaluation input pipelines
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.BILINEAR)
+        return img
+
+    def open(self, image_input) -> Image.Image:
+        """
+        Open a file path, encoded bytes or PIL image, resized to the target size.
+        """
+        return self.resize(self.decode(image_input))
+
+    def load_into(self, image_input, index: int, timings: dict = None):
+        """
+        Decode one image into slot `index` of the batch buffer.
+
+        With `timings`, the seconds spent decoding and preprocessing (convert,
+        resize, copy) are appended to its "decode" and "preprocess" lists.
+        """
+        if timings is None:
+            np.copyto(self.buffer[index], np.asarray(self.open(image_input)))
+            return
+        start = time.perf_counter()
+        img = self.decode(image_input)
+        decoded = time.perf_counter()
+        np.copyto(self.buffer[index], np.asarray(self.resize(img)))
+        timings.setdefault("decode", []).append(decoded - start)
+        timings.setdefault("preprocess", []).append(time.perf_counter() - decoded)
+
+    def load_views_into(self, image_input, index: int, views: list, timings: dict = None):
+        """
+        Decode one image once and write one slot per TTA view (see
+        `cnn_classifier.components.tta.TTAView`), starting at slot `index`.
+        Views sharing a crop share its resize; flips are array views.
+        """
+        start = time.perf_counter()
+        img = self.decode(image_input)
+        decoded = time.perf_counter()
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        height, width = self.target_size
+        resized = {}
+        for offset, view in enumerate(views):
+            box = view.box(*img.size)
+            if box not in resized:
+                resized[box] = np.asarray(
+                    self.resize(img) if box is None else img.resize((width, height), Image.BILINEAR, box=box)
+                )
+            pixels = resized[box]
+            if view.hflip:
+                pixels = pixels[:, ::-1]
+            if view.vflip:
+                pixels = pixels[::-1]
+            np.copyto(self.buffer[index + offset], pixels)
+        if timings is not None:
+            timings.setdefault("decode", []).append(decoded - start)
+            timings.setdefault("preprocess", []).append(time.perf_counter() - decoded)
+
+    def batch(self, n: int) -> np.ndarray:
+        """View of the first `n` slots, shape (n, height, width, 3), dtype uint8."""
+        return self.buffer[:n]
@@ -0,0 +1,73 @@
+import threading
+from cnn_classifier.utils.metrics import Counter, Gauge, Histogram, render_prometheus
+
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000]
+STAGES = ("upload_read", "decode", "preprocess", "inference", "render")
+
+class ServingMetrics:
+    """
+    Request metrics of the web app, exposed in the Prometheus text format.
+
+    Per-request latency is split into stages: `upload_read` (reading the
+    request body), `decode` and `preprocess` (per image, in the inference
+    executor), `inference` (the batched forward pass, observed once per image
+    it scored) and `render` (building the response).
+
+    Args:
+        extra (list, optional): further metrics to expose, e.g. the MicroBatcher histograms.
+    """
+    def __init__(self, extra: list = None):
+        self.stages = {
+            stage: Histogram(
+                name="request_stage_ms",
+                buckets=LATENCY_BUCKETS_MS,
+                description="Time spent per request stage, in milliseconds",
+                labels={"stage": stage}
+            )
+            for stage in STAGES
+        }
+        self.inflight = Gauge(name="inflight_requests", description="Requests currently being handled")
+        self.model_load_seconds = Gauge(name="model_load_seconds", description="Time taken to load the model at startup")
+        self.extra = list(extra or [])
+        self._requests = {}
+        self._latency = {}
+        self._lock = threading.Lock()
+
+    def _get(self, registry: dict, key: tuple, factory):
+        with self._lock:
+            if key not in registry:
+                registry[key] = factory()
+            return registry[key]
+
+    def observe_request(self, endpoint: str, status: int, seconds: float):
+        """Count a finished request and record its end-to-end latency."""
+        self._get(self._requests, (endpoint, status), lambda: Counter(
+            name="requests_total",
+            description="Requests handled, by endpoint and HTTP status",
+            labels={"endpoint": endpoint, "status": str(status)}
+        )).inc()
+        self._get(self._latency, (endpoint,), lambda: Histogram(
+            name="request_latency_ms",
+            buckets=LATENCY_BUCKETS_MS,
+            description="End-to-end request latency, in milliseconds",
+            labels={"endpoint": endpoint}
+        )).observe(seconds * 1000.0)
+
+    def observe_stage(self, stage: str, seconds: float):
+        self.stages[stage].observe(seconds * 1000.0)
+
+    def observe_timings(self, timings: dict):
+        """Record the stage timings filled in by `PredictionPipeline.predict_proba_batch`."""
+        for stage in ("decode", "preprocess"):
+            for seconds in timings.get(stage, []):
+                self.observe_stage(stage, seconds)
+        for _ in range(timings.get("images", 0)):
+            self.observe_stage("inference", timings["inference"])
+
+    def render(self) -> str:
+        with self._lock:
+            requests, latency = list(self._requests.values()), list(self._latency.values())
+        return render_prometheus(
+            [*requests, *latency, *self.stages.values(), self.inflight, self.model_load_seconds, *self.extra],
+            prefix="cnn_classifier_"
+        )
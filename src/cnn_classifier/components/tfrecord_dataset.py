@@ -0,0 +1,173 @@
+import json
+import math
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from cnn_classifier import logger
+from cnn_classifier.components.dataset_manifest import read_manifest_summary, read_manifest_split
+
+MANIFEST_NAME = "manifest.json"
+SPLITS = ("training", "validation")
+
+def decode_and_resize(path, label, image_size):
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    # Same interpolation as image_dataset_from_directory
+    image = tf.image.resize(image, image_size, method="bilinear")
+    return tf.cast(tf.round(tf.clip_by_value(image, 0, 255)), tf.uint8), label
+
+def _serialize(image: np.ndarray, label: int) -> bytes:
+    example = tf.train.Example(features=tf.train.Features(feature={
+        "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[image.tobytes()])),
+        "label": tf.train.Feature(int64_list=tf.train.Int64List(value=[label]))
+    }))
+    return example.SerializeToString()
+
+def write_tfrecord_shards(
+        dataset_manifest: Path,
+        output_dir: Path,
+        image_size: list,
+        images_per_shard: int,
+        seed: int = 42) -> dict:
+    """
+    Decode, resize and write every image as raw uint8 pixels into sharded TFRecords.
+
+    Images and their splits come from the dataset manifest (duplicates
+    excluded); each split is shuffled once with `seed` so every shard is a
+    random sample. Writes `<split>-NNNNN-of-MMMMM.tfrecord` files plus a
+    `manifest.json` with per-split and per-class counts. Nothing is
+    rewritten when the shards already match the dataset manifest and image
+    size. Images that cannot be decoded are skipped (and not counted).
+
+    Returns:
+        dict: the TFRecord manifest.
+    """
+    output_dir = Path(output_dir)
+    image_size = [int(v) for v in image_size[:2]]
+    summary = read_manifest_summary(dataset_manifest)
+    settings = {
+        "fingerprint": summary["fingerprint"],
+        "image_size": image_size,
+        "seed": seed
+    }
+
+    manifest_path = output_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if all(manifest.get(k) == v for k, v in settings.items()):
+            logger.info(f"TFRecord shards at {output_dir} are up to date, skipping")
+            return manifest
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob("*.tfrecord"):
+        stale.unlink()
+
+    class_names = summary["class_names"]
+    manifest = {**settings, "class_names": class_names, "splits": {}}
+    for split in SPLITS:
+        paths, labels = read_manifest_split(dataset_manifest, split)
+        order = np.random.RandomState(seed).permutation(len(paths))
+        samples = [(paths[i], labels[i]) for i in order]
+        num_shards = max(1, math.ceil(len(samples) / images_per_shard))
+        shards = [f"{split}-{i:05d}-of-{num_shards:05d}.tfrecord" for i in range(num_shards)]
+        writers = [tf.io.TFRecordWriter(str(output_dir / shard)) for shard in shards]
+
+        dataset = tf.data.Dataset.from_tensor_slices((
+            tf.constant([p for p, _ in samples], dtype=tf.string),
+            tf.constant([l for _, l in samples], dtype=tf.int64)
+        )).map(
+            lambda p, l: decode_and_resize(p, l, image_size),
+            num_parallel_calls=tf.data.AUTOTUNE
+        ).ignore_errors(log_warning=True).prefetch(tf.data.AUTOTUNE)
+
+        class_counts = [0] * len(class_names)
+        count = 0
+        try:
+            for image, label in dataset.as_numpy_iterator():
+                # Contiguous runs per shard keep each shard a random sample of the split
+                writers[min(count // images_per_shard, num_shards - 1)].write(_serialize(image, int(label)))
+                class_counts[label] += 1
+                count += 1
+        finally:
+            for writer in writers:
+                writer.close()
+
+        manifest["splits"][split] = {
+            "count": count,
+            "class_counts": dict(zip(class_names, class_counts)),
+            "shards": shards
+        }
+        logger.info(f"Wrote {count} {split} images into {num_shards} shards ({len(samples) - count} skipped)")
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    logger.info(f"TFRecord manifest saved at {manifest_path}")
+    return manifest
+
+def load_manifest(tfrecord_dir: Path) -> dict:
+    with open(Path(tfrecord_dir) / MANIFEST_NAME) as f:
+        return json.load(f)
+
+def tfrecord_dataset(
+        tfrecord_dir: Path,
+        subset: str,
+        batch_size: int,
+        shuffle: bool,
+        seed: int = 42,
+        image_size: list = None):
+    """
+    Read one split written by `write_tfrecord_shards`.
+
+    Shards are read concurrently with a parallel interleave. Yields
+    (uint8 images, one-hot labels) batches, parsed a batch at a time and
+    matching `image_dataset_from_directory(label_mode="categorical")` apart
+    from dtype. With `batch_size=None`, yields single unshuffled examples
+    instead (for caching before shuffling and batching).
+
+    Returns:
+        tuple: (dataset, number of images, manifest)
+
+    Raises:
+        ValueError: If `image_size` is given and the shards were written at another size.
+    """
+    manifest = load_manifest(tfrecord_dir)
+    split = manifest["splits"][subset]
+    height, width = manifest["image_size"]
+    if image_size is not None and [height, width] != [int(v) for v in image_size[:2]]:
+        raise ValueError(
+            f"TFRecords in {tfrecord_dir} hold {height}x{width} images but {image_size[:2]} was requested; "
+            "rerun the data ingestion stage"
+        )
+    num_classes = len(manifest["class_names"])
+
+    files = tf.data.Dataset.from_tensor_slices([str(Path(tfrecord_dir) / shard) for shard in split["shards"]])
+    if shuffle:
+        files = files.shuffle(len(split["shards"]), seed=seed, reshuffle_each_iteration=True)
+    records = files.interleave(
+        tf.data.TFRecordDataset,
+        cycle_length=min(len(split["shards"]), 8),
+        num_parallel_calls=tf.data.AUTOTUNE
+    ).apply(tf.data.experimental.assert_cardinality(split["count"]))
+
+    features = {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64)
+    }
+
+    def parse(serialized):
+        parsed = tf.io.parse_example(serialized, features)
+        images = tf.reshape(tf.io.decode_raw(parsed["image"], tf.uint8), [-1, height, width, 3])
+        return images, tf.one_hot(parsed["label"], num_classes)
+
+    def parse_single(serialized):
+        images, labels = parse(tf.expand_dims(serialized, 0))
+        return images[0], labels[0]
+
+    if batch_size is None:
+        dataset = records.map(parse_single, num_parallel_calls=tf.data.AUTOTUNE)
+        return dataset, split["count"], manifest
+
+    if shuffle:
+        records = records.shuffle(batch_size * 8, seed=seed, reshuffle_each_iteration=True)
+    dataset = records.batch(batch_size).map(parse, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset, split["count"], manifest
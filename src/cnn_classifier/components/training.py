@@ -1,78 +1,153 @@
+import time
+import numpy as np
 import tensorflow as tf
+from cnn_classifier import logger
+from cnn_classifier.utils.utilities import save_json
+from cnn_classifier.utils.tf_utilities import get_distribution_strategy, is_chief, worker_name, with_precision
 from cnn_classifier.entity.pipeline_config import TrainingConfig
+from cnn_classifier.components.input_pipeline import load_image_split, cache_dataset, InputProbe
+from cnn_classifier.components.augmentation import FusedAffineAugmentation
+from cnn_classifier.components.callbacks import StepTimeReport, TrainingProfiler
+from cnn_classifier.components.feature_cache import split_frozen_backbone, extract_features, feature_dataset
+from cnn_classifier.components.model_definition import backbone_blocks
 from pathlib import Path
 import math
 
+def training_optimizer(learning_rate: float, precision: str) -> tf.keras.optimizers.Optimizer:
+    optimizer = tf.keras.optimizers.Adam(learning_rate=learning_rate)
+    if precision == "mixed_float16":
+        # float16 gradients underflow without loss scaling
+        optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+    return optimizer
+
+def compile_for_training(model: tf.keras.Model, learning_rate: float, precision: str):
+    """
+    Compile `model` with a fresh optimizer and the training stage's loss,
+    metrics and compile settings (also used by benchmarks/bench_precision.py).
+    """
+    model.compile(
+        optimizer=training_optimizer(learning_rate, precision),
+        loss=tf.keras.losses.CategoricalCrossentropy(),
+        metrics=["accuracy"],
+        jit_compile="auto"
+    )
+
 class Training:
     def __init__(self, config: TrainingConfig):
         self.config = config
         self.train_generator = None
         self.valid_generator = None
+        # Timestamps around the training prefetch and the stages TrainingProfiler times
+        self.input_probe = InputProbe()
+        self.input_stages = {}
+
+        # Created first: multi-worker collectives must be set up before any other TF op
+        self.strategy = get_distribution_strategy(self.config.params_distribution_strategy)
+        self.is_chief = is_chief(self.strategy)
+        self.worker = worker_name(self.strategy)
+
+        # BATCH_SIZE is per replica; LEARNING_RATE is the single-replica rate
+        replicas = self.strategy.num_replicas_in_sync
+        scaling = {"linear": replicas, "sqrt": math.sqrt(replicas), "none": 1}
+        if self.config.params_lr_scaling not in scaling:
+            raise ValueError(f"Unknown LR_SCALING '{self.config.params_lr_scaling}', expected linear, sqrt or none")
+        self.global_batch_size = self.config.params_batch_size * replicas
+        self.learning_rate = self.config.params_learning_rate * scaling[self.config.params_lr_scaling]
+        if replicas > 1:
+            logger.info(
+                f"{replicas} replicas: global batch size {self.global_batch_size}, "
+                f"learning rate {self.learning_rate:g} ({self.config.params_lr_scaling} scaling)"
+            )
     
     def get_base_model(self):
-        # Load WITHOUT optimizer/compile state
-        self.model = tf.keras.models.load_model(self.config.updated_base_model_path, compile=False)
+        with self.strategy.scope():
+            # Load WITHOUT optimizer/compile state
+            self.model = tf.keras.models.load_model(self.config.updated_base_model_path, compile=False)
+
+            if self.config.params_precision != "float32":
+                # bfloat16/float16 compute with float32 variables and a float32 softmax head
+                self.model = with_precision(self.model, self.config.params_precision)
+                logger.info(f"Training with the {self.config.params_precision} precision policy")
+
+        # What FINE_TUNE_STAGES can unfreeze: the backbone as frozen in stage 02
+        self.backbone_blocks = backbone_blocks(self.model, self.config.params_backbone)
 
         # Compile fresh optimizer
-        self.model.compile(
-            optimizer=tf.keras.optimizers.Adam(learning_rate=self.config.params_learning_rate),
-            loss=tf.keras.losses.CategoricalCrossentropy(),
-            metrics=["accuracy"],
-            steps_per_execution=10,
-            jit_compile="auto"
+        self._compile(self.model, self.learning_rate)
+
+    def _compile(self, model: tf.keras.Model, learning_rate: float):
+        """Compile `model` with a fresh optimizer, e.g. after its trainable layers changed."""
+        with self.strategy.scope():
+            compile_for_training(model, learning_rate, self.config.params_precision)
+
+    def _cached_split(self, subset: str, shuffle: bool) -> tuple:
+        """Decoded uint8 elements of one split, cached before any augmentation."""
+        split = load_image_split(
+            dataset_format=self.config.params_dataset_format,
+            subset=subset,
+            image_size=self.config.params_image_size,
+            dataset_manifest=self.config.dataset_manifest,
+            tfrecord_dir=self.config.tfrecord_dir,
+            shuffle=shuffle,
+            seed=42
         )
-    
-    def train_validation_generator(self):
-        ds_kwargs = dict(
-            directory=self.config.training_data,
-            validation_split=0.20,
-            seed=42,
-            image_size=self.config.params_image_size[:-1],  # e.g., [224, 224]
-            batch_size=self.config.params_batch_size,
-            label_mode="categorical",
-            interpolation="bilinear"
+        key_fields = split["key_fields"]
+        if self.worker is not None:
+            # Workers on one host must not write the same cache files
+            key_fields = {**key_fields, "worker": self.worker}
+        dataset = cache_dataset(
+            split["dataset"], self.config.dataset_cache_mode, self.config.dataset_cache_dir, subset, key_fields
         )
+        return dataset, split["count"], key_fields
 
-        train_ds = tf.keras.utils.image_dataset_from_directory(
-            subset="training",
-            shuffle=True,
-            **ds_kwargs
-        )
+    def train_validation_generator(self):
+        # Feature extraction stores every pass over the split in the same order
+        feature_cache = self.config.params_feature_cache
+        train_ds, self.num_train_images, train_key = self._cached_split("training", shuffle=not feature_cache)
+        validation_ds, self.num_val_images, validation_key = self._cached_split("validation", shuffle=False)
+        if self.num_train_images == 0 or self.num_val_images == 0:
+            raise ValueError(
+                f"Need images in both splits, found {self.num_train_images} training "
+                f"and {self.num_val_images} validation images"
+            )
+        logger.info(f"Training on {self.num_train_images} images, validating on {self.num_val_images}")
 
-        validation_ds = tf.keras.utils.image_dataset_from_directory(
-            subset="validation",
-            shuffle=False,
-            **ds_kwargs
-        )
+        if feature_cache:
+            self._feature_generators(train_ds, train_key, validation_ds, validation_key)
+            return
 
         # Rescale
         layers = tf.keras.layers
         AUTOTUNE = tf.data.AUTOTUNE
         rescale = layers.Rescaling(1.0 / 255)
-        
-        # # Cache raw decoded images
-        # train_ds = train_ds.cache()
-        # validation_ds = validation_ds.cache()
+        # Batches are global; tf.distribute splits them across replicas
+        batch_size = self.global_batch_size
 
-        # Augmentation
-        if self.config.params_is_augmentation:
-            aug = tf.keras.Sequential([
-                layers.RandomRotation(40 / 360),          # ~40 degrees
-                layers.RandomFlip("horizontal"),
-                layers.RandomTranslation(0.2, 0.2),       # height, width shift
-                layers.RandomZoom(0.2, 0.2),
-                layers.RandomShear(0.2, 0.2)              # shear transformations
-            ])
+        self.input_stages = {"read": train_ds.batch(batch_size)}
 
-            train_ds = train_ds.map(
-                lambda x, y: (aug(rescale(x), training=True), y),
-                num_parallel_calls=AUTOTUNE
+        # Shuffle after the cache so every epoch sees a new order
+        train_ds = train_ds.shuffle(batch_size * 8, seed=42, reshuffle_each_iteration=True).batch(batch_size)
+        validation_ds = validation_ds.batch(batch_size)
+        self.input_stages["shuffle_batch"] = train_ds
+
+        # Augmentation (after the cache, so each epoch gets fresh random transforms):
+        # rotation, flip, translation, zoom and shear fused into one warp per image
+        if self.config.params_is_augmentation:
+            aug = FusedAffineAugmentation(
+                rotation=40,                              # degrees
+                translation=0.2,                          # height, width shift
+                zoom=0.2,
+                shear=0.2,                                # shear transformations
+                horizontal_flip=True,
+                seed=self.config.params_augmentation_seed
             )
+            train_ds = aug.apply(train_ds, preprocess=rescale)
         else:
             train_ds = train_ds.map(
                 lambda x, y: (rescale(x), y),
                 num_parallel_calls=AUTOTUNE
             )
+        self.input_stages["augment" if self.config.params_is_augmentation else "rescale"] = train_ds
         
         validation_ds = validation_ds.map(
             lambda x, y: (rescale(x), y),
@@ -80,39 +155,344 @@ class Training:
         )
 
         # Performance
-        train_ds = train_ds.cache().prefetch(AUTOTUNE)
-        validation_ds = validation_ds.cache().prefetch(AUTOTUNE)
+        if self.config.params_augmentation_seed is None:
+            # Reproducibility not requested: let parallel stages yield out of order
+            options = tf.data.Options()
+            options.deterministic = False
+            train_ds = train_ds.with_options(options)
+        if self.worker is not None:
+            # Every worker reads the (cached) split and keeps its share of the
+            # elements; file-based sharding would split the cache itself
+            options = tf.data.Options()
+            options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.DATA
+            train_ds = train_ds.with_options(options)
+            validation_ds = validation_ds.with_options(options)
+        if self.config.params_repeat:
+            # One endless stream instead of re-creating the iterator every epoch;
+            # an epoch is then defined purely by steps_per_epoch.
+            train_ds = train_ds.repeat()
+        self.input_stages["prefetch"] = train_ds.prefetch(AUTOTUNE)
+        train_ds = self.input_probe.prefetch(train_ds)
+        validation_ds = validation_ds.prefetch(AUTOTUNE)
 
         # Assign to class attributes
         self.train_generator = train_ds
         self.valid_generator = validation_ds
 
-        # Save number of images for steps calculation
-        self.num_train_images = int((1 - ds_kwargs['validation_split']) * 8067)  # 80% split
-        self.num_val_images = int(ds_kwargs['validation_split'] * 8067)
+    def _feature_generators(self, train_ds, train_key: dict, validation_ds, validation_key: dict):
+        """
+        FEATURE_CACHE: run the frozen backbone once per split, store its outputs
+        in memory-mapped arrays, and train only the head on them.
 
-    def train(self, callback_list: list):
-        self.steps_per_epoch = math.ceil(self.num_train_images / self.config.params_batch_size)
-        self.validation_steps = math.ceil(self.num_val_images / self.config.params_batch_size)
-    
-        # Train the model
-        self.model.fit(
+        Valid only while nothing before the head changes between epochs: with
+        AUGMENTATION the per-epoch random transforms are replaced by
+        FEATURE_CACHE_AUGMENTED_COPIES fixed augmented copies per image.
+        """
+        if isinstance(self.strategy, tf.distribute.MultiWorkerMirroredStrategy):
+            raise ValueError("FEATURE_CACHE trains the head on one host; use DISTRIBUTION_STRATEGY none or mirrored")
+        if any(stage["unfreeze_blocks"] for stage in self._fine_tuning_stages()):
+            raise ValueError("FEATURE_CACHE keeps the backbone frozen; FINE_TUNE_STAGES cannot unfreeze blocks with it")
+
+        copies, augmentation = self.config.params_feature_cache_copies, None
+        if self.config.params_is_augmentation and copies:
+            logger.warning(
+                f"FEATURE_CACHE: augmentation is limited to {copies} fixed augmented copies per image; "
+                "each epoch picks one of them (or the original) instead of a fresh random transform"
+            )
+            seed = self.config.params_augmentation_seed
+            augmentation = FusedAffineAugmentation(
+                rotation=40,
+                translation=0.2,
+                zoom=0.2,
+                shear=0.2,
+                horizontal_flip=True,
+                seed=42 if seed is None else seed  # the copies must be reproducible
+            )
+        elif self.config.params_is_augmentation:
+            logger.warning(
+                "FEATURE_CACHE trains on features of unaugmented images, so AUGMENTATION has no effect. "
+                "Set FEATURE_CACHE_AUGMENTED_COPIES for a fixed set of augmented copies, "
+                "or turn FEATURE_CACHE off for fresh augmentation every epoch."
+            )
+
+        backbone, self.head = split_frozen_backbone(self.model)
+        self._compile(self.head, self.learning_rate)
+
+        batch_size = self.global_batch_size
+        train_features = extract_features(
+            backbone, train_ds, self.num_train_images, self.config.feature_cache_dir, "training", train_key,
+            batch_size, augmentation=augmentation, copies=copies
+        )
+        validation_features = extract_features(
+            backbone, validation_ds, self.num_val_images, self.config.feature_cache_dir, "validation", validation_key,
+            batch_size
+        )
+
+        train_ds = feature_dataset(train_features, batch_size, shuffle=True)
+        if self.config.params_repeat:
+            train_ds = train_ds.repeat()
+        self.input_stages = {"features": train_ds, "prefetch": train_ds.prefetch(tf.data.AUTOTUNE)}
+        self.train_generator = self.input_probe.prefetch(train_ds)
+        self.valid_generator = feature_dataset(validation_features, batch_size, shuffle=False).prefetch(tf.data.AUTOTUNE)
+
+    def _fine_tuning_stages(self) -> list:
+        """
+        FINE_TUNE_STAGES as a list of {epochs, unfreeze_blocks, lr_factor};
+        without it, a single stage of EPOCHS with the backbone as loaded.
+        """
+        stages = self.config.params_fine_tune_stages or [{"epochs": self.config.params_epochs}]
+        resolved = []
+        for stage in stages:
+            unknown = set(stage) - {"epochs", "unfreeze_blocks", "lr_factor"}
+            if unknown or "epochs" not in stage:
+                raise ValueError(f"FINE_TUNE_STAGES entries need 'epochs' (plus optional unfreeze_blocks, lr_factor), got {dict(stage)}")
+            resolved.append({
+                "epochs": int(stage["epochs"]),
+                "unfreeze_blocks": int(stage.get("unfreeze_blocks", 0)),
+                "lr_factor": float(stage.get("lr_factor", 1.0))
+            })
+        return resolved
+
+    def _unfreeze_top_blocks(self, count: int) -> bool:
+        """
+        Make the top `count` backbone blocks trainable and the rest frozen;
+        BatchNormalization layers stay frozen so their statistics are kept.
+
+        Returns:
+            bool: whether any layer changed, i.e. the model needs recompiling.
+        """
+        if count > len(self.backbone_blocks):
+            logger.warning(f"Asked to unfreeze {count} blocks, the backbone has {len(self.backbone_blocks)}")
+        unfrozen = self.backbone_blocks[len(self.backbone_blocks) - count:] if count else []
+        unfrozen = {id(layer) for block in unfrozen for layer in block}
+
+        changed = False
+        for block in self.backbone_blocks:
+            for layer in block:
+                trainable = id(layer) in unfrozen and not isinstance(layer, tf.keras.layers.BatchNormalization)
+                if layer.trainable != trainable:
+                    layer.trainable = trainable
+                    changed = True
+        return changed
+
+    def _fit(self, model: tf.keras.Model, callback_list: list, initial_epoch: int, epochs: int) -> dict:
+        """Train epochs [initial_epoch, epochs) and return the per-epoch logs."""
+        if isinstance(self.strategy, tf.distribute.MultiWorkerMirroredStrategy):
+            return self._fit_multi_worker(callback_list, initial_epoch, epochs)
+        history = model.fit(
             self.train_generator,
-            epochs=self.config.params_epochs,
+            initial_epoch=initial_epoch,
+            epochs=epochs,
             steps_per_epoch=self.steps_per_epoch,
-            validation_steps=self.validation_steps,
             validation_data=self.valid_generator,
             callbacks=callback_list
         )
+        return history.history
+
+    def train(self, callback_list: list):
+        # The last partial batch is kept, so one pass over the data is ceil(n / batch) steps
+        # (StepTimeReport logs the steps each epoch actually ran against this).
+        # Validation always runs to the end of its (finite) split, which also lets
+        # a cache on it be finalised.
+        self.steps_per_epoch = math.ceil(self.num_train_images / self.global_batch_size)
+
+        if self.is_chief:
+            callback_list = callback_list + [
+                StepTimeReport(
+                    path=self.config.step_time_report_path,
+                    precision=self.config.params_precision,
+                    batch_size=self.global_batch_size
+                ),
+                TrainingProfiler(
+                    path=self.config.profile_report_path,
+                    batch_size=self.global_batch_size,
+                    probe=self.input_probe,
+                    input_stages=self.input_stages,
+                    stage_batches=self.config.params_profile_stage_batches,
+                    trace_steps=self.config.params_profile_trace_steps,
+                    trace_dir=self.config.profile_trace_dir
+                )
+            ]
+
+        # Train the model, stage by stage: typically the head alone first, then
+        # the top backbone blocks at a lower learning rate. ModelCheckpoint keeps
+        # the best epoch over all stages.
+        model = self.head if self.config.params_feature_cache else self.model
+        report, epoch = [], 0
+        for index, stage in enumerate(self._fine_tuning_stages(), start=1):
+            learning_rate = self.learning_rate * stage["lr_factor"]
+            if self._unfreeze_top_blocks(stage["unfreeze_blocks"]):
+                # New trainable variables need a new optimizer and new train function
+                self._compile(model, learning_rate)
+            else:
+                model.optimizer.learning_rate.assign(learning_rate)
+
+            trainable_params = int(sum(np.prod(w.shape) for w in model.trainable_weights))
+            logger.info(
+                f"Fine-tuning stage {index}: top {stage['unfreeze_blocks']} backbone block(s) unfrozen, "
+                f"{trainable_params} trainable parameters, learning rate {learning_rate:g}"
+            )
+            start = time.perf_counter()
+            history = self._fit(model, callback_list, initial_epoch=epoch, epochs=epoch + stage["epochs"])
+            epochs_run = len(history["val_accuracy"])
+            epoch += epochs_run
+            report.append({
+                "stage": index,
+                "unfreeze_blocks": stage["unfreeze_blocks"],
+                "trainable_params": trainable_params,
+                "learning_rate": learning_rate,
+                "epochs": epochs_run,
+                "time_s": time.perf_counter() - start,
+                "best_val_accuracy": float(max(history["val_accuracy"])),
+                "final_val_accuracy": float(history["val_accuracy"][-1]),
+                "total_epochs": epoch
+            })
+
+        if self.is_chief:
+            table = "\n".join(
+                f"{r['stage']:>5d} {r['unfreeze_blocks']:>8d} {r['learning_rate']:>10.2g} {r['epochs']:>6d} "
+                f"{r['time_s']:>8.1f} {r['best_val_accuracy']:>9.4f} {r['final_val_accuracy']:>9.4f}"
+                for r in report
+            )
+            logger.info(
+                f"Fine-tuning summary\n{'stage':>5s} {'unfrozen':>8s} {'lr':>10s} {'epochs':>6s} "
+                f"{'time s':>8s} {'best acc':>9s} {'final acc':>9s}\n{table}"
+            )
+            save_json(path=self.config.fine_tuning_report_path, data={
+                "stages": report,
+                "total_epochs": epoch,
+                "total_time_s": sum(r["time_s"] for r in report),
+                "best_val_accuracy": max(r["best_val_accuracy"] for r in report)
+            })
+
+        # Only the chief writes the trained model; other workers' checkpoints are scratch
+        if not self.is_chief:
+            return
 
         # Load the best model saved by ModelCheckpoint
-        self.model = tf.keras.models.load_model(self.config.model_checkpoint_filepath)
+        if self.config.params_feature_cache:
+            # The checkpoint holds the head alone; its layers are shared with the
+            # full model, so restoring them reassembles backbone + trained head
+            best_head = tf.keras.models.load_model(self.config.model_checkpoint_filepath, compile=False)
+            self.head.set_weights(best_head.get_weights())
+        elif self.config.params_precision == "float32":
+            self.model = tf.keras.models.load_model(self.config.model_checkpoint_filepath)
+        else:
+            self.model = tf.keras.models.load_model(self.config.model_checkpoint_filepath, compile=False)
+
+        if self.config.params_precision != "float32":
+            # Serve a float32 model, compiled for the evaluation stage
+            self.model = with_precision(self.model, "float32")
+            self.model.compile(
+                optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate),
+                loss=tf.keras.losses.CategoricalCrossentropy(),
+                metrics=["accuracy"]
+            )
 
         self.save_model(
             path=self.config.trained_model_path,
             model=self.model
         )
 
+    def _fit_multi_worker(self, callback_list: list, initial_epoch: int, epochs: int) -> dict:
+        """
+        `model.fit` for MultiWorkerMirroredStrategy, which Keras 3's fit does
+        not support. Each step runs on every replica under `strategy.run`; the
+        optimizer all-reduces the gradients, and loss/accuracy sums are reduced
+        across workers so every worker's callbacks (early stopping included)
+        see the same logs and stop at the same epoch.
+        """
+        strategy, model = self.strategy, self.model
+        loss_fn = tf.keras.losses.CategoricalCrossentropy(reduction=None)
+        with strategy.scope():
+            model.optimizer.build(model.trainable_variables)
+
+        def totals(y, y_pred, per_example_loss):
+            correct = tf.cast(tf.equal(tf.argmax(y, axis=1), tf.argmax(y_pred, axis=1)), tf.float32)
+            return tf.stack([
+                tf.reduce_sum(per_example_loss),
+                tf.reduce_sum(correct),
+                tf.cast(tf.shape(y)[0], tf.float32)
+            ])
+
+        # Sharding a small last batch can leave a worker with no elements, and
+        # convolutions fail on an empty batch, so such a replica skips the
+        # model: it adds nothing to the totals and zero gradients, still taking
+        # part in the gradient all-reduce the other replicas wait on
+        def train_step(x, y):
+            def compute():
+                with tf.GradientTape() as tape:
+                    y_pred = model(x, training=True)
+                    per_example_loss = loss_fn(y, y_pred)
+                    loss = tf.nn.compute_average_loss(per_example_loss)
+                    # A no-op unless the optimizer is a LossScaleOptimizer (mixed_float16)
+                    scaled_loss = model.optimizer.scale_loss(loss)
+                gradients = tape.gradient(scaled_loss, model.trainable_variables)
+                return gradients, totals(y, y_pred, per_example_loss)
+
+            def skip():
+                return [tf.zeros_like(v) for v in model.trainable_variables], tf.zeros([3])
+
+            gradients, step_totals = tf.cond(tf.shape(x)[0] > 0, compute, skip)
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return step_totals
+
+        def test_step(x, y):
+            def compute():
+                y_pred = model(x, training=False)
+                return totals(y, y_pred, loss_fn(y, y_pred))
+
+            return tf.cond(tf.shape(x)[0] > 0, compute, lambda: tf.zeros([3]))
+
+        @tf.function
+        def distributed_train_step(iterator):
+            return strategy.reduce(tf.distribute.ReduceOp.SUM, strategy.run(train_step, args=next(iterator)), axis=None)
+
+        @tf.function(reduce_retracing=True)
+        def distributed_test_step(batch):
+            return strategy.reduce(tf.distribute.ReduceOp.SUM, strategy.run(test_step, args=batch), axis=None)
+
+        train_ds = self.train_generator if self.config.params_repeat else self.train_generator.repeat()
+        train_iterator = iter(strategy.experimental_distribute_dataset(train_ds))
+        validation_ds = strategy.experimental_distribute_dataset(self.valid_generator)
+
+        callbacks = tf.keras.callbacks.CallbackList(
+            callback_list,
+            add_history=True,
+            add_progbar=self.is_chief,
+            model=model,
+            verbose=1,
+            epochs=epochs,
+            steps=self.steps_per_epoch
+        )
+        model.stop_training = False
+        callbacks.on_train_begin()
+        logs, history = {}, {}
+        for epoch in range(initial_epoch, epochs):
+            callbacks.on_epoch_begin(epoch)
+            # [loss sum, correct, count]
+            train_totals = np.zeros(3)
+            for step in range(self.steps_per_epoch):
+                callbacks.on_train_batch_begin(step)
+                train_totals += distributed_train_step(train_iterator).numpy()
+                logs = {"loss": train_totals[0] / train_totals[2], "accuracy": train_totals[1] / train_totals[2]}
+                callbacks.on_train_batch_end(step, logs)
+
+            validation_totals = np.zeros(3)
+            for batch in validation_ds:
+                validation_totals += distributed_test_step(batch).numpy()
+            logs.update(
+                val_loss=validation_totals[0] / validation_totals[2],
+                val_accuracy=validation_totals[1] / validation_totals[2]
+            )
+            callbacks.on_epoch_end(epoch, logs)
+            for name, value in logs.items():
+                history.setdefault(name, []).append(value)
+            if model.stop_training:
+                break
+        callbacks.on_train_end(logs)
+        return history
+
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
         model.save(path)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import numpy as np
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class TTAView:
+    """
+    One test-time augmentation view of an image.
+
+    Attributes:
+        name: reported in benchmarks and logs.
+        crop: side of the cropped region as a fraction of the decoded image
+            (1.0: the whole image, as without TTA); the crop is resized to the
+            model input, so a smaller crop is a zoom in.
+        anchor: (x, y) position of the crop within the free space, 0.5 centred.
+        hflip, vflip: mirror the view horizontally / vertically.
+    """
+    name: str
+    crop: float = 1.0
+    anchor: tuple = (0.5, 0.5)
+    hflip: bool = False
+    vflip: bool = False
+
+    def box(self, width: int, height: int):
+        """PIL crop box of this view in a `width` x `height` image (None: the whole image)."""
+        if self.crop >= 1.0:
+            return None
+        crop_width, crop_height = width * self.crop, height * self.crop
+        left = (width - crop_width) * self.anchor[0]
+        top = (height - crop_height) * self.anchor[1]
+        return (left, top, left + crop_width, top + crop_height)
+
+# `tta_views: K` uses the first K; cheap, label-preserving views come first
+TTA_VIEWS = [
+    TTAView("identity"),
+    TTAView("hflip", hflip=True),
+    TTAView("center_crop", crop=0.875),
+    TTAView("hflip_center_crop", crop=0.875, hflip=True),
+    TTAView("vflip", vflip=True),
+    TTAView("top_left", crop=0.8, anchor=(0.0, 0.0)),
+    TTAView("top_right", crop=0.8, anchor=(1.0, 0.0)),
+    TTAView("bottom_left", crop=0.8, anchor=(0.0, 1.0)),
+    TTAView("bottom_right", crop=0.8, anchor=(1.0, 1.0)),
+]
+
+def get_views(count: int) -> list:
+    if not 1 <= count <= len(TTA_VIEWS):
+        raise ValueError(f"tta_views must be between 1 and {len(TTA_VIEWS)}, got {count}")
+    return TTA_VIEWS[:count]
+
+def log_probabilities(probabilities: np.ndarray) -> np.ndarray:
+    # The model ends in a softmax, so log-probabilities are its logits up to a per-image constant
+    return np.log(np.clip(probabilities, 1e-7, 1.0))
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+def aggregate_views(probabilities: np.ndarray, temperature: float = 1.0) -> np.ndarray:
+    """
+    Combine the per-view softmax outputs of shape (images, views, classes)
+    by averaging their logits, then rescale with `temperature` so the
+    returned probabilities are calibrated.
+    """
+    logits = log_probabilities(probabilities).mean(axis=1)
+    return softmax(logits / temperature).astype(np.float32)
+
+def fit_temperature(logits: np.ndarray, labels: np.ndarray, low: float = 0.05, high: float = 20.0) -> float:
+    """
+    Temperature minimising the negative log-likelihood of `labels` under
+    softmax(logits / T), found by golden-section search over log T.
+    """
+    labels = np.asarray(labels)
+
+    def nll(log_t: float) -> float:
+        scaled = logits / np.exp(log_t)
+        scaled = scaled - scaled.max(axis=1, keepdims=True)
+        log_norm = np.log(np.exp(scaled).sum(axis=1))
+        return float(np.mean(log_norm - scaled[np.arange(len(labels)), labels]))
+
+    ratio = (np.sqrt(5) - 1) / 2
+    a, b = np.log(low), np.log(high)
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    for _ in range(60):
+        if nll(c) < nll(d):
+            b, d = d, c
+            c = b - ratio * (b - a)
+        else:
+            a, c = c, d
+            d = a + ratio * (b - a)
+    return float(np.exp((a + b) / 2))
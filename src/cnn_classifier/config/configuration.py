@@ -7,7 +7,11 @@ from cnn_classifier.entity.pipeline_config import (
     BaseModelConfig,
     CallbacksConfig,
     TrainingConfig,
-    EvaluationConfig
+    EvaluationConfig,
+    ModelExportConfig,
+    PredictionConfig,
+    BulkPredictionConfig,
+    LoggingConfig
 )
 
 class ConfigurationManager:
@@ -31,8 +35,15 @@ class ConfigurationManager:
         data_ingestion_config = DataIngestionConfig(
             root_dir=root_dir,
             source_URL=config.source_URL,
+            source_sha256=config.source_sha256,
             local_data_file=local_data_file,
-            unzip_dir=unzip_dir
+            unzip_dir=unzip_dir,
+            extraction_manifest=Path(config.extraction_manifest),
+            extract_workers=config.extract_workers,
+            dataset_manifest=Path(config.dataset_manifest),
+            tfrecord_dir=Path(config.tfrecord_dir),
+            images_per_shard=config.images_per_shard,
+            params_image_size=self.params.IMAGE_SIZE
         )
 
         return data_ingestion_config
@@ -45,6 +56,7 @@ class ConfigurationManager:
             root_dir=Path(config.root_dir),
             base_model_path=Path(config.base_model_path),
             updated_model_path= Path(config.updated_model_path),
+            params_backbone=self.params.BACKBONE,
             params_image_size=self.params.IMAGE_SIZE,
             params_include_top=self.params.INCLUDE_TOP,
             params_weights=self.params.WEIGHTS,
@@ -84,12 +96,33 @@ class ConfigurationManager:
             trained_model_path=Path(training.trained_model_path),
             updated_base_model_path=Path(base_model.updated_model_path),
             training_data=Path(training_data),
+            dataset_manifest=Path(self.config.data_ingestion.dataset_manifest),
             params_batch_size=params.BATCH_SIZE,
             params_epochs=params.EPOCHS,
             params_is_augmentation=params.AUGMENTATION,
+            params_augmentation_seed=params.AUGMENTATION_SEED,
             params_image_size=params.IMAGE_SIZE,
             params_learning_rate=params.LEARNING_RATE,
-            model_checkpoint_filepath=Path(self.config.callbacks.model_checkpoint_filepath)
+            params_backbone=params.BACKBONE,
+            params_fine_tune_stages=params.FINE_TUNE_STAGES,
+            params_distribution_strategy=params.DISTRIBUTION_STRATEGY,
+            params_lr_scaling=params.LR_SCALING,
+            params_precision=params.PRECISION,
+            params_feature_cache=params.FEATURE_CACHE,
+            params_feature_cache_copies=params.FEATURE_CACHE_AUGMENTED_COPIES,
+            params_repeat=params.REPEAT,
+            params_dataset_format=params.DATASET_FORMAT,
+            params_profile_trace_steps=params.PROFILE_TRACE_STEPS,
+            params_profile_stage_batches=params.PROFILE_STAGE_BATCHES,
+            tfrecord_dir=Path(self.config.data_ingestion.tfrecord_dir),
+            dataset_cache_mode=self.config.dataset_cache.mode,
+            dataset_cache_dir=Path(self.config.dataset_cache.root_dir),
+            feature_cache_dir=Path(self.config.feature_cache.root_dir),
+            model_checkpoint_filepath=Path(self.config.callbacks.model_checkpoint_filepath),
+            step_time_report_path=Path(training.step_time_report_path),
+            fine_tuning_report_path=Path(training.fine_tuning_report_path),
+            profile_report_path=Path(training.profile_report_path),
+            profile_trace_dir=Path(training.profile_trace_dir)
         )
 
         return training_config
@@ -98,9 +131,107 @@ class ConfigurationManager:
         evaluation_config = EvaluationConfig(
             model_path=Path('artifacts/training/trained_model.h5'),
             training_data=Path('artifacts/data_ingestion/data/images'),
+            dataset_manifest=Path(self.config.data_ingestion.dataset_manifest),
+            tfrecord_dir=Path(self.config.data_ingestion.tfrecord_dir),
             params=self.params,
             params_image_size=self.params.IMAGE_SIZE,
-            params_batch_size=self.params.BATCH_SIZE
+            params_batch_size=self.params.BATCH_SIZE,
+            params_dataset_format=self.params.DATASET_FORMAT,
+            dataset_cache_mode=self.config.dataset_cache.mode,
+            dataset_cache_dir=Path(self.config.dataset_cache.root_dir)
         )
 
-        return evaluation_config    
\ No newline at end of file
+        return evaluation_config
+
+    def get_model_export_config(self) -> ModelExportConfig:
+        config = self.config.model_export
+        create_directories([config.root_dir])
+
+        model_export_config = ModelExportConfig(
+            root_dir=Path(config.root_dir),
+            trained_model_path=Path(self.config.training.trained_model_path),
+            training_data=Path(self.config.data_ingestion.unzip_dir) / "images",
+            dataset_manifest=Path(self.config.data_ingestion.dataset_manifest),
+            tfrecord_dir=Path(self.config.data_ingestion.tfrecord_dir),
+            float16_model_path=Path(config.float16_model_path),
+            int8_model_path=Path(config.int8_model_path),
+            evaluation_scores_path=Path("evaluation_scores.json"),
+            scores_path=Path(config.scores_path),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=self.params.BATCH_SIZE,
+            params_calibration_samples=self.params.EXPORT_CALIBRATION_SAMPLES,
+            params_dataset_format=self.params.DATASET_FORMAT,
+            dataset_cache_mode=self.config.dataset_cache.mode,
+            dataset_cache_dir=Path(self.config.dataset_cache.root_dir)
+        )
+
+        return model_export_config
+
+    def get_prediction_config(self) -> PredictionConfig:
+        config = self.config.prediction
+
+        prediction_config = PredictionConfig(
+            backend=config.backend,
+            model_path=Path(config.model_path),
+            tflite_model_path=Path(config.tflite_model_path),
+            params_image_size=self.params.IMAGE_SIZE,
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_wait_ms,
+            executor=config.executor,
+            max_workers=config.max_workers,
+            max_pending=config.max_pending,
+            jit_compile=config.jit_compile,
+            warmup=config.warmup,
+            cache_max_entries=config.cache_max_entries,
+            cache_ttl_seconds=config.cache_ttl_seconds,
+            cache_sqlite_path=Path(config.cache_sqlite_path) if config.cache_sqlite_path else None,
+            log_sample_rate=config.log_sample_rate,
+            tta_views=config.tta_views,
+            tta_temperature=config.tta_temperature
+        )
+
+        return prediction_config
+
+    def get_bulk_prediction_config(
+            self,
+            source: str,
+            output_path: str,
+            output_format: str = None,
+            batch_size: int = None,
+            overwrite: bool = False) -> BulkPredictionConfig:
+        config = self.config.bulk_prediction
+        output_path = Path(output_path)
+
+        if output_format is None:
+            output_format = OUTPUT_FORMATS_BY_SUFFIX.get(output_path.suffix.lower())
+            if output_format is None:
+                raise ValueError(
+                    f"Cannot infer output format from '{output_path.name}'; "
+                    f"use one of {sorted(OUTPUT_FORMATS_BY_SUFFIX)} or pass an explicit format"
+                )
+
+        bulk_prediction_config = BulkPredictionConfig(
+            source=str(source),
+            output_path=output_path,
+            output_format=output_format,
+            batch_size=batch_size or config.batch_size,
+            overwrite=overwrite,
+            parquet_rows_per_file=config.parquet_rows_per_file,
+            params_image_size=self.params.IMAGE_SIZE
+        )
+
+        return bulk_prediction_config
+
+    def get_logging_config(self) -> LoggingConfig:
+        config = self.config.logging
+
+        logging_config = LoggingConfig(
+            log_path=Path(config.log_path),
+            level=config.level,
+            json_lines=config.json_lines,
+            max_bytes=config.max_bytes,
+            backup_count=config.backup_count,
+            console=config.console
+        )
+
+        return logging_config
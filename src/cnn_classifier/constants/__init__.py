@@ -2,4 +2,10 @@
 from pathlib import Path
 
 CONFIG_FILE_PATH = Path("config/config.yaml")
-PARAMS_FILE_PATH = Path("params.yaml")
\ No newline at end of file
+PARAMS_FILE_PATH = Path("params.yaml")
+
+# Output order of the classifier head (alphabetical, as produced by image_dataset_from_directory)
+CLASS_NAMES = ("Coccidiosis", "Healthy", "New Castle Disease", "Salmonella")
+
+# Result file formats accepted by `cnn-classifier predict-bulk`, keyed by file suffix
+OUTPUT_FORMATS_BY_SUFFIX = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
@@ -5,14 +5,22 @@ from pathlib import Path
 class DataIngestionConfig:
     root_dir: Path
     source_URL: str
+    source_sha256: str
     local_data_file: Path
     unzip_dir: Path
+    extraction_manifest: Path
+    extract_workers: int
+    dataset_manifest: Path
+    tfrecord_dir: Path
+    images_per_shard: int
+    params_image_size: list
 
 @dataclass(frozen=True)
 class BaseModelConfig:
     root_dir: Path
     base_model_path: Path
     updated_model_path: Path
+    params_backbone: str
     params_image_size: list
     params_include_top: bool
     params_weights: str
@@ -31,17 +39,100 @@ class TrainingConfig:
     trained_model_path: Path
     updated_base_model_path: Path
     training_data: Path
+    dataset_manifest: Path
     params_epochs: int
     params_batch_size: int
     params_is_augmentation: bool
+    params_augmentation_seed: int
     params_image_size: list
     params_learning_rate: float
+    params_backbone: str
+    params_fine_tune_stages: list
+    params_distribution_strategy: str
+    params_lr_scaling: str
+    params_precision: str
+    params_feature_cache: bool
+    params_feature_cache_copies: int
+    params_repeat: bool
+    params_dataset_format: str
+    params_profile_trace_steps: list
+    params_profile_stage_batches: int
+    tfrecord_dir: Path
+    dataset_cache_mode: str
+    dataset_cache_dir: Path
+    feature_cache_dir: Path
     model_checkpoint_filepath: Path
+    step_time_report_path: Path
+    fine_tuning_report_path: Path
+    profile_report_path: Path
+    profile_trace_dir: Path
 
 @dataclass
 class EvaluationConfig:
     model_path: Path
     training_data: Path
+    dataset_manifest: Path
+    tfrecord_dir: Path
     params: dict
     params_image_size: list
-    params_batch_size: int
\ No newline at end of file
+    params_batch_size: int
+    params_dataset_format: str
+    dataset_cache_mode: str
+    dataset_cache_dir: Path
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    root_dir: Path
+    trained_model_path: Path
+    training_data: Path
+    dataset_manifest: Path
+    tfrecord_dir: Path
+    float16_model_path: Path
+    int8_model_path: Path
+    evaluation_scores_path: Path
+    scores_path: Path
+    params_image_size: list
+    params_batch_size: int
+    params_calibration_samples: int
+    params_dataset_format: str
+    dataset_cache_mode: str
+    dataset_cache_dir: Path
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    backend: str
+    model_path: Path
+    tflite_model_path: Path
+    params_image_size: list
+    max_batch_size: int
+    max_wait_ms: float
+    executor: str
+    max_workers: int
+    max_pending: int
+    jit_compile: bool
+    warmup: bool
+    cache_max_entries: int
+    cache_ttl_seconds: float
+    cache_sqlite_path: Path
+    log_sample_rate: float
+    tta_views: int
+    tta_temperature: float
+
+@dataclass(frozen=True)
+class BulkPredictionConfig:
+    source: str
+    output_path: Path
+    output_format: str
+    batch_size: int
+    overwrite: bool
+    parquet_rows_per_file: int
+    params_image_size: list
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    log_path: Path
+    level: str
+    json_lines: bool
+    max_bytes: int
+    backup_count: int
+    console: bool
@@ -1,33 +1,162 @@
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-import os
+import time
+import random
+import logging
+import threading
 import numpy as np
+from cnn_classifier import logger
+from cnn_classifier.constants import CLASS_NAMES
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.entity.pipeline_config import PredictionConfig
+from cnn_classifier.components.inference_backend import load_backend
+from cnn_classifier.components.preprocessing import ImagePreprocessor
+from cnn_classifier.components.prediction_cache import PredictionCache, file_fingerprint
+from cnn_classifier.components.tta import aggregate_views, get_views
 
 class PredictionPipeline:
-    def __init__(self):
-        # Load the trained model once during initialization
-        self.model = load_model(os.path.join("artifacts", "training", "trained_model.h5"))
-    
-    def predict(self, image_input):
-        if isinstance(image_input, str):
-            test_image = image.load_img(image_input, target_size=(224, 224))
-        else:
-            test_image = image_input
-            if test_image.size != (224, 224):
-                test_image = test_image.resize((224, 224))
-
-        test_image = image.img_to_array(test_image)
-        test_image = test_image / 255.0
-        test_image = np.expand_dims(test_image, axis=0)
-        
-        result = np.argmax(self.model.predict(test_image), axis=1)
-        print(f"Result = {result}")
-
-        if result[0] == 0:
-            return "Coccidiosis"
-        elif result[0] == 1:
-            return "Healthy"
-        elif result[0] == 2:
-            return "New Castle Disease"
-        elif result[0] == 3:
-            return "Salmonella"
\ No newline at end of file
+    def __init__(self, config: PredictionConfig = None):
+        if config is None:
+            config = ConfigurationManager().get_prediction_config()
+        self.config = config
+        self.target_size = tuple(config.params_image_size[:-1])  # e.g., (224, 224)
+
+        # Load the model (Keras or exported TFLite) once during initialization
+        self.backend = load_backend(config)
+        self._local = threading.local()
+
+        self.cache = None
+        if config.cache_max_entries > 0:
+            model_path = config.tflite_model_path if config.backend == "tflite" else config.model_path
+            self.cache = PredictionCache(
+                fingerprint=file_fingerprint(model_path),
+                max_entries=config.cache_max_entries,
+                ttl_seconds=config.cache_ttl_seconds,
+                sqlite_path=config.cache_sqlite_path
+            )
+
+    def _preprocessor(self) -> ImagePreprocessor:
+        # One reusable batch buffer per calling thread
+        preprocessor = getattr(self._local, "preprocessor", None)
+        if preprocessor is None:
+            preprocessor = ImagePreprocessor(self.target_size, capacity=self.config.max_batch_size)
+            self._local.preprocessor = preprocessor
+        return preprocessor
+
+    def predict_proba_batch(
+            self,
+            image_inputs: list,
+            return_errors: bool = False,
+            timings: dict = None,
+            tta_views: int = None) -> list:
+        """
+        Compute class probabilities for several images with a single forward pass.
+
+        With test-time augmentation, each image is decoded once into
+        `tta_views` views (see `cnn_classifier.components.tta`) and all views
+        of all images go through the same forward pass; their logits are
+        averaged and scaled by `prediction.tta_temperature`.
+
+        Args:
+            image_inputs (list): file paths, encoded image bytes or PIL images.
+            return_errors (bool, optional): if True, an input that cannot be decoded
+                yields its exception in place of probabilities instead of failing
+                the whole batch. Default is False.
+            timings (dict, optional): filled with per-image "decode" and
+                "preprocess" seconds, the "inference" seconds of the forward
+                pass, the number of "images" it ran on, and "cache_hits".
+            tta_views (int, optional): views per image, 1 disables TTA. Defaults
+                to `prediction.tta_views`.
+
+        Returns:
+            list: probability vector (np.ndarray, one entry per class in CLASS_NAMES)
+                or exception for each input, in order.
+        """
+        views = get_views(self.config.tta_views if tta_views is None else tta_views)
+        temperature = self.config.tta_temperature
+        aggregate = len(views) > 1 or temperature != 1
+        results = [None] * len(image_inputs)
+
+        # Encoded uploads are looked up by content hash before any decoding
+        keys = {}
+        if self.cache is not None:
+            variant = f":tta{len(views)}:t{temperature:g}" if aggregate else ""
+            for idx, image_input in enumerate(image_inputs):
+                if isinstance(image_input, (bytes, bytearray)):
+                    keys[idx] = self.cache.key(image_input) + variant
+                    results[idx] = self.cache.get(keys[idx])
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if timings is not None:
+            timings["cache_hits"] = len(image_inputs) - len(pending)
+
+        preprocessor = self._preprocessor()
+        preprocessor.reserve(len(pending) * len(views))
+
+        loaded = []
+        for idx in pending:
+            try:
+                if len(views) == 1:
+                    preprocessor.load_into(image_inputs[idx], len(loaded), timings)
+                else:
+                    preprocessor.load_views_into(image_inputs[idx], len(loaded) * len(views), views, timings)
+                loaded.append(idx)
+            except Exception as e:
+                if not return_errors:
+                    raise
+                results[idx] = e
+
+        if loaded:
+            start = time.perf_counter()
+            probabilities = self.backend(preprocessor.batch(len(loaded) * len(views)))
+            if aggregate:
+                probabilities = aggregate_views(probabilities.reshape(len(loaded), len(views), -1), temperature)
+            if timings is not None:
+                timings["inference"] = time.perf_counter() - start
+                timings["images"] = len(loaded)
+            for idx, probability in zip(loaded, probabilities):
+                results[idx] = probability
+                if idx in keys:
+                    self.cache.put(keys[idx], probability)
+
+        return results
+
+    def predict_batch(
+            self,
+            image_inputs: list,
+            return_errors: bool = False,
+            timings: dict = None,
+            tta_views: int = None) -> list:
+        """
+        Classify several images with a single forward pass.
+
+        Returns:
+            list: predicted class name (or exception) for each input, in order.
+        """
+        results = [
+            result if isinstance(result, Exception) else CLASS_NAMES[int(np.argmax(result))]
+            for result in self.predict_proba_batch(
+                image_inputs, return_errors=return_errors, timings=timings, tta_views=tta_views
+            )
+        ]
+        self._log_sample(results)
+        return results
+
+    def _log_sample(self, results: list):
+        """
+        Log `prediction.log_sample_rate` of the predictions at INFO, as
+        key=value pairs plus the same fields as record attributes. Nothing is
+        formatted unless the record would be emitted.
+        """
+        rate = self.config.log_sample_rate
+        if rate <= 0 or not logger.isEnabledFor(logging.INFO):
+            return
+        for result in results:
+            if rate < 1 and random.random() >= rate:
+                continue
+            fields = {"event": "prediction", "sample_rate": rate}
+            if isinstance(result, Exception):
+                fields["error"] = type(result).__name__
+            else:
+                fields["predicted_class"] = result
+            logger.info(" ".join(f"{k}={v}" for k, v in fields.items()), extra=fields)
+
+    def predict(self, image_input, tta_views: int = None):
+        return self.predict_batch([image_input], tta_views=tta_views)[0]
@@ -1,6 +1,7 @@
 from cnn_classifier.config.configuration import ConfigurationManager
 from cnn_classifier.components.data_ingestion import DataIngestion
 from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
 
 STAGE_NAME = "Stage 01 - Data Ingestion"
 
@@ -15,9 +16,12 @@ class DataIngestionPipeline:
         data_ingestion.download_data()
         data_ingestion.extract_zip_file()
         data_ingestion.organize_images_into_class_folders()
+        data_ingestion.build_manifest()
         data_ingestion.print_data_summary()
+        data_ingestion.write_tfrecords()
 
 if __name__ == '__main__':
+    configure_logging()
     try:
         logger.info(f">>> {STAGE_NAME}: started")
         data_ingestion_obj = DataIngestionPipeline()
@@ -1,6 +1,7 @@
 from cnn_classifier.config.configuration import ConfigurationManager
 from cnn_classifier.components.model_definition import BaseModel
 from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
 
 STAGE_NAME = "Stage 02 - Model Definition"
 
@@ -16,6 +17,7 @@ class ModelDefinitionPipeline:
         base_model.update_base_model()
 
 if __name__ == '__main__':
+    configure_logging()
     try:
         logger.info(f">>> {STAGE_NAME}: started")
         model_definition_obj = ModelDefinitionPipeline()
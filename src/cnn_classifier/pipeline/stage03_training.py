@@ -1,8 +1,9 @@
 from cnn_classifier.config.configuration import ConfigurationManager
 from cnn_classifier.components.callbacks import Callbacks
 from cnn_classifier.components.training import Training
-from cnn_classifier.utils.utilities import set_global_seed, configure_tf_gpu_memory_growth
+from cnn_classifier.utils.tf_utilities import set_global_seed, configure_tf_gpu_memory_growth
 from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
 
 STAGE_NAME = "Stage 03 - Training"
 
@@ -12,17 +13,20 @@ class ModelTrainingPipeline:
 
     def execute_model_definition(self):
         config = ConfigurationManager()
+        training_config = config.get_training_config()
+        training = Training(config=training_config)
+
         callbacks_config = config.get_callbacks_config()
-        prepare_callbacks = Callbacks(config=callbacks_config)
+        # Non-chief workers write their scratch checkpoints and logs separately
+        prepare_callbacks = Callbacks(config=callbacks_config, worker=None if training.is_chief else training.worker)
         callback_list = prepare_callbacks.get_tb_ckpt_callbacks()
 
-        training_config = config.get_training_config()
-        training = Training(config=training_config)
         training.get_base_model()
         training.train_validation_generator()
         training.train(callback_list=callback_list)
 
 if __name__ == '__main__':
+    configure_logging()
     set_global_seed(42)
     configure_tf_gpu_memory_growth()
     try:
@@ -1,6 +1,7 @@
 from cnn_classifier.config.configuration import ConfigurationManager
 from cnn_classifier.components.evaluation import Evaluation
 from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
 
 STAGE_NAME = "Stage 04 - Evaluation"
 
@@ -16,6 +17,7 @@ class ModelEvaluationPipeline:
         evaluation.save_score()
 
 if __name__ == '__main__':
+    configure_logging()
     try:
         logger.info(f">>> {STAGE_NAME}: started")
         model_evaluation_obj = ModelEvaluationPipeline()
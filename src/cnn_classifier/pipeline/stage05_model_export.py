@@ -0,0 +1,29 @@
+from cnn_classifier.config.configuration import ConfigurationManager
+from cnn_classifier.components.model_export import ModelExport
+from cnn_classifier import logger
+from cnn_classifier.utils.logging_setup import configure_logging
+
+STAGE_NAME = "Stage 05 - Model Export"
+
+class ModelExportPipeline:
+    def __init__(self):
+        pass
+
+    def execute_model_export(self):
+        config = ConfigurationManager()
+        model_export_config = config.get_model_export_config()
+        model_export = ModelExport(config=model_export_config)
+        model_export.export()
+        model_export.evaluation()
+        model_export.save_score()
+
+if __name__ == '__main__':
+    configure_logging()
+    try:
+        logger.info(f">>> {STAGE_NAME}: started")
+        model_export_obj = ModelExportPipeline()
+        model_export_obj.execute_model_export()
+        logger.info(f">>> {STAGE_NAME}: completed\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,60 @@
+import tarfile
+import zipfile
+from pathlib import PurePosixPath
+from typing import BinaryIO, Iterator, Tuple
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+def is_archive(fileobj: BinaryIO) -> bool:
+    """
+    Check whether a seekable file object holds a zip or tar archive.
+
+    The stream position is restored before returning.
+    """
+    position = fileobj.tell()
+    try:
+        if zipfile.is_zipfile(fileobj):
+            return True
+        fileobj.seek(position)
+        try:
+            with tarfile.open(fileobj=fileobj, mode="r:*"):
+                return True
+        except tarfile.TarError:
+            return False
+    finally:
+        fileobj.seek(position)
+
+def iter_archive_images(fileobj: BinaryIO) -> Iterator[Tuple[str, bytes]]:
+    """
+    Lazily yield (member name, raw bytes) for every image inside a zip or tar archive.
+
+    Members are read one at a time, so the archive is never fully decompressed
+    into memory. Non-image members and directories are skipped.
+
+    Args:
+        fileobj (BinaryIO): seekable file object positioned at the start of the archive.
+
+    Raises:
+        ValueError: If the file object is neither a zip nor a tar archive.
+    """
+    position = fileobj.tell()
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(position)
+        with zipfile.ZipFile(fileobj) as zip_file_ref:
+            for info in zip_file_ref.infolist():
+                if info.is_dir() or PurePosixPath(info.filename).suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                yield info.filename, zip_file_ref.read(info)
+        return
+
+    fileobj.seek(position)
+    try:
+        tar_file_ref = tarfile.open(fileobj=fileobj, mode="r:*")
+    except tarfile.TarError as e:
+        raise ValueError("Not a zip or tar archive") from e
+
+    with tar_file_ref:
+        for member in tar_file_ref:
+            if not member.isfile() or PurePosixPath(member.name).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            yield member.name, tar_file_ref.extractfile(member).read()
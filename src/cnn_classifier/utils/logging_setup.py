@@ -0,0 +1,148 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from cnn_classifier.entity.pipeline_config import LoggingConfig
+
+LOG_FORMAT = "[%(asctime)s]: %(name)s - %(levelname)s - %(module)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+_queue_handler = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, module, message and any `extra=` fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+_traceback_formatter = logging.Formatter()
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue a picklable copy of the record with its message merged, keeping
+    the traceback in `exc_text` rather than folding it into the message.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _default_config() -> LoggingConfig:
+    from cnn_classifier.config.configuration import ConfigurationManager
+    return ConfigurationManager().get_logging_config()
+
+def _reset_root() -> logging.Logger:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    return root
+
+def configure_logging(config: LoggingConfig = None) -> logging.Logger:
+    """
+    Route all logging through a queue, so the calling thread only enqueues
+    the record and a background QueueListener does the file and console I/O.
+
+    Records go to a size-rotated `config.log_path` (as JSON lines with
+    `config.json_lines`) and, with `config.console`, to stdout. Calling it
+    again replaces the previous setup.
+
+    Args:
+        config (LoggingConfig, optional): defaults to the `logging` section of config.yaml.
+
+    Returns:
+        logging.Logger: the root logger.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+    root = _reset_root()
+    config = config or _default_config()
+    Path(config.log_path).parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        config.log_path, maxBytes=config.max_bytes, backupCount=config.backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter() if config.json_lines else logging.Formatter(LOG_FORMAT))
+    handlers = [file_handler]
+    if config.console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = _QueueHandler(records)
+    root.addHandler(_queue_handler)
+    root.setLevel(config.level)
+    return root
+
+def stop_logging():
+    """Flush the queued records and stop the listener thread (also run at exit)."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+atexit.register(stop_logging)
+
+def forward_logging(log_queue, level: int):
+    """In a child process, send every record at `level` or above to a `ProcessLogForwarder` queue."""
+    stop_logging()
+    root = _reset_root()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+
+class _Dispatch(logging.Handler):
+    def emit(self, record: logging.LogRecord):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+class ProcessLogForwarder:
+    """
+    Collect the records of child processes and hand them to this process's
+    handlers, so a single process writes (and rotates) the log file. Pass
+    `queue` and `level` to `forward_logging` in each child.
+
+    Args:
+        context: the multiprocessing context the children are started with.
+    """
+    def __init__(self, context):
+        self.queue = context.Queue()
+        self.level = logging.getLogger().getEffectiveLevel()
+        self._listener = logging.handlers.QueueListener(self.queue, _Dispatch())
+        self._listener.start()
+
+    def stop(self):
+        self._listener.stop()
+        self.queue.close()
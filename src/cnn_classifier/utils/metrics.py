@@ -0,0 +1,133 @@
+import bisect
+import threading
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with fixed upper bucket bounds.
+
+    Args:
+        name (str): metric name used when reporting.
+        buckets (list): sorted upper bounds of the buckets; an implicit +Inf bucket is appended.
+        description (str, optional): human readable description of the metric.
+        labels (dict, optional): constant labels, e.g. {"stage": "decode"}; histograms
+            sharing a name form one Prometheus metric family.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, buckets: list, description: str = "", labels: dict = None):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.buckets = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return the histogram as a dict of cumulative bucket counts, sum and count.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + [float("inf")], counts):
+            running += n
+            cumulative["+Inf" if bound == float("inf") else f"{bound:g}"] = running
+
+        return {
+            "name": self.name,
+            "description": self.description,
+            "labels": self.labels,
+            "buckets": cumulative,
+            "sum": total,
+            "count": count,
+            "mean": total / count if count else 0.0
+        }
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str = "", labels: dict = None):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self) -> dict:
+        return {"name": self.name, "description": self.description, "labels": self.labels, "value": self._value}
+
+class Gauge(Counter):
+    """
+    Thread-safe value that can go up and down. With `value_fn`, the value is
+    read from it at snapshot time instead (e.g. a queue length).
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str = "", labels: dict = None, value_fn=None):
+        super().__init__(name, description, labels)
+        self.value_fn = value_fn
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        if self.value_fn is not None:
+            snapshot["value"] = float(self.value_fn())
+        return snapshot
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _label_text(labels: dict, **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+def render_prometheus(metrics: list, prefix: str = "") -> str:
+    """
+    Render Counter, Gauge and Histogram objects in the Prometheus text
+    exposition format (version 0.0.4). Metrics sharing a name are written as
+    one family with a single HELP/TYPE header.
+    """
+    families = {}
+    for metric in metrics:
+        families.setdefault(prefix + metric.name, []).append(metric)
+
+    lines = []
+    for name, members in families.items():
+        lines.append(f"# HELP {name} {members[0].description}")
+        lines.append(f"# TYPE {name} {members[0].kind}")
+        for metric in members:
+            snapshot = metric.snapshot()
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_label_text(metric.labels)} {_number(snapshot['value'])}")
+                continue
+            for bound, count in snapshot["buckets"].items():
+                lines.append(f"{name}_bucket{_label_text(metric.labels, le=bound)} {count}")
+            lines.append(f"{name}_sum{_label_text(metric.labels)} {_number(snapshot['sum'])}")
+            lines.append(f"{name}_count{_label_text(metric.labels)} {snapshot['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,114 @@
+# TensorFlow-dependent helpers, kept out of utilities.py so the web app can import those without TensorFlow.
+import os
+import random
+import numpy as np
+import tensorflow as tf
+from cnn_classifier import logger
+
+def configure_tf_gpu_memory_growth():
+    gpus = tf.config.list_physical_devices("GPU")
+    if not gpus:
+        logger.info("No GPU found. Running on CPU.")
+        return
+
+    for gpu in gpus:
+        tf.config.experimental.set_memory_growth(gpu, True)
+
+    logger.info(f"Enabled memory growth for {len(gpus)} GPU(s).")
+
+def set_global_seed(seed: int = 42):
+    """
+    Set random seeds for reproducibility across all libraries.
+    Call this at the START of any stage that uses randomness.
+    """    
+    os.environ['PYTHONHASHSEED'] = str(seed)
+    os.environ['TF_DETERMINISTIC_OPS'] = '1'
+    
+    random.seed(seed)
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+    
+    logger.info(f"Global random seed set to {seed}")
+
+def get_distribution_strategy(name: str) -> tf.distribute.Strategy:
+    """
+    Build the tf.distribute strategy named by the DISTRIBUTION_STRATEGY param.
+
+    Must be called before any other TensorFlow op runs: multi-worker
+    collectives can only be configured at program startup.
+
+    Args:
+        name (str): "none" (default device), "mirrored" (all local GPUs, one
+            replica each) or "multi_worker" (one replica per worker process
+            listed in the TF_CONFIG environment variable).
+
+    Returns:
+        tf.distribute.Strategy: the strategy to build and train the model under.
+    """
+    if name in (None, "none"):
+        return tf.distribute.get_strategy()
+    if name == "mirrored":
+        strategy = tf.distribute.MirroredStrategy()
+    elif name == "multi_worker":
+        if "TF_CONFIG" not in os.environ:
+            logger.warning("TF_CONFIG is not set; multi_worker runs as a single worker")
+        strategy = tf.distribute.MultiWorkerMirroredStrategy()
+    else:
+        raise ValueError(f"Unknown DISTRIBUTION_STRATEGY '{name}', expected none, mirrored or multi_worker")
+
+    logger.info(f"Using {name} distribution strategy with {strategy.num_replicas_in_sync} replica(s)")
+    return strategy
+
+def worker_name(strategy: tf.distribute.Strategy):
+    """This process's task in a multi-worker cluster, e.g. "worker_1"; None otherwise."""
+    resolver = getattr(strategy, "cluster_resolver", None)
+    if resolver is None or not resolver.cluster_spec().as_dict():
+        return None
+    return f"{resolver.task_type}_{resolver.task_id}"
+
+def is_chief(strategy: tf.distribute.Strategy) -> bool:
+    """Whether this process writes the shared outputs: the chief task, or worker 0 if there is none."""
+    resolver = getattr(strategy, "cluster_resolver", None)
+    if resolver is None or not resolver.cluster_spec().as_dict():
+        return True
+    if "chief" in resolver.cluster_spec().as_dict():
+        return resolver.task_type == "chief"
+    return resolver.task_type == "worker" and resolver.task_id == 0
+
+PRECISIONS = ("float32", "mixed_bfloat16", "mixed_float16")
+
+def with_precision(model: tf.keras.Model, precision: str) -> tf.keras.Model:
+    """
+    Rebuild a functional model with its hidden layers under a dtype policy.
+
+    Saved layers carry their own dtype policy, so the global policy does not
+    apply to a loaded model. This rewrites the policy of every layer except
+    the inputs and the output (softmax) layers, which stay float32 for
+    numerically stable probabilities and losses, and copies the weights
+    across. Mixed policies keep float32 variables, so converting back to
+    "float32" is lossless.
+
+    Args:
+        model (tf.keras.Model): functional model to convert.
+        precision (str): "float32", "mixed_bfloat16" or "mixed_float16".
+
+    Returns:
+        tf.keras.Model: the rebuilt model.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown PRECISION '{precision}', expected one of {', '.join(PRECISIONS)}")
+
+    config = model.get_config()
+    output_layers = config["output_layers"]
+    if output_layers and isinstance(output_layers[0], str):  # a single output
+        output_layers = [output_layers]
+    keep_float32 = {name for name, _, _ in output_layers}
+
+    for layer in config["layers"]:
+        if layer["class_name"] == "InputLayer" or layer["config"]["name"] in keep_float32:
+            continue
+        layer["config"]["dtype"] = precision
+
+    rebuilt = tf.keras.Model.from_config(config)
+    rebuilt.set_weights(model.get_weights())
+    return rebuilt
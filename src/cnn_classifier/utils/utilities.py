@@ -1,6 +1,4 @@
 import os
-import random
-import numpy as np
 from pathlib import Path
 from typing import Any
 import yaml
@@ -10,7 +8,6 @@ from box.exceptions import BoxValueError
 from box import ConfigBox
 from ensure import ensure_annotations
 import base64
-import tensorflow as tf
 from cnn_classifier import logger
 
 @ensure_annotations
@@ -138,28 +135,3 @@ def get_size(path: Path) -> str:
 def bytes_to_data_url(image_bytes: bytes, mime_type: str) -> str:
     b64 = base64.b64encode(image_bytes).decode("utf-8")
     return f"data:{mime_type};base64,{b64}"
-
-def configure_tf_gpu_memory_growth():
-    gpus = tf.config.list_physical_devices("GPU")
-    if not gpus:
-        logger.info("No GPU found. Running on CPU.")
-        return
-
-    for gpu in gpus:
-        tf.config.experimental.set_memory_growth(gpu, True)
-
-    logger.info(f"Enabled memory growth for {len(gpus)} GPU(s).")
-
-def set_global_seed(seed: int = 42):
-    """
-    Set random seeds for reproducibility across all libraries.
-    Call this at the START of any stage that uses randomness.
-    """    
-    os.environ['PYTHONHASHSEED'] = str(seed)
-    os.environ['TF_DETERMINISTIC_OPS'] = '1'
-    
-    random.seed(seed)
-    np.random.seed(seed)
-    tf.random.set_seed(seed)
-    
-    logger.info(f"Global random seed set to {seed}")
\ No newline at end of file
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import threading
+import zipfile
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import pytest
+from cnn_classifier.components.data_ingestion import DataIngestion
+from cnn_classifier.entity.pipeline_config import DataIngestionConfig
+
+def make_ingestion(tmp_path: Path, source: str, sha256: str = None) -> DataIngestion:
+    root = tmp_path / "data_ingestion"
+    root.mkdir(exist_ok=True)
+    return DataIngestion(DataIngestionConfig(
+        root_dir=root,
+        source_URL=str(source),
+        source_sha256=sha256,
+        local_data_file=root / "data.zip",
+        unzip_dir=root,
+        extraction_manifest=root / "extraction_manifest.json",
+        extract_workers=2,
+        dataset_manifest=root / "dataset_manifest.parquet",
+        tfrecord_dir=root / "tfrecords",
+        images_per_shard=100,
+        params_image_size=[224, 224, 3]
+    ))
+
+def write_zip(path: Path, members: dict):
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name, data in members.items():
+            zip_file.writestr(name, data)
+
+def test_rerun_removes_dropped_members(tmp_path):
+    archive = tmp_path / "data.zip"
+    write_zip(archive, {"cocci.1.jpg": b"one", "salmo.1.jpg": b"two"})
+    ingestion = make_ingestion(tmp_path, archive)
+    ingestion.extract_zip_file()
+
+    write_zip(archive, {"cocci.1.jpg": b"one"})
+    ingestion.extract_zip_file()
+
+    assert (ingestion.images_dir / "Coccidiosis" / "cocci.1.jpg").read_bytes() == b"one"
+    assert not (ingestion.images_dir / "Salmonella" / "salmo.1.jpg").exists()
+
+def test_rerun_keeps_member_moved_to_another_folder(tmp_path):
+    archive = tmp_path / "data.zip"
+    write_zip(archive, {"v1/cocci.1.jpg": b"one"})
+    ingestion = make_ingestion(tmp_path, archive)
+    ingestion.extract_zip_file()
+
+    # Same destination, different member name: the old record is dropped, the file is not
+    write_zip(archive, {"v2/cocci.1.jpg": b"one"})
+    ingestion.extract_zip_file()
+
+    assert (ingestion.images_dir / "Coccidiosis" / "cocci.1.jpg").read_bytes() == b"one"
+
+def test_duplicate_destinations_extract_last_member(tmp_path):
+    archive = tmp_path / "data.zip"
+    write_zip(archive, {"v1/cocci.1.jpg": b"one", "v2/cocci.1.jpg": b"two"})
+    ingestion = make_ingestion(tmp_path, archive)
+    ingestion.extract_zip_file()
+
+    assert (ingestion.images_dir / "Coccidiosis" / "cocci.1.jpg").read_bytes() == b"two"
+    with open(ingestion.config.extraction_manifest) as f:
+        assert list(json.load(f)["members"]) == ["v2/cocci.1.jpg"]
+
+def test_local_source_checksum(tmp_path):
+    archive = tmp_path / "data.zip"
+    write_zip(archive, {"cocci.1.jpg": b"one"})
+    digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+
+    assert make_ingestion(tmp_path, archive.as_uri(), sha256=digest.upper()).download_data() == archive
+    with pytest.raises(ValueError):
+        make_ingestion(tmp_path, archive, sha256="0" * 64).download_data()
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves `body` for any path, honouring `Range: bytes=N-`; records the Range headers seen."""
+    def __init__(self, body: bytes, ranges: list, *args, **kwargs):
+        self.body, self.ranges = body, ranges
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        self.ranges.append(requested)
+        start = int(requested[len("bytes="):].rstrip("-")) if requested else 0
+        self.send_response(206 if requested else 200)
+        self.send_header("Content-Length", str(len(self.body) - start))
+        self.end_headers()
+        self.wfile.write(self.body[start:])
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def served_zip(tmp_path):
+    archive = tmp_path / "source.zip"
+    write_zip(archive, {f"cocci.{i}.jpg": bytes([i]) * 1000 for i in range(20)})
+    body, ranges = archive.read_bytes(), []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeHandler, body, ranges))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/data.zip", body, ranges
+    server.shutdown()
+    server.server_close()
+
+def test_download_resumes_partial_file(tmp_path, served_zip):
+    url, body, ranges = served_zip
+    ingestion = make_ingestion(tmp_path, url, sha256=hashlib.sha256(body).hexdigest())
+    part = Path(f"{ingestion.config.local_data_file}.part")
+    part.write_bytes(body[:len(body) // 2])
+
+    path = ingestion.download_data()
+
+    assert ranges == [f"bytes={len(body) // 2}-"]
+    assert path.read_bytes() == body
+    assert not part.exists()
+
+def test_corrupt_download_is_fetched_again(tmp_path, served_zip):
+    url, body, ranges = served_zip
+    ingestion = make_ingestion(tmp_path, url, sha256=hashlib.sha256(body).hexdigest())
+    Path(ingestion.config.local_data_file).write_bytes(b"truncated")
+
+    assert ingestion.download_data().read_bytes() == body
+    assert ranges == [None]
+
+def test_download_rejects_checksum_mismatch(tmp_path, served_zip):
+    url, _, _ = served_zip
+    ingestion = make_ingestion(tmp_path, url, sha256="0" * 64)
+
+    with pytest.raises(ValueError):
+        ingestion.download_data()
+    assert not Path(ingestion.config.local_data_file).exists()
@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import zipfile
+from io import BytesIO
+from pathlib import Path
+import numpy as np
+import pytest
+import yaml
+from PIL import Image
+
+pytest.importorskip("tensorflow")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PREFIXES = ["cocci", "healthy", "ncd", "salmo"]
+
+def write_dataset_zip(path: Path, images_per_class: int = 6):
+    rng = np.random.default_rng(0)
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for label, prefix in enumerate(PREFIXES):
+            for i in range(images_per_class):
+                pixels = np.clip(rng.normal(60 * label + 30, 20, size=(32, 32, 3)), 0, 255).astype(np.uint8)
+                encoded = BytesIO()
+                Image.fromarray(pixels).save(encoded, "JPEG")
+                zip_file.writestr(f"{prefix}.{i}.jpg", encoded.getvalue())
+
+def make_project(root: Path) -> dict:
+    """A project directory training a weights=None VGG16 at 32x32 for one single-step epoch on two workers."""
+    with open(REPO_ROOT / "config" / "config.yaml") as f:
+        config = yaml.safe_load(f)
+    with open(REPO_ROOT / "params.yaml") as f:
+        params = yaml.safe_load(f)
+
+    write_dataset_zip(root / "dataset.zip")
+    config["data_ingestion"].update(source_URL=str(root / "dataset.zip"), extract_workers=2)
+    config["logging"].update(console=False)
+    params.update(
+        IMAGE_SIZE=[32, 32, 3],
+        BACKBONE="vgg16",
+        WEIGHTS=None,
+        EPOCHS=1,
+        BATCH_SIZE=64,  # per replica, more than the whole training split: one step per epoch
+        AUGMENTATION=False,
+        FINE_TUNE_STAGES=[],
+        DISTRIBUTION_STRATEGY="multi_worker",
+        PRECISION="float32",
+        FEATURE_CACHE=False,
+        PROFILE_TRACE_STEPS=None,
+        PROFILE_STAGE_BATCHES=0
+    )
+    (root / "config").mkdir()
+    with open(root / "config" / "config.yaml", "w") as f:
+        yaml.safe_dump(config, f)
+    with open(root / "params.yaml", "w") as f:
+        yaml.safe_dump(params, f)
+    return config
+
+def run(root: Path, *args) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT / "src"), os.environ.get("PYTHONPATH")])))
+    return subprocess.run([sys.executable, "-m", *args], cwd=root, env=env, capture_output=True, text=True, timeout=900)
+
+def test_train_with_two_local_workers(tmp_path):
+    config = make_project(tmp_path)
+    for stage in ("stage01_data_ingestion", "stage02_model_definition"):
+        result = run(tmp_path, f"cnn_classifier.pipeline.{stage}")
+        assert result.returncode == 0, result.stderr[-4000:]
+
+    # `train` exits 0 only if every worker did
+    result = run(tmp_path, "cnn_classifier.cli", "train", "--workers", "2")
+    assert result.returncode == 0, result.stderr[-4000:]
+
+    training_dir = tmp_path / config["training"]["root_dir"]
+    assert (tmp_path / config["training"]["trained_model_path"]).exists()
+    assert sorted(path.name for path in training_dir.glob("*.h5")) == ["trained_model.h5"]
+
+    # The chief checkpoints to the configured path, the other worker to a scratch folder of its own
+    checkpoint = tmp_path / config["callbacks"]["model_checkpoint_filepath"]
+    scratch = [path for path in checkpoint.parent.rglob(checkpoint.name) if path != checkpoint]
+    assert checkpoint.exists()
+    assert len(scratch) == 1 and scratch[0].parent.parent == checkpoint.parent